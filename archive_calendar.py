@@ -0,0 +1,170 @@
+
+# The purpose of this file is to keep the archive calendar of the main sheet between runs. Whether a job in the main sheet is moved to the archive
+# sheet only depends on its "Status" and "Job Completed Date" values, so the date every completed job becomes due for archival is known as soon as
+# the job is completed. Instead of checking every row of the main sheet on every run, the completion dates of every completed job are saved to a
+# calendar file beside the Excel file in sorted order:
+#   - The rows due for archival on the current date are found with a binary search of the sorted completion dates.
+#   - If no rows are due, the main and archive sheets are not split and joined again at all (see update_main_and_archive.py). As long as neither sheet
+#     was edited since the previous run wrote it, neither sheet is written into the updated Excel file again either (see main.py).
+#   - The upcoming archivals can be listed by date without updating the Excel file (see the --preview-archival option of main.py).
+
+# NOTE: Each calendar is keyed by the sheet cache key of the main sheet it was created from (see sheet_cache.py), so a calendar is only ever used for
+#       the exact main sheet it describes. The calendar of the updated main sheet is saved once the updated Excel file has been saved, so that the next
+#       run can use it as long as the main sheet is not edited in between.
+
+from bisect import bisect_right
+from datetime import datetime
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+
+import checks
+from console_output import announce, detail
+from job_frame_schema import apply_job_schema
+from normalize_dates import normalize_sheet_dates
+from reader_backends import create_sheet_reader
+from load_workbook_data import load_streaming_workbook
+from sheet_cache import sheet_cache_keys, read_cached_sheet_frame
+
+
+# The name of the calendar file that holds the completion dates of the main sheet's completed jobs.
+ARCHIVE_CALENDAR_FILE = "Fiber Installations Database - Archive Calendar.json"
+
+# The version of the calendar file layout. Calendar files with a different version are ignored.
+CALENDAR_VERSION = 1
+
+# The name of the main sheet.
+MAIN_SHEET = 'Main Installs'
+
+# The date every completion day is counted from.
+EPOCH = pd.Timestamp('1970-01-01')
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for counting the days between the epoch and a date. It uses a date as input.
+def epoch_day(day):
+    return (pd.Timestamp(day).normalize() - EPOCH).days
+
+
+# Function used for creating the archive calendar of the main sheet. The completion day (counted from the epoch) of every completed job is saved in
+# ascending order along with the job's row position. Completed jobs without a completion date are saved on their own, as they are always due. It uses
+# the main sheet (with its date-containing columns already converted) as input.
+def create_archive_calendar(main_sheet):
+
+    completed = checks.completed_status_mask(main_sheet['Status']).to_numpy()
+    completion_dates = checks.date_values(main_sheet['Job Completed Date']).dt.normalize()
+    dated = completion_dates.notna().to_numpy()
+
+    # The completion days are sorted once, keeping rows with the same completion day in the order they appear in the sheet.
+    dated_rows = np.flatnonzero(completed & dated)
+    completion_days = ((completion_dates.iloc[dated_rows] - EPOCH).dt.days).to_numpy()
+    order = np.argsort(completion_days, kind='stable')
+
+    return {
+            'version': CALENDAR_VERSION,
+            'rows': len(main_sheet),
+            'undated rows': np.flatnonzero(completed & ~dated).tolist(),
+            'completion days': completion_days[order].tolist(),
+            'dated rows': dated_rows[order].tolist()
+           }
+
+
+# Function used for loading the saved archive calendar. If the calendar file does not exist, can not be used, or does not describe the main sheet
+# being updated, None is returned. It uses the sheet cache key of the main sheet and the name of the calendar file as input.
+def load_archive_calendar(sheet_key, calendar_file=ARCHIVE_CALENDAR_FILE):
+
+    if sheet_key is None or not os.path.isfile(calendar_file):
+        return None
+
+    try:
+        with open(calendar_file, 'r') as file:
+            calendar = json.load(file)
+    except (OSError, ValueError):
+        detail("Archive calendar file could not be read, every row in the main sheet will be checked.", logging.WARNING)
+        return None
+
+    # Calendars written with a different layout or for a different main sheet are ignored.
+    if calendar.get('version') != CALENDAR_VERSION or calendar.get('sheet key') != sheet_key:
+        return None
+
+    return calendar
+
+
+# Function used for saving the archive calendar, keyed by the sheet cache key of the main sheet it describes. It uses the archive calendar, the sheet
+# cache key of the main sheet, and the name of the calendar file as input.
+def save_archive_calendar(calendar, sheet_key, calendar_file=ARCHIVE_CALENDAR_FILE):
+
+    calendar = dict(calendar, **{'sheet key': sheet_key})
+
+    # The calendar is written to a temporary file first, so that a run that is interrupted never leaves a half written calendar file behind.
+    with open(calendar_file + ".tmp", 'w') as file:
+        json.dump(calendar, file)
+    os.replace(calendar_file + ".tmp", calendar_file)
+
+
+# Function used for finding the row positions of every job that is due for archival. A job is due once the specified amount of days have passed since
+# its completion date, so every completion day up to the cutoff day is found with a single binary search. It uses the archive calendar, the current
+# date, and the amount of days a job has to be completed for as input.
+def due_rows(calendar, current_date, archive_after_days):
+    cutoff_day = epoch_day(current_date) - archive_after_days
+    due_count = bisect_right(calendar['completion days'], cutoff_day)
+    return sorted(calendar['undated rows'] + calendar['dated rows'][:due_count])
+
+
+# Function used for creating the boolean mask that is True for every row of the main sheet that is due for archival, from the archive calendar. The
+# mask is the same as the one created by the completion check in update_main_and_archive.py. It uses the archive calendar, the main sheet, the current
+# date, and the amount of days a job has to be completed for as input.
+def calendar_import_mask(calendar, main_sheet, current_date, archive_after_days):
+    import_mask = np.zeros(len(main_sheet), dtype=bool)
+    import_mask[due_rows(calendar, current_date, archive_after_days)] = True
+    return pd.Series(import_mask, index=main_sheet.index)
+
+
+# Function used for listing the amount of jobs that become due for archival on each date. Jobs that are already due (including completed jobs without
+# a completion date) are listed under the current date. A list of (date, amount of jobs) pairs in date order is returned. It uses the archive
+# calendar, the current date, and the amount of days a job has to be completed for as input.
+def upcoming_archivals(calendar, current_date, archive_after_days):
+
+    current_day = epoch_day(current_date)
+    day_counts = {current_day: len(calendar['undated rows'])}
+    for completion_day in calendar['completion days']:
+        due_day = max(completion_day + archive_after_days, current_day)
+        day_counts[due_day] = day_counts.get(due_day, 0) + 1
+
+    return [((EPOCH + pd.Timedelta(days=due_day)).date(), count) for due_day, count in sorted(day_counts.items()) if count > 0]
+
+
+# Function used for reporting the upcoming archivals of the main sheet. It uses the archive calendar, the current date, and the amount of days a job
+# has to be completed for as input.
+def report_upcoming_archivals(calendar, current_date, archive_after_days):
+
+    archivals = upcoming_archivals(calendar, current_date, archive_after_days)
+    announce(f"Upcoming archivals (jobs completed for at least {archive_after_days} days):")
+    if not archivals:
+        detail("No completed jobs in the main sheet.")
+
+    for due_date, count in archivals:
+        label = "due now" if due_date <= current_date else f"{(due_date - current_date).days} days from now"
+        detail(f"{due_date.strftime('%m-%d-%Y')} ({label}): {count} job(s)")
+
+
+# Function used for previewing the upcoming archivals of an Excel file's main sheet without updating the Excel file. If there is no saved archive
+# calendar for the main sheet, the main sheet is loaded with the selected reader backend and its calendar is created and saved. It uses the Excel
+# file's name, the amount of days a job has to be completed for, and the name of the reader backend as input.
+def preview_archival(file_name, archive_after_days, reader):
+
+    cache_keys = sheet_cache_keys(file_name)
+    calendar = load_archive_calendar(cache_keys.get(MAIN_SHEET))
+
+    if calendar is None:
+        detail("No archive calendar found for the main sheet, the calendar is created from the Excel file.")
+        workbook = load_streaming_workbook(file_name) if reader == 'openpyxl' else None
+        main_sheet = apply_job_schema(read_cached_sheet_frame(create_sheet_reader(reader, workbook, file_name), MAIN_SHEET, cache_keys))
+        normalize_sheet_dates(main_sheet, keep_non_dates=True)
+        calendar = create_archive_calendar(main_sheet)
+        save_archive_calendar(calendar, cache_keys.get(MAIN_SHEET))
+
+    report_upcoming_archivals(calendar, datetime.now().date(), archive_after_days)
@@ -0,0 +1,161 @@
+
+# The purpose of this file is to make moving rows into the archive sheet idempotent. If the script is ran twice on the same Excel file (or a run is
+# retried after the updated Excel file failed to upload), the same completed jobs are moved from the main sheet into the archive sheet a second time,
+# which inflates the archive sheet and every metric created from it. To prevent this, the fingerprint of every archived job is kept in an index:
+#   - Each job's fingerprint is a 64-bit hash of the values in its job columns (A-N), created for a whole sheet at once.
+#   - The fingerprints are kept in a set, so checking if a job is already archived takes the same amount of time no matter the size of the archive.
+#   - Rows moved from the main sheet whose job is already archived are rejected and counted instead of being added to the archive sheet again.
+#   - The index is saved to an index file beside the Excel file, so it only has to be created from the whole archive sheet when it no longer
+#     describes the archive sheet being updated.
+#   - An archive sheet that already holds duplicate jobs can be cleaned up with the --dedupe-archive option of main.py, which keeps the first row of
+#     every job and removes the rest.
+
+# NOTE: The saved index is keyed by the sheet cache key of the archive sheet it was created from (see sheet_cache.py), the same way the archive metrics
+#       state is keyed (see archive_metrics_state.py). It is only reused if the archive sheet being updated still has that key (and the same amount
+#       of rows), so an edit made to any row of the archive sheet between runs forces the index to be created again.
+
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+
+from archive_metrics_state import fingerprint_value
+from console_output import detail
+
+
+# The name of the index file that holds the fingerprints of every archived job.
+ARCHIVE_INDEX_FILE = "Fiber Installations Database - Archive Index.json"
+
+# The version of the index file layout. Index files with a different version are ignored.
+INDEX_VERSION = 3
+
+# The amount of columns (A-N) that hold the values of a job.
+JOB_COLUMNS = 14
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for converting the values of every row's job columns into text (see archive_metrics_state.py), so that a value is given the same
+# text whether it was read as an integer or a decimal. It uses a sheet (with its date-containing columns already converted) as input.
+def job_values(sheet):
+    return sheet.iloc[:, :JOB_COLUMNS].astype(object).map(fingerprint_value)
+
+
+# Function used for creating the fingerprint of every row in a sheet. Every row is hashed at once and an array of 64-bit fingerprints is returned.
+# It uses the job values of the sheet's rows (see job_values) as input.
+def job_fingerprints(values):
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+# Function used for creating the job index of a sheet. It uses a sheet (with its date-containing columns already converted) as input.
+def create_job_index(sheet):
+    return set(job_fingerprints(job_values(sheet)).tolist())
+
+
+# Function used for checking which rows of a sheet hold a job that is already in the job index. Every job that is not yet in the index is added to
+# it, so a job that appears more than once in the rows is only kept the first time. Rows without any job values are never treated as duplicates. A
+# boolean array that is True for every duplicate row is returned. It uses the rows (with their date-containing columns already converted) and the job
+# index as input.
+def duplicate_job_mask(rows, job_index):
+
+    values = job_values(rows)
+    empty_rows = (values == "").all(axis=1).to_numpy()
+
+    duplicates = np.zeros(len(rows), dtype=bool)
+    for row, fingerprint in enumerate(job_fingerprints(values).tolist()):
+        if empty_rows[row]:
+            continue
+        if fingerprint in job_index:
+            duplicates[row] = True
+        else:
+            job_index.add(fingerprint)
+
+    return duplicates
+
+
+# Function used for loading the saved job index. If the index file does not exist, can not be used, or does not describe the rows the archive sheet
+# held before the update (the archive sheet of the loaded Excel file has the sheet cache key the index was saved with, and the same amount of rows),
+# None is returned. It uses the sheet cache key of the loaded Excel file's archive sheet, the amount of rows in the archive sheet before the update,
+# and the name of the index file as input.
+def load_archive_index(sheet_key, previous_row_count, index_file=ARCHIVE_INDEX_FILE):
+
+    if not os.path.isfile(index_file):
+        detail("No archive index found, the index is created from every archived row.")
+        return None
+
+    try:
+        with open(index_file, 'r') as file:
+            index_state = json.load(file)
+    except (OSError, ValueError):
+        detail("Archive index file could not be read, the archive index will be rebuilt.", logging.WARNING)
+        return None
+
+    # Index files written with a different layout are ignored.
+    if index_state.get('version') != INDEX_VERSION:
+        detail("Archive index file is out of date, the index is created from every archived row.")
+        return None
+
+    if sheet_key is None or index_state.get('sheet key') != sheet_key or index_state.get('archive rows') != previous_row_count:
+        detail("Archive index does not match the archive sheet, the index is created from every archived row.")
+        return None
+
+    return set(index_state['jobs'])
+
+
+# Function used for saving the job index of the updated archive sheet once the updated Excel file has been saved, keyed by the sheet cache key of the
+# archive sheet it describes. It uses the index state (see create_index_state), the sheet cache key of the updated Excel file's archive sheet, and the
+# name of the index file as input.
+def save_archive_index(index_state, sheet_key, index_file=ARCHIVE_INDEX_FILE):
+
+    index_state = dict(index_state, **{'sheet key': sheet_key})
+
+    # The index is written to a temporary file first, so that a run that is interrupted never leaves a half written index file behind.
+    with open(index_file + ".tmp", 'w') as file:
+        json.dump(index_state, file)
+    os.replace(index_file + ".tmp", index_file)
+
+
+# Function used for creating the index state that is saved to the index file. It uses the job index and the updated archive sheet as input.
+def create_index_state(job_index, archive_sheet):
+    return {
+            'version': INDEX_VERSION,
+            'archive rows': len(archive_sheet),
+            'jobs': sorted(job_index)
+           }
+
+
+# Function used for rejecting the rows moved from the main sheet whose job is already in the archive sheet. The job index is loaded from the index
+# file if it describes the rows the archive sheet held before the update, otherwise it is created from those rows. The updated archive sheet without
+# the rejected rows and the job index (holding every job of the returned archive sheet) are returned. It uses the updated archive sheet (with its
+# date-containing columns already converted), the amount of rows in the archive sheet before the update, and the sheet cache key of the loaded Excel
+# file's archive sheet as input.
+def reject_duplicate_jobs(archive_sheet, previous_row_count, sheet_key=None):
+
+    job_index = load_archive_index(sheet_key, previous_row_count)
+    if job_index is None:
+        job_index = create_job_index(archive_sheet.iloc[:previous_row_count])
+
+    duplicates = duplicate_job_mask(archive_sheet.iloc[previous_row_count:], job_index)
+    duplicate_count = int(duplicates.sum())
+
+    if duplicate_count > 0:
+        detail(f"Rows rejected as already archived: {duplicate_count}", logging.WARNING)
+        archive_sheet = archive_sheet.drop(index=archive_sheet.index[previous_row_count:][duplicates]).reset_index(drop=True)
+
+    return archive_sheet, job_index
+
+
+# Function used for removing every duplicate job from the archive sheet, keeping the first row of each job. The archive sheet without the duplicate
+# rows and its job index are returned. It uses the updated archive sheet (with its date-containing columns already converted) as input.
+def dedupe_archive_sheet(archive_sheet):
+
+    job_index = set()
+    duplicates = duplicate_job_mask(archive_sheet, job_index)
+    duplicate_count = int(duplicates.sum())
+
+    detail(f"Duplicate rows removed from archive sheet: {duplicate_count}", logging.WARNING if duplicate_count > 0 else logging.INFO)
+    if duplicate_count > 0:
+        archive_sheet = archive_sheet[~duplicates].reset_index(drop=True)
+
+    return archive_sheet, job_index
@@ -0,0 +1,133 @@
+
+# The purpose of this file is to keep the job time totals of the archive sheet between runs. Rows never change once they have been moved into the
+# archive sheet, so instead of checking every archived job on every run, the archive sheet's totals are saved to a state file beside the Excel file.
+# Each run only adds the rows that were newly moved into the archive sheet to the saved totals, while the main sheet is always checked in full.
+
+# NOTE: The saved state is keyed by the sheet cache key of the archive sheet it was created from (see sheet_cache.py), which changes whenever any row
+#       of the archive sheet is edited. The saved totals are only reused if the archive sheet being updated still has that key (and the same amount
+#       of rows). Otherwise, or if a full rebuild is requested, the totals of the whole archive sheet are created from scratch.
+
+import json
+import logging
+import os
+import pandas as pd
+
+import metrics_engine
+from console_output import detail
+
+
+# The name of the state file that holds the job time totals of the archive sheet.
+ARCHIVE_STATE_FILE = "Fiber Installations Database - Archive Metrics.json"
+
+# The version of the state file layout. State files with a different version are ignored.
+STATE_VERSION = 2
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for converting a cell value into text for a job fingerprint (see archive_index.py). Empty cells become empty text and whole numbers
+# are written the same way whether they were read as integers or decimals. It uses a cell value as input.
+def fingerprint_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# Function used for loading the saved archive state. If the state file does not exist or can not be used, None is returned. It uses the name of the
+# state file as input.
+def load_archive_state(state_file=ARCHIVE_STATE_FILE):
+
+    if not os.path.isfile(state_file):
+        return None
+
+    try:
+        with open(state_file, 'r') as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        detail("Archive metrics state file could not be read, the archive totals will be rebuilt.", logging.WARNING)
+        return None
+
+    # State files written with a different layout or different totals fields are ignored.
+    if state.get('version') != STATE_VERSION or state.get('fields') != metrics_engine.TOTAL_FIELDS:
+        detail("Archive metrics state file is out of date, the archive totals will be rebuilt.", logging.WARNING)
+        return None
+
+    return state
+
+
+# Function used for creating the archive state of the updated archive sheet. It uses the updated archive sheet and the job time totals of the
+# updated archive sheet as input.
+def create_archive_state(archive_sheet, archive_totals):
+    return {
+            'version': STATE_VERSION,
+            'fields': metrics_engine.TOTAL_FIELDS,
+            'archive rows': len(archive_sheet),
+            'totals': archive_totals
+           }
+
+
+# Function used for saving the archive state once the updated Excel file has been saved, keyed by the sheet cache key of the archive sheet it
+# describes. It uses the archive state, the sheet cache key of the updated Excel file's archive sheet, and the name of the state file as input.
+def save_archive_state(state, sheet_key, state_file=ARCHIVE_STATE_FILE):
+
+    state = dict(state, **{'sheet key': sheet_key})
+
+    # The state is written to a temporary file first, so that a run that is interrupted never leaves a half written state file behind.
+    with open(state_file + ".tmp", 'w') as file:
+        json.dump(state, file)
+    os.replace(state_file + ".tmp", state_file)
+
+
+# Function used for checking if the archive state describes the rows the archive sheet held before the update (the archive sheet of the loaded
+# Excel file has the sheet cache key the state was saved with, and the same amount of rows). It uses the archive state, the sheet cache key of the
+# loaded Excel file's archive sheet, and the amount of rows in the archive sheet before the update as input.
+def archive_state_matches(state, sheet_key, previous_row_count):
+    return state is not None and sheet_key is not None and state.get('sheet key') == sheet_key and state['archive rows'] == previous_row_count
+
+
+# Function used for creating the job time totals of the updated archive sheet. If the saved state matches the rows the archive sheet held before the
+# update, only the newly archived rows are checked and added to the saved totals. Otherwise the whole archive sheet is checked. It uses the updated
+# archive sheet, the amount of rows in the archive sheet before the update, the sheet cache key of the loaded Excel file's archive sheet, a boolean
+# that determines if a full rebuild is forced, and the name of the state file as input.
+def create_archive_totals(archive_sheet, previous_row_count, sheet_key, rebuild=False, state_file=ARCHIVE_STATE_FILE):
+
+    state = None if rebuild else load_archive_state(state_file)
+
+    if archive_state_matches(state, sheet_key, previous_row_count):
+        archive_totals = state['totals']
+        metrics_engine.add_sheet_to_totals(archive_totals, archive_sheet.iloc[previous_row_count:])
+        detail(f"Archive totals loaded from state file, {len(archive_sheet) - previous_row_count} newly archived rows checked.")
+        return archive_totals
+
+    if rebuild:
+        detail("Full rebuild requested, every row in the archive sheet checked.")
+    elif state is not None:
+        detail("Archive metrics state file does not match the archive sheet, every row in the archive sheet checked.", logging.WARNING)
+    else:
+        detail("No archive metrics state found, every row in the archive sheet checked.")
+
+    archive_totals = metrics_engine.create_job_time_totals()
+    metrics_engine.add_sheet_to_totals(archive_totals, archive_sheet)
+    return archive_totals
+
+
+# Function used for checking the archive totals against the totals of a full check of the archive sheet. If they do not match, a warning is logged
+# and the totals of the full check are returned so that the analysis sheets are still correct. It uses the archive totals and the updated archive
+# sheet name as input.
+def verify_archive_totals(archive_totals, archive_sheet):
+
+    full_totals = metrics_engine.add_sheet_to_totals(metrics_engine.create_job_time_totals(), archive_sheet)
+
+    mismatched_keys = [key for key_column in (metrics_engine.AREA_ID, metrics_engine.MONTH_ID)
+                       for key in set(archive_totals[key_column]) | set(full_totals[key_column])
+                       if archive_totals[key_column].get(key) != full_totals[key_column].get(key)]
+
+    if mismatched_keys:
+        detail(f"Archive totals do not match a full check for {len(mismatched_keys)} keys: {', '.join(sorted(mismatched_keys)[:10])}",
+               logging.WARNING)
+    else:
+        detail("Archive totals match a full check of the archive sheet.")
+
+    return full_totals
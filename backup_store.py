@@ -0,0 +1,299 @@
+
+# The purpose of this file is to keep the daily backups of the Excel file in a deduplicated backup store, instead of saving a full copy of the Excel
+# file every day. An Excel file is a zip archive of XML parts, and most of those parts (and most of the rows of the archive sheet) are the same from
+# one day to the next:
+#   - The Excel file is never loaded or saved again, each part is read straight from the zip archive.
+#   - Each part is split into chunks. Sheet parts are split after rows whose contents pick them as a boundary, so the chunks only depend on the rows
+#     they hold and an unchanged run of rows is split into the same chunks every day.
+#   - Every row and cell of a sheet part refers to its own row number (<row r="123"> and <c r="A123">), so moving a single row out of the main sheet
+#     would change every row after it. Before a sheet part is split, these row numbers are left out wherever they can be worked out again (a row that
+#     directly follows the previous row, and a cell in the row it belongs to), and they are added back when the backup is restored. An unchanged run
+#     of rows is then split into the same chunks even if rows were added or removed before it.
+#   - Each chunk is stored once, compressed, under the hash of its contents in the "Backups/Objects" directory. A chunk that is already stored is
+#     not stored again.
+#   - The backup of each date is a small manifest file (saved in the month's backup directory) that lists the chunks of every part.
+#   - A backup of any date can be restored into an Excel file (see the --restore-backup option of main.py), and backup directories older than a
+#     set amount of months can be removed, along with every chunk that no remaining backup uses (see the --backup-retention-months option).
+
+# NOTE: A restored Excel file holds exactly the same parts, with exactly the same contents, as the Excel file that was backed up. Only the compression
+#       of the zip archive itself can differ, which does not change the Excel file's contents.
+
+# NOTE: Row numbers elsewhere in a sheet part (such as the row numbers in formulas, or the cell style numbers, which change when the styles part is
+#       rebuilt) are kept as they are, so the rows that hold them are still stored again when they change.
+
+from datetime import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import zipfile
+import zlib
+
+from check_backup_directory_and_run_time_log import create_month_key
+from console_output import detail
+
+
+# The name of the directory that holds every backup, and of the directory inside of it that holds the stored chunks.
+BACKUP_DIRECTORY = "Backups"
+OBJECT_DIRECTORY = os.path.join(BACKUP_DIRECTORY, "Objects")
+
+# The version of the manifest file layout. Manifests of version 1 hold sheet parts with all of their row numbers.
+MANIFEST_VERSION = 2
+
+# The end of every row in a sheet part. A chunk can only end after a row.
+ROW_END = re.compile(rb'</row>')
+
+# The paths of the sheet parts of an Excel file, and the row number references in a sheet part (the first attribute of every row and cell).
+SHEET_PART = re.compile(r'xl/worksheets/[^/]+\.xml')
+ROW_REFERENCE = re.compile(rb'<(row|c) r="([A-Z]*)([0-9]*)"')
+
+# A row ends a chunk if the hash of its contents is divisible by this amount, so each chunk holds this amount of rows on average.
+AVERAGE_CHUNK_ROWS = 64
+
+# The compression level of the stored chunks.
+COMPRESSION_LEVEL = 6
+
+# The format of the date of every backup (mm-dd-YYYY).
+BACKUP_DATE_FORMAT = "%m-%d-%Y"
+
+
+# FUNCTIONS FOR SAVING BACKUPS 👇 --------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating the path of a backup's manifest file. It uses the month key and the date (in mm-dd-YYYY format) of the backup as input.
+def manifest_path(month_key, backup_date):
+    return os.path.join(BACKUP_DIRECTORY, month_key, f"Backup - {backup_date}.json")
+
+
+# Function used for creating the path of a stored chunk. Chunks are spread over subdirectories named after the first two characters of their hash.
+# It uses the hash of the chunk as input.
+def object_path(chunk_hash):
+    return os.path.join(OBJECT_DIRECTORY, chunk_hash[:2], chunk_hash)
+
+
+# Function used for leaving out the row numbers of a sheet part that can be worked out again from the rows before them. A row that directly follows
+# the previous row is given an empty row number (r=""), and a cell in the row it belongs to only keeps its column letters (r="A" instead of r="A123").
+# Every other row number is kept. It uses the contents of a sheet part as input.
+def relative_row_references(data):
+
+    row_number = 0
+
+    def replace_reference(match):
+        nonlocal row_number
+        tag, column, number = match.groups()
+        if tag == b'row' and number and not column:
+            following_row = number == str(row_number + 1).encode()
+            row_number = int(number)
+            return b'<row r=""' if following_row else match.group()
+        if tag == b'row':
+            return match.group()
+        return b'<c r="' + column + b'"' if column and number == str(row_number).encode() else match.group()
+
+    return ROW_REFERENCE.sub(replace_reference, data)
+
+
+# Function used for adding back the row numbers of a sheet part that were left out (see relative_row_references). It uses the contents of a sheet part
+# whose row numbers were left out as input.
+def absolute_row_references(data):
+
+    row_number = 0
+
+    def replace_reference(match):
+        nonlocal row_number
+        tag, column, number = match.groups()
+        if tag == b'row' and not column:
+            row_number = int(number) if number else row_number + 1
+            return match.group() if number else b'<row r="%d"' % row_number
+        if tag == b'row':
+            return match.group()
+        return b'<c r="' + column + str(row_number).encode() + b'"' if column and not number else match.group()
+
+    return ROW_REFERENCE.sub(replace_reference, data)
+
+
+# Function used for splitting the contents of a part into chunks. Every row end is a possible boundary, and a row ends a chunk if the hash of the row
+# picks it. Parts without rows are kept as a single chunk. It uses the contents of a part as input.
+def split_chunks(data):
+
+    chunks = []
+    chunk_start = 0
+    row_start = 0
+
+    for row_end in ROW_END.finditer(data):
+        if zlib.crc32(data[row_start:row_end.end()]) % AVERAGE_CHUNK_ROWS == 0:
+            chunks.append(data[chunk_start:row_end.end()])
+            chunk_start = row_end.end()
+        row_start = row_end.end()
+
+    if chunk_start < len(data) or not chunks:
+        chunks.append(data[chunk_start:])
+
+    # The list of chunks is returned.
+    return chunks
+
+
+# Function used for storing a chunk under the hash of its contents. If the chunk is already stored, it is not stored again. The hash of the chunk and
+# the amount of bytes newly written to the backup store are returned. It uses the chunk as input.
+def store_chunk(chunk):
+
+    chunk_hash = hashlib.sha256(chunk).hexdigest()
+    path = object_path(chunk_hash)
+    if os.path.isfile(path):
+        return chunk_hash, 0
+
+    # The chunk is written to a temporary file first, so that a run that is interrupted never leaves a half written chunk behind.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    compressed_chunk = zlib.compress(chunk, COMPRESSION_LEVEL)
+    with open(path + ".tmp", 'wb') as file:
+        file.write(compressed_chunk)
+    os.replace(path + ".tmp", path)
+
+    return chunk_hash, len(compressed_chunk)
+
+
+# Function used for saving the backup of an Excel file for the current date. Every part of the Excel file is split into chunks (after the row numbers
+# of each sheet part are left out) and each new chunk is stored, and the manifest that lists the chunks of every part is saved last, so a backup is
+# only ever listed once all of its chunks are stored. It uses the Excel file's name, the current month key, and the current date (in mm-dd-YYYY
+# format) as input.
+def save_backup(file_name, month_key, backup_date):
+
+    parts = []
+    chunk_count = 0
+    new_chunk_count = 0
+    stored_bytes = 0
+
+    with zipfile.ZipFile(file_name) as excel_file:
+        for part_info in excel_file.infolist():
+            data = excel_file.read(part_info)
+            relative_rows = SHEET_PART.fullmatch(part_info.filename) is not None
+            if relative_rows:
+                data = relative_row_references(data)
+
+            chunk_hashes = []
+            for chunk in split_chunks(data):
+                chunk_hash, chunk_bytes = store_chunk(chunk)
+                chunk_hashes.append(chunk_hash)
+                chunk_count += 1
+                new_chunk_count += chunk_bytes > 0
+                stored_bytes += chunk_bytes
+
+            parts.append({
+                          'name': part_info.filename,
+                          'date time': part_info.date_time,
+                          'attributes': part_info.external_attr,
+                          'relative rows': relative_rows,
+                          'chunks': chunk_hashes
+                         })
+
+    manifest = {'version': MANIFEST_VERSION, 'file': os.path.basename(file_name), 'parts': parts}
+    path = manifest_path(month_key, backup_date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", 'w') as file:
+        json.dump(manifest, file)
+    os.replace(path + ".tmp", path)
+
+    detail(f"Backup stored: {new_chunk_count} of {chunk_count} chunks were new ({stored_bytes / 1024:,.0f} KB written).")
+
+
+# FUNCTIONS FOR RESTORING BACKUPS 👇 -----------------------------------------------------------------------------------------------------------------#
+
+# Function used for reading a stored chunk. It uses the hash of the chunk as input.
+def read_chunk(chunk_hash):
+    with open(object_path(chunk_hash), 'rb') as file:
+        return zlib.decompress(file.read())
+
+
+# Function used for checking that a backup date is written in mm-dd-YYYY format (with leading zeros, the same as the names of the backup files) and
+# is a real date. If it is not, a ValueError that shows the expected format is raised. It uses the date of a backup as input.
+def check_backup_date(backup_date):
+    try:
+        valid = datetime.strptime(backup_date, BACKUP_DATE_FORMAT).strftime(BACKUP_DATE_FORMAT) == backup_date
+    except ValueError:
+        valid = False
+    if not valid:
+        raise ValueError(f"Invalid backup date: {backup_date!r} (expected a date in mm-dd-YYYY format, for example 10-01-2026)")
+
+
+# Function used for restoring the backup of a date into an Excel file. Every part listed in the backup's manifest is rebuilt from its chunks (with the
+# row numbers of each sheet part added back) and written into a new zip archive in the same order. Backups saved as a full copy of the Excel file
+# (before the backup store was used) are copied as they are. The date is checked before any backup is looked for. It uses the date of the backup
+# (in mm-dd-YYYY format) and the name of the Excel file to restore it to as input.
+def restore_backup(backup_date, file_name):
+
+    check_backup_date(backup_date)
+    month_key = create_month_key(backup_date)
+    path = manifest_path(month_key, backup_date)
+
+    if not os.path.isfile(path):
+        full_copy = os.path.join(BACKUP_DIRECTORY, month_key, f"Backup - {backup_date}.xlsx")
+        if not os.path.isfile(full_copy):
+            raise FileNotFoundError(f"No backup found for date: {backup_date}")
+        shutil.copyfile(full_copy, file_name)
+        return
+
+    with open(path, 'r') as file:
+        manifest = json.load(file)
+
+    with zipfile.ZipFile(file_name, 'w', zipfile.ZIP_DEFLATED) as excel_file:
+        for part in manifest['parts']:
+            part_info = zipfile.ZipInfo(part['name'], date_time=tuple(part['date time']))
+            part_info.compress_type = zipfile.ZIP_DEFLATED
+            part_info.external_attr = part['attributes']
+            data = b"".join(read_chunk(chunk_hash) for chunk_hash in part['chunks'])
+            if part.get('relative rows', False):
+                data = absolute_row_references(data)
+            excel_file.writestr(part_info, data)
+
+
+# FUNCTIONS FOR PRUNING BACKUPS 👇 -------------------------------------------------------------------------------------------------------------------#
+
+# Function used for finding the month each backup directory belongs to. A dictionary that associates each backup directory's name with the first day
+# of its month is returned. Directories that are not named after a month (such as the chunk directory) are left out.
+def backup_months():
+
+    months = {}
+    for directory_name in os.listdir(BACKUP_DIRECTORY):
+        try:
+            months[directory_name] = datetime.strptime(directory_name, "%b %Y")
+        except ValueError:
+            continue
+
+    return months
+
+
+# Function used for removing every stored chunk that is not listed in the manifest of any remaining backup. The amount of removed chunks is returned.
+def remove_unused_chunks():
+
+    used_chunks = set()
+    for month_directory in backup_months():
+        for file_name in os.listdir(os.path.join(BACKUP_DIRECTORY, month_directory)):
+            if file_name.endswith(".json"):
+                with open(os.path.join(BACKUP_DIRECTORY, month_directory, file_name), 'r') as file:
+                    for part in json.load(file)['parts']:
+                        used_chunks.update(part['chunks'])
+
+    removed_count = 0
+    if os.path.isdir(OBJECT_DIRECTORY):
+        for directory_path, _, file_names in os.walk(OBJECT_DIRECTORY):
+            for file_name in file_names:
+                if file_name not in used_chunks:
+                    os.remove(os.path.join(directory_path, file_name))
+                    removed_count += 1
+
+    return removed_count
+
+
+# Function used for removing the backup directories of every month older than the amount of months to keep (counting the current month), along with
+# every stored chunk that is no longer used by a remaining backup. It uses the amount of months to keep and the current month key as input.
+def prune_backups(months_to_keep, month_key):
+
+    current_month = datetime.strptime(month_key, "%b %Y")
+    removed_months = []
+    for directory_name, month in backup_months().items():
+        if (current_month.year - month.year) * 12 + current_month.month - month.month >= months_to_keep:
+            shutil.rmtree(os.path.join(BACKUP_DIRECTORY, directory_name))
+            removed_months.append(directory_name)
+
+    if removed_months:
+        removed_chunks = remove_unused_chunks()
+        detail(f"Removed backups of {', '.join(removed_months)} and {removed_chunks} unused chunks.")
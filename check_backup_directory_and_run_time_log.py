@@ -53,7 +53,7 @@ def check_backup_directory_and_run_time_log():
         os.mkdir(f"Backups/{month_key}")
     
     # The function checks if the current month already has a run time log present. If not, then one is created.
-    if os.path.isdir(f"Run Times/{month_key}.txt"):
+    if os.path.isfile(f"Run Times/{month_key}.txt"):
         pass
     else:
         with open(f'Run Times\\{month_key}.txt', 'w') as f:
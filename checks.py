@@ -4,76 +4,71 @@
 import pandas as pd
 from datetime import datetime
 
-# Function used to check the amount of time (in days) a fiber installation job took to be completed. This function is factoring the using the "Drop 
-# Installation Date" column as the starting time. It uses a row number as input.
-# NOTE: if the specified row does not pass every one of the checks, the function will return None.
-def start_to_complete_time_check(row):
-
-    # The value of the "Status" column in the specified row is saved to a variable
-    status = row[14]
-
-    # The "Status" column's value is checked to see if the value equals the string "completed" (case-insensitive).
-    if type(status) == str and status.lower() == "completed": 
-
-            # The values of the "Drop Installation Date" and "Job Completed Date" columns in the specified row are saved to variables.
-            job_start = row[1]
-            job_complete = row[6]
-
-            # The data types of both date values are check to see if they are either pandas timestamp or datetime objects.
-            if type(job_start) == pd._libs.tslibs.timestamps.Timestamp or type(job_start) == datetime:
-                if type(job_complete) == pd._libs.tslibs.timestamps.Timestamp or type(job_complete) == datetime:
-
-                    # If both variables are one of the two data types, then the job's completion time is calculated and saved to a variable.
-                    # the two times.
-                    difference = str(job_complete - job_start).split(" ")
-
-                    # To avoid both outliers and date typos, for example a job taking a year to complete, only job completion times of between 0 
-                    # and 100 days are returned.
-                    if 0 <= int(difference[0]) <= 100:
-                        return int(difference[0])
-
-
-# Function used to check the amount of time (in days) a fiber installation job took to be marked after an 811 call was made. This function is 
-# factoring the using the "811 Called in Date" column as the call time and  the "811 Marked Date" column as the mark time. It uses a row number 
-# as input.
-# NOTE: if the specified row does not pass both of the checks, the function will return None.
-def call811_to_mark811_time_check(row):
-
-    # The values of the "811 Called in Date" and "811 Mark Date" columns in the specified row are saved to variables.
-    job_call811 = row[2]
-    job_mark811 = row[4]
-
-    # The data types of both date values are check to see if they are either pandas timestamp or datetime objects.
-    if type(job_call811) == pd._libs.tslibs.timestamps.Timestamp or type(job_call811) == datetime:
-        if type(job_mark811) == pd._libs.tslibs.timestamps.Timestamp or type(job_mark811) == datetime:
- 
-            # If both variables are one of the two data types, then the job's call to mark time is calculated and saved to a variable.
-            difference = str(job_mark811 - job_call811).split(" ")
-
-            # To avoid both outliers and date typos, for example a call taking a year to be marked, only call to mark times of between 0 and 
-            # 100 days are returned.
-            if 0 <= int(difference[0]) <= 100:
-                return int(difference[0])
-        
-
-# Function used to check the amount of time (in days) a fiber installation job took to be completed after an  811 call was marked. This function 
-# is factoring the using the "811 Marked Date" column as the mark time and the "Job Completed Date" column as the completion time. It uses a row 
-# number as input.
-# NOTE: if the specified row does not pass both of the checks, the function will return None.
-def mark811_to_complete_time_check(row):
-
-    # The values of the "811 Mark Date" and "Job Completed Date" columns in the specified row are saved to variables.
-    job_mark811 = row[4]
-    job_complete = row[6]
-
-    # The data types of both date values are check to see if they are either pandas timestamp or datetime objects.
-    if type(job_mark811) == pd._libs.tslibs.timestamps.Timestamp or type(job_mark811) == datetime:
-        if type(job_complete) == pd._libs.tslibs.timestamps.Timestamp or type(job_complete) == datetime:
- 
-            # If both variables are one of the two data types, then the job's mark to completion time is calculated and saved to a variable.
-            difference = str(job_complete - job_mark811).split(" ")
-
-            # To avoid both outliers and date typos, for example a marked job taking a year to be completed, only 
-            # mark to completion times of between 0 and 100 days are returned.
-            if 0 <= int(difference[0]) <= 100:
-                return int(difference[0])
+from job_frame_schema import status_values
+
+# COLUMNAR TIME CHECKS 👇 ---------------------------------------------------------------------------------------------------------------------------#
+
+# The functions below perform the three time checks (start to completion, 811 call to 811 mark, and 811 mark to completion) on every row of a sheet
+# at once. Each time check returns a column of whole day values (one per row), where every row that does not pass the checks is left empty (<NA>).
+
+# The positions of the columns used by the time checks.
+DROP_INSTALLATION_DATE = 0
+CALL811_DATE = 1
+MARK811_DATE = 3
+JOB_COMPLETED_DATE = 5
+STATUS = 13
+
+# The names given to the three time check columns.
+START_TO_COMPLETE = 'Start to Complete'
+CALL811_TO_MARK811 = 'Call811 to Mark811'
+MARK811_TO_COMPLETE = 'Mark811 to Complete'
+
+
+# Function used to check which values of a "Status" column equal the string "completed" (case-insensitive). Each distinct status is only lowercased
+# once (see job_frame_schema.py). It uses a "Status" column as input.
+def completed_status_mask(status):
+    return (status_values(status) == "completed").astype(bool)
+
+
+# Function used to reduce a date-containing column to its date values. Any value that is not a pandas timestamp or datetime object (such as a ? or a
+# note) is treated as missing. It uses a date-containing column as input.
+def date_values(column):
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    return pd.to_datetime(column.where(column.map(type).isin([pd.Timestamp, datetime])))
+
+
+# Function used to calculate the amount of time (in days) between two date columns. To avoid both outliers and date typos, only times of between 0 
+# and 100 days are kept. It uses the start date column and the end date column as input.
+def interval_days(start_dates, end_dates):
+    days = (end_dates - start_dates).dt.days.astype('Int64')
+    return days.where((days >= 0) & (days <= 100))
+
+
+# Function used to check the amount of time (in days) every fiber installation job in a sheet took to be completed. Only jobs with a "completed"
+# status are given a value. It uses a sheet as input.
+def start_to_complete_times(sheet):
+    days = interval_days(date_values(sheet.iloc[:, DROP_INSTALLATION_DATE]), date_values(sheet.iloc[:, JOB_COMPLETED_DATE]))
+    return days.where(completed_status_mask(sheet.iloc[:, STATUS]))
+
+
+# Function used to check the amount of time (in days) every fiber installation job in a sheet took to be marked after an 811 call was made. It uses
+# a sheet as input.
+def call811_to_mark811_times(sheet):
+    return interval_days(date_values(sheet.iloc[:, CALL811_DATE]), date_values(sheet.iloc[:, MARK811_DATE]))
+
+
+# Function used to check the amount of time (in days) every fiber installation job in a sheet took to be completed after an 811 call was marked. It
+# uses a sheet as input.
+def mark811_to_complete_times(sheet):
+    return interval_days(date_values(sheet.iloc[:, MARK811_DATE]), date_values(sheet.iloc[:, JOB_COMPLETED_DATE]))
+
+
+# Function used to perform all three time checks on every row of a sheet in one call. A DataFrame containing one column of whole day values for each
+# time check is returned. It uses a sheet as input.
+def time_checks(sheet):
+    return pd.DataFrame({
+        START_TO_COMPLETE: start_to_complete_times(sheet),
+        CALL811_TO_MARK811: call811_to_mark811_times(sheet),
+        MARK811_TO_COMPLETE: mark811_to_complete_times(sheet)
+    })
@@ -0,0 +1,61 @@
+
+# The purpose of this file is to control how the script reports its progress. The script can be run in one of two modes:
+#   - Interactive mode (default): Progress messages are printed to the console and the script pauses for a second after each step so the messages
+#     can be read as the script runs.
+#   - Headless mode: Used for scheduled runs. Progress messages are written as leveled log records and the script never pauses.
+
+# NOTE: The time spent pausing in interactive mode is tracked so that it can be left out of the run time that is recorded in the run time log.
+
+import logging
+from time import sleep, time
+
+
+# The logger used by every component of the script when running in headless mode.
+logger = logging.getLogger("fiber_automation")
+
+# Variables that hold the current output mode and the total amount of time (in seconds) spent pausing during the current run.
+headless = False
+paused_time = 0.0
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for setting the output mode of the current run. It uses a boolean that determines if the script is running in headless mode and
+# the name of the minimum log level to write as input.
+def configure_output(headless_mode, log_level="INFO"):
+
+    global headless
+    headless = headless_mode
+
+    # In headless mode every log record is written as a single line containing its time, level, and message.
+    if headless:
+        logging.basicConfig(level=log_level.upper(), format="%(asctime)s level=%(levelname)s %(message)s", datefmt="%Y-%m-%dT%H:%M:%S")
+
+
+# Function used for reporting the start or end of a step. In interactive mode the message is printed as its own banner, while in headless mode it is
+# logged. It uses the message and, optionally, a log level as input.
+def announce(message, level=logging.INFO):
+    if headless:
+        logger.log(level, message)
+    else:
+        print(f"\n{message}")
+
+
+# Function used for reporting a detail line that belongs to the previous banner. It uses the message and, optionally, a log level as input.
+def detail(message, level=logging.INFO):
+    if headless:
+        logger.log(level, message)
+    else:
+        print(message)
+
+
+# Function used for pausing the script for a second after a step. The pause only happens in interactive mode and the time spent pausing is added
+# to the total paused time.
+def pause():
+
+    global paused_time
+
+    if not headless:
+        pause_start = time()
+        sleep(1)
+        paused_time += time() - pause_start
@@ -0,0 +1,73 @@
+
+# The purpose of this file is to give the main and archive sheet DataFrames a typed loading schema. The "CO" column (which contains the work area ID
+# abbreviations) and the "Status" column only ever hold a handful of distinct values, repeated on every row. Both columns are stored as categorical
+# columns, so that each row only holds a small integer code that points to its value:
+#   - The memory used by both columns no longer depends on the length of the text in each row.
+#   - Each distinct area ID and status is normalized (stripped of spaces, capitalized, or lowercased) a single time, instead of once for every row.
+#     The normalized values are themselves categorical columns that share the codes of the original column.
+
+# NOTE: The categorical columns keep the original values of each cell (including their spacing, capitalization, and data type), so the values written
+#       into the updated Excel file are unchanged. Only the normalized columns that the checks are made on hold the cleaned up values.
+
+# NOTE: The date-containing columns are stored as date values (datetime64) by normalize_dates.py, and every other column (such as the "Notes" column)
+#       keeps the storage Pandas gives it when the sheet is read.
+
+import numpy as np
+import pandas as pd
+
+
+# The positions of the columns stored as categorical columns.
+AREA_ID = 7
+STATUS = 13
+CATEGORY_COLUMNS = [AREA_ID, STATUS]
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for applying the loading schema to the main or archive sheet. The "CO" and "Status" columns are converted to categorical columns that
+# hold the same values. The sheet is changed in place and returned. It uses the main or archive sheet as input.
+def apply_job_schema(sheet):
+    for position in CATEGORY_COLUMNS:
+        if position < len(sheet.columns) and not isinstance(sheet.iloc[:, position].dtype, pd.CategoricalDtype):
+            sheet.isetitem(position, sheet.iloc[:, position].astype('category'))
+    return sheet
+
+
+# Function used for normalizing every value of a column by normalizing each distinct value of the column only once. A categorical column holding the
+# normalized value of every row is returned, where values that the normalizing function returns None for are left empty. It uses a column (which is
+# converted to a categorical column first if it is not one already) and the function that normalizes a single value as input.
+def normalize_categories(column, normalize):
+
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype('category')
+
+    # Each distinct value is normalized, and distinct values that share a normalized value are given the same code.
+    normalized_values = pd.Categorical([normalize(value) for value in column.cat.categories])
+
+    # The code of each row is swapped for the code of its normalized value. (Empty rows have a code of -1, which picks the -1 appended at the end.)
+    codes = np.append(normalized_values.codes, -1)[column.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=normalized_values.dtype), index=column.index)
+
+
+# Function used for normalizing a single area ID. Area IDs are stripped of leading / trailing spaces and capitalized, while any value that is not a
+# string is left empty. It uses a "CO" column value as input.
+def normalize_area_ID(value):
+    return value.strip().upper() if type(value) == str else None
+
+
+# Function used for normalizing a single status. Statuses are lowercased, while any value that is not a string is left empty. It uses a "Status"
+# column value as input.
+def normalize_status(value):
+    return value.lower() if type(value) == str else None
+
+
+# Function used for creating the categorical column that holds the normalized area ID of every row in a sheet. It uses the main or archive sheet as
+# input.
+def area_ID_values(sheet):
+    return normalize_categories(sheet.iloc[:, AREA_ID], normalize_area_ID)
+
+
+# Function used for creating the categorical column that holds the normalized status of every row in a "Status" column. It uses a "Status" column
+# as input.
+def status_values(status):
+    return normalize_categories(status, normalize_status)
@@ -0,0 +1,174 @@
+
+# The purpose of this file is to load the Fiber Installations Database Excel file a single time per run and to share that one parsed copy with
+# every stage of the automation process. The output stage (see save_post_update.py) writes the updated data back into the very same workbook, so it
+# is loaded with its formulas and external links kept, the same way pd.ExcelWriter(mode='a') loads it. The Pandas stages receive DataFrames built
+# from the cells of that same loaded workbook, converted into the values Pandas reads from them.
+
+# NOTE: A formula cell of the loaded workbook holds its formula instead of the value Excel saved for it. If the main or archive sheet holds formula
+#       cells, only the saved values of those cells are read from a values view of the Excel file (up to the row of the last formula cell), and this
+#       extra read is counted as a parse. The main and archive sheets normally hold no formulas, in which case the Excel file is only parsed once.
+
+# NOTE: For very large archive sheets, the Excel file can instead be loaded in OpenpyXL's read-only mode, in which case a sheet is never held in memory
+#       as a whole. Its rows are read from the Excel file as they are needed and handed over as DataFrames of a fixed amount of rows (chunks).
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_FORMULA, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
+
+
+# A counter that keeps track of how many times an Excel file has been parsed during the current run. It is reported alongside the stage run times
+# so that it can be verified that the workbook is only parsed once.
+parse_count = 0
+
+# The amount of rows in each chunk of a sheet that is read in read-only mode.
+CHUNK_SIZE = 10000
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for loading the Excel file into OpenpyXL. This is the only place in the script where the Excel file is parsed in full. It uses the
+# Excel file's name as input.
+def load_fiber_workbook(file_name):
+
+    global parse_count
+
+    # The workbook is loaded with its formulas and external links, so that the sheets the script does not update are saved exactly as they were.
+    workbook = load_workbook(file_name)
+    parse_count += 1
+
+    # The loaded workbook is returned.
+    return workbook
+
+
+# Function used for creating a Pandas DataFrame from one of the sheets of an already loaded workbook. The already parsed cells are converted into the
+# values Pandas reads from them, so the Excel file is not parsed a second time. Formula cells are given the values Excel saved for them (see
+# read_formula_values). It uses the loaded workbook, a sheet name, and the Excel file's name (needed if the sheet holds formula cells) as input.
+def read_sheet_frame(workbook, sheet_name, file_name=None):
+
+    # Pandas closes a workbook loaded in read-only mode once it is done reading it, so the sheet is instead read as a single chunk.
+    if workbook.read_only:
+        return next(iter_sheet_chunks(workbook, sheet_name, chunk_size=None))
+
+    rows = []
+    formula_cells = []
+    for row_number, row in enumerate(workbook[sheet_name].iter_rows()):
+        rows.append([convert_cell(cell) for cell in row])
+        formula_cells.extend((row_number, column_number) for column_number, cell in enumerate(row) if cell.data_type == TYPE_FORMULA)
+
+    if formula_cells and file_name is not None:
+        for (row_number, column_number), value in read_formula_values(file_name, sheet_name, formula_cells).items():
+            rows[row_number][column_number] = value
+
+    return next(iter_row_chunks(iter(rows), chunk_size=None))
+
+
+# Function used for reading the values Excel saved for the formula cells of a sheet, from a values view of the Excel file. Only the rows up to the
+# row of the last formula cell are read. A dictionary that associates the position (row and column, counting from 0) of each formula cell with the
+# value Pandas reads from it is returned. It uses the Excel file's name, a sheet name, and the list of formula cell positions as input.
+def read_formula_values(file_name, sheet_name, formula_cells):
+
+    global parse_count
+
+    values_workbook = load_workbook(file_name, read_only=True, data_only=True, keep_links=False)
+    parse_count += 1
+
+    sheet = values_workbook[sheet_name]
+    sheet.reset_dimensions()
+    positions = set(formula_cells)
+    formula_values = {}
+    for row_number, row in enumerate(sheet.iter_rows(max_row=max(row_number for row_number, _ in positions) + 1)):
+        for column_number, cell in enumerate(row):
+            if (row_number, column_number) in positions:
+                formula_values[(row_number, column_number)] = convert_cell(cell)
+
+    values_workbook.close()
+    return formula_values
+
+
+# Function used for loading the Excel file into OpenpyXL in read-only mode. The cells of each sheet are only read from the Excel file when the sheet's
+# rows are iterated over. The workbook is loaded with the same options Pandas uses when it reads an Excel file (cell values instead of formulas, no
+# external links). It uses the Excel file's name as input.
+def load_streaming_workbook(file_name):
+
+    global parse_count
+
+    workbook = load_workbook(file_name, read_only=True, data_only=True, keep_links=False)
+    parse_count += 1
+
+    # The loaded workbook is returned.
+    return workbook
+
+
+# Function used for converting an OpenpyXL cell into the value Pandas reads from it. Empty cells become empty strings, error cells become NaN, and
+# whole numbers are read as integers. It uses an OpenpyXL cell as input.
+def convert_cell(cell):
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        whole_value = int(cell.value)
+        return whole_value if whole_value == cell.value else float(cell.value)
+    return cell.value
+
+
+# Function used for creating a DataFrame from the header row and a chunk of rows. The rows are parsed the same way pd.read_excel() parses a whole sheet.
+# It uses the header row, the list of rows, and the row number of the chunk's first row (counting from 0 under the header) as input.
+def create_chunk_frame(header_row, rows, first_row):
+
+    # Every row is given the same amount of cells as the widest row.
+    width = max([len(header_row)] + [len(row) for row in rows])
+    rows = [header_row + [""] * (width - len(header_row))] + [row + [""] * (width - len(row)) for row in rows]
+
+    chunk = TextParser(rows, header=0, skip_blank_lines=False).read()
+    chunk.index = pd.RangeIndex(first_row, first_row + len(chunk))
+    return chunk
+
+
+# Function used for reading a sheet of a workbook loaded in read-only mode as DataFrames of a fixed amount of rows (see iter_row_chunks). It uses the
+# loaded workbook, a sheet name, and, optionally, the amount of rows in each chunk (None reads the whole sheet as a single chunk) as input.
+def iter_sheet_chunks(workbook, sheet_name, chunk_size=CHUNK_SIZE):
+    sheet = workbook[sheet_name]
+    sheet.reset_dimensions()
+    return iter_row_chunks(([convert_cell(cell) for cell in row] for row in sheet.iter_rows()), chunk_size)
+
+
+# Function used for parsing the rows of a sheet into DataFrames of a fixed amount of rows. The chunks are yielded one at a time and are numbered the
+# same way as the rows of the DataFrame pd.read_excel() creates, so together they hold the exact same rows. Empty rows at the end of the sheet are
+# left out, and a sheet without any rows yields a single empty chunk. It uses an iterator of the sheet's rows (each a list of the values Pandas reads
+# from its cells, starting with the header row) and, optionally, the amount of rows in each chunk (None reads the whole sheet as a single chunk) as
+# input.
+# NOTE: Columns that have no column name are named by Pandas ("Unnamed: 14"), so a chunk can only hold such a column if one of its own rows has a
+#       value in it.
+def iter_row_chunks(rows, chunk_size=CHUNK_SIZE):
+
+    # The header row holds the column names of every chunk.
+    header_row = list(next(rows, []))
+    while header_row and header_row[-1] == "":
+        header_row.pop()
+
+    chunk_rows = []
+    empty_rows = []
+    first_row = 0
+    for converted_row in rows:
+        converted_row = list(converted_row)
+        while converted_row and converted_row[-1] == "":
+            converted_row.pop()
+
+        # Empty rows are held back until a row with data follows them, so that empty rows at the end of the sheet are never yielded.
+        if not converted_row:
+            empty_rows.append(converted_row)
+            continue
+        chunk_rows.extend(empty_rows)
+        empty_rows = []
+        chunk_rows.append(converted_row)
+
+        while chunk_size is not None and len(chunk_rows) >= chunk_size:
+            yield create_chunk_frame(header_row, chunk_rows[:chunk_size], first_row)
+            first_row += chunk_size
+            chunk_rows = chunk_rows[chunk_size:]
+
+    if chunk_rows or first_row == 0:
+        yield create_chunk_frame(header_row, chunk_rows, first_row)
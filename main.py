@@ -13,18 +13,92 @@
 # NOTE: The data in this Excel file is NOT actual company data as it has been replaced with sample data, but the
 #       functionality is identical to the currently in-use version.
 
-import pandas as pd
-from openpyxl import load_workbook
-
+import argparse
 import warnings
-from time import sleep, time
+from time import time
 
+import console_output
+import load_workbook_data
+from console_output import configure_output, announce, pause
 from check_backup_directory_and_run_time_log import check_backup_directory_and_run_time_log
+from backup_store import save_backup, restore_backup, prune_backups
+from load_workbook_data import load_fiber_workbook, load_streaming_workbook, CHUNK_SIZE
+from archive_metrics_state import create_archive_totals, verify_archive_totals, create_archive_state, save_archive_state, \
+                                  load_archive_state, archive_state_matches
+from metrics_engine import create_job_time_totals, add_sheet_to_totals, merge_job_time_totals
+from stage_timing import start_stage, end_stage, report_stage_times
 from update_main_and_archive import update_main_and_archive
 from update_area_metrics import update_area_metrics
 from update_month_metrics import update_month_metrics
-from restore_main_and_archive import restore_main_and_archive
-from restore_analysis_sheets import restore_analysis_sheets
+from save_post_update import save_post_update, create_output_workbook, find_extra_sheets
+from write_only_output import save_write_only
+from sheet_cache import sheet_cache_keys, read_cached_sheet_frame, stage_cached_frame, save_cache_keys
+from job_frame_schema import apply_job_schema
+from reader_backends import READER_BACKENDS, create_sheet_reader, benchmark_reader_backends
+from stream_archive import update_main_and_stream_archive, scan_archive_stream
+from archive_calendar import create_archive_calendar, load_archive_calendar, save_archive_calendar, preview_archival
+from archive_index import create_index_state, save_archive_index, dedupe_archive_sheet
+
+
+# Read the command line options. Scheduled runs use --headless to skip the pauses between steps and to write leveled log records instead of console
+# banners.
+parser = argparse.ArgumentParser(description="Daily update of the Fiber Installations Database Excel file.")
+parser.add_argument("--headless", action="store_true", help="run without pauses and write log records instead of console banners")
+parser.add_argument("--archive-after-days", type=int, default=90,
+                    help="amount of days a job has to be completed for before it is moved to the archive sheet (default: 90)")
+parser.add_argument("--log-level", default="INFO", help="minimum log level written in headless mode (default: INFO)")
+parser.add_argument("--rebuild-metrics", action="store_true", help="ignore the saved archive totals and check every row in the archive sheet")
+parser.add_argument("--verify-metrics", action="store_true", help="check the saved archive totals against a full check of the archive sheet")
+parser.add_argument("--stream-archive", action="store_true",
+                    help="read the archive sheet in chunks of rows instead of loading it into memory as a whole")
+parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                    help=f"amount of archive sheet rows in each chunk when streaming (default: {CHUNK_SIZE})")
+parser.add_argument("--full-restyle", action="store_true",
+                    help="restore the format of every row in the archive sheet instead of only the newly archived rows (repair mode)")
+parser.add_argument("--write-only", action="store_true",
+                    help="write the updated Excel file one row at a time with every cell already styled, using constant memory")
+parser.add_argument("--reader", choices=READER_BACKENDS, default=READER_BACKENDS[0],
+                    help=f"backend used to build the main and archive sheet DataFrames (default: {READER_BACKENDS[0]})")
+parser.add_argument("--benchmark-readers", action="store_true",
+                    help="compare the rows read per second of every reader backend on the Excel file instead of running the update")
+parser.add_argument("--dedupe-archive", action="store_true",
+                    help="remove every duplicate job already in the archive sheet, keeping the first row of each job (repair mode)")
+parser.add_argument("--preview-archival", action="store_true",
+                    help="list the amount of main sheet jobs that become due for archival on each date instead of running the update")
+parser.add_argument("--restore-backup", metavar="mm-dd-YYYY",
+                    help="restore the backup of the given date into an Excel file instead of running the update")
+parser.add_argument("--backup-retention-months", type=int, default=0,
+                    help="amount of months of backups to keep, counting the current month (default: 0, every backup is kept)")
+options = parser.parse_args()
+configure_output(options.headless, options.log_level)
+
+# Compare the reader backends on the Excel file instead of running the update, if requested. Nothing is backed up, updated, or saved.
+if options.benchmark_readers:
+    benchmark_reader_backends("Fiber Installations Database - Pre Update.xlsx", ['Main Installs', '>90 Day Archive'])
+    raise SystemExit
+
+# List the upcoming archivals of the main sheet instead of running the update, if requested. Nothing is backed up, updated, or saved.
+if options.preview_archival:
+    warnings.filterwarnings('ignore', category=FutureWarning)
+    preview_archival("Fiber Installations Database - Pre Update.xlsx", options.archive_after_days, options.reader)
+    raise SystemExit
+
+# Restore the backup of the given date instead of running the update, if requested. Nothing is backed up, updated, or saved.
+if options.restore_backup:
+    try:
+        restore_backup(options.restore_backup, f"Fiber Installations Database - Restored {options.restore_backup}.xlsx")
+    except ValueError as error:
+        parser.error(str(error))
+    announce(f"Backup for {options.restore_backup} restored!")
+    raise SystemExit
+
+# A streamed run and a write-only run build the updated Excel file in a new workbook, which can only hold the four updated sheets, so both are refused
+# for an Excel file that holds any other sheet (see save_post_update.py).
+if options.stream_archive or options.write_only:
+    extra_sheets = find_extra_sheets("Fiber Installations Database - Pre Update.xlsx")
+    if extra_sheets:
+        parser.error(f"{'--stream-archive' if options.stream_archive else '--write-only'} can not keep the sheets the script does not update: "
+                     f"{', '.join(extra_sheets)}")
 
 
 # Step 1. Save a backup for the current iteration👇 --------------------------------------------------------------#
@@ -32,101 +106,194 @@ from restore_analysis_sheets import restore_analysis_sheets
 start_time = time()
 
 # Verify that the current month's backup directory and run time log exist.
-print("\nChecking if backup directory exists...")
+announce("Checking if backup directory exists...")
 current_date, month_key = check_backup_directory_and_run_time_log()
-print(f"\nBackup directory for {month_key} verified!")
-sleep(1)
-
-# Load the Excel file in OpenpyXL
-print("\nLoading Excel file in OpenpyXL...")
-workbook = load_workbook("Fiber Installations Database - Pre Update.xlsx")
-print("\nExcel file loaded in OpenpyXL!")
-sleep(1)
+announce(f"Backup directory for {month_key} verified!")
+pause()
 
-# Save a backup of the Excel file for the current date.
-print(f"\nSaving backup of Excel file for date: {current_date}...")
-workbook.save(f"Backups\\{month_key}\\Backup - {current_date}.xlsx")
-print(f"\nBackup for {current_date} created!")
-sleep(1)
+# Save a backup of the Excel file for the current date in the backup store. The parts of the Excel file are read as they are, so it does not have to
+# be parsed to create the backup, and only the chunks that changed since the previous backups are stored (see backup_store.py). Backups older than
+# the amount of months to keep are then removed, if requested.
+announce(f"Saving backup of Excel file for date: {current_date}...")
+start_stage("Save backup")
+save_backup("Fiber Installations Database - Pre Update.xlsx", month_key, current_date)
+if options.backup_retention_months > 0:
+    prune_backups(options.backup_retention_months, month_key)
+end_stage("Save backup")
+announce(f"Backup for {current_date} created!")
+pause()
 
 
 # Step 2. Modify sheet data with Pandas 👇 -----------------------------------------------------------------------#
 
 warnings.filterwarnings('ignore', category=FutureWarning)
 
-# Load the main and archive sheets as Pandas dataframes
-print("\nLoading Excel sheets in Pandas...")
-df_main = pd.read_excel("Fiber Installations Database - Pre Update.xlsx", sheet_name='Main Installs')
-df_90day = pd.read_excel("Fiber Installations Database - Pre Update.xlsx", sheet_name='>90 Day Archive')
-print("\nExcel sheets loaded in Pandas!")
-sleep(1)
+# Load the Excel file in OpenpyXL. This is the only time the Excel file is parsed in full, every following stage works off of this loaded workbook.
+# The workbook keeps its formulas and external links so that the sheets the script does not update are saved as they were, and the DataFrames are
+# built from its already parsed cells (see load_workbook_data.py). When the archive sheet is streamed, the Excel file is only loaded in read-only
+# mode so that the archive sheet is only read as its rows are needed. The updated Excel file is not built inside of the loaded workbook in write-only
+# mode either, so the Excel file is also only loaded in read-only mode then.
+announce("Loading Excel file in OpenpyXL...")
+start_stage("Load workbook")
+if options.stream_archive or options.write_only:
+    workbook = load_streaming_workbook("Fiber Installations Database - Pre Update.xlsx")
+else:
+    workbook = load_fiber_workbook("Fiber Installations Database - Pre Update.xlsx")
+end_stage("Load workbook")
+announce("Excel file loaded in OpenpyXL!")
+pause()
+
+# Load the main and archive sheets as Pandas dataframes. A sheet that has not changed since the last run is loaded from the sheet cache, otherwise it
+# is built with the selected reader backend (see reader_backends.py). When the archive sheet is streamed, only the main sheet is loaded. The "CO" and
+# "Status" columns of both sheets are then stored as categorical columns (see job_frame_schema.py).
+announce("Loading Excel sheets in Pandas...")
+start_stage("Build Pandas dataframes")
+cache_keys = sheet_cache_keys("Fiber Installations Database - Pre Update.xlsx")
+read_frame = create_sheet_reader(options.reader, workbook, "Fiber Installations Database - Pre Update.xlsx")
+df_main = apply_job_schema(read_cached_sheet_frame(read_frame, 'Main Installs', cache_keys))
+df_90day = None if options.stream_archive else apply_job_schema(read_cached_sheet_frame(read_frame, '>90 Day Archive', cache_keys))
+end_stage("Build Pandas dataframes")
+announce("Excel sheets loaded in Pandas!")
+pause()
+
+# Update the data in the main and archive sheets. The rows due for archival are found from the saved archive calendar if it describes the main sheet
+# (see archive_calendar.py). Rows whose job is already in the archive sheet are not archived a second time (see archive_index.py), and duplicate jobs
+# already in the archive sheet are removed if requested. When the archive sheet is streamed, the updated archive sheet is created one chunk at a time
+# as it is read through.
+announce("Updating Main and Archive Sheet...")
+start_stage("Update main and archive sheets")
+calendar = load_archive_calendar(cache_keys.get('Main Installs'))
+main_sheet_unedited = calendar is not None
+main_rows_pre_update = len(df_main)
+if options.stream_archive:
+    updated_main, archive_stream = update_main_and_stream_archive(df_main, workbook, options.archive_after_days, options.chunk_size, calendar,
+                                                                  options.dedupe_archive)
+    updated_90day = job_index = None
+else:
+    archive_rows_pre_update = len(df_90day)
+    updated_main, updated_90day, job_index = update_main_and_archive(df_main, df_90day, options.archive_after_days, calendar,
+                                                                     cache_keys.get('>90 Day Archive'))
 
-# Update the data in the main and archive sheets
-print("\nUpdating Main and Archive Sheet...")
-updated_main, updated_90day = update_main_and_archive(df_main, df_90day)
-print("\nMain and Archive Sheet updated!")
-sleep(1)
+    # Removing duplicate rows shifts the rows the archive sheet held before the update, so every row is checked and formatted again.
+    if options.dedupe_archive:
+        archive_row_count = len(updated_90day)
+        updated_90day, job_index = dedupe_archive_sheet(updated_90day)
+        if len(updated_90day) < archive_row_count:
+            archive_rows_pre_update = 0
+calendar = create_archive_calendar(updated_main)
+end_stage("Update main and archive sheets")
+announce("Main and Archive Sheet updated!")
+pause()
+
+# Check the job times of every installation job in the updated main and archive sheets. Only the running totals of the job times are kept for each
+# work area and month, and both analysis sheets are created from these totals. The archive sheet's totals are loaded from the archive metrics state
+# file when possible, so that only the newly archived rows have to be checked. When the archive sheet is streamed, it is read through once to check
+# every archived job and to gather its work area and month IDs.
+announce("Checking installation job times...")
+start_stage("Check job times")
+if options.stream_archive:
+    archive_totals, archive_areas, archive_months = scan_archive_stream(archive_stream)
+else:
+    archive_areas = archive_months = None
+    archive_totals = create_archive_totals(updated_90day, archive_rows_pre_update, cache_keys.get('>90 Day Archive'), options.rebuild_metrics)
+    if options.verify_metrics:
+        archive_totals = verify_archive_totals(archive_totals, updated_90day)
+job_time_totals = merge_job_time_totals(add_sheet_to_totals(create_job_time_totals(), updated_main), archive_totals)
+end_stage("Check job times")
+announce("Installation job times checked!")
+pause()
 
 # Update the data in the area metrics analysis sheet.
-print("\nUpdating Area Metrics sheet...")
-updated_area_metrics = update_area_metrics(updated_main, updated_90day)
-print("\nArea Metrics sheet updated!")
-sleep(1)
+announce("Updating Area Metrics sheet...")
+start_stage("Update area metrics")
+updated_area_metrics = update_area_metrics(updated_main, updated_90day, job_time_totals, archive_areas)
+end_stage("Update area metrics")
+announce("Area Metrics sheet updated!")
+pause()
 
 # Update the data in the month-by-month metrics analysis sheet.
-print("\nUpdating Month-by-Month Metrics sheet...")
-updated_month_metrics = update_month_metrics(updated_main, updated_90day)
-print("\nMonth-by-Month Metrics sheet updated!")
-sleep(1)
-
-# Save changes made by Pandas functionality to Excel file.
-print("\nSaving Pandas modifications...")
-with pd.ExcelWriter("Fiber Installations Database - Post Update.xlsx",
-                    engine='openpyxl',
-                    mode='a',
-                    if_sheet_exists='replace') as writer:
-        
-    updated_main.to_excel(writer, sheet_name='Main Installs', index=False)
-    updated_90day.to_excel(writer, sheet_name='>90 Day Archive', index=False)
-    updated_area_metrics.to_excel(writer, sheet_name='Area Metrics', index=False)
-    updated_month_metrics.to_excel(writer, sheet_name='Month-by-Month Metrics', index=False)
-print("\nPandas modifications saved!")
-sleep(1)
-
-
-# Step 3. Restore sheet Formatting with OpenpyXL 👇 --------------------------------------------------------------#
-
-# Load all four modified sheets in OpenpyXL.
-print("\nLoading Excel sheets in OpenpyXL...")
-workbook = load_workbook("Fiber Installations Database - Post Update.xlsx")
-main_sheet = workbook['Main Installs']
-archive_sheet = workbook['>90 Day Archive']
-area_metrics_sheet = workbook['Area Metrics']
-month_metrics_sheet = workbook['Month-by-Month Metrics']
-print("\nExcel sheets loaded in OpenpyXL!")
-sleep(1)
-
-# Restore the main and archive sheet formating.
-print("\nRestoring main and archive sheet formatting...")
-restore_main_and_archive(main_sheet, archive_sheet)
-print("\nMain and archive sheet formatting restored!")
-sleep(1)
-
-# Restore the area metrics and month-by-month metrics analysis sheet formatting.
-print("\nRestoring area and month-by-month metrics analysis sheet formatting...")
-restore_analysis_sheets(area_metrics_sheet, month_metrics_sheet)
-print("\nArea and month-by-month metrics analysis sheet formatting restored!")
-sleep(1)
-
-# Save changes made by OpenpyXL functionality to Excel file.
-print("\nSaving OpenpyXL modifications...")
-workbook.save("Fiber Installations Database - Post Update.xlsx")
-print("\nOpenpyXL modifications saved!")
-
-# Display the run time of the current iteration of the automation process.
+announce("Updating Month-by-Month Metrics sheet...")
+start_stage("Update month-by-month metrics")
+updated_month_metrics = update_month_metrics(updated_main, updated_90day, job_time_totals, archive_months)
+end_stage("Update month-by-month metrics")
+announce("Month-by-Month Metrics sheet updated!")
+pause()
+
+
+# Step 3. Build and save the updated Excel file 👇 ---------------------------------------------------------------#
+
+# Build all four updated sheets with their formatting restored and save the Excel file a single time. The DataFrames are handed over to the output
+# stage so that each one can be released as soon as its sheet has been built. When the archive sheet is streamed, the sheets are built in a new
+# workbook and the archive sheet is read through a second time as it is written. In write-only mode, every sheet is written one row at a time into a
+# new write-only workbook instead, with every cell given its final style as it is written.
+announce("Building and saving updated Excel file...")
+sheet_frames = {
+    'Main Installs': updated_main,
+    '>90 Day Archive': archive_stream() if options.stream_archive else updated_90day,
+    'Area Metrics': updated_area_metrics,
+    'Month-by-Month Metrics': updated_month_metrics
+}
+
+# The rows the archive sheet held before the update were already written and formatted by the previous run if the archive metrics state still
+# describes them (the loaded archive sheet has the sheet cache key the state was saved with, so none of its rows were edited in between), so they are
+# kept as they are and only the newly archived rows are written and formatted. The main sheet was also written and formatted by the previous run if
+# its archive calendar was found (the loaded main sheet has the sheet cache key the calendar was saved with), so when no rows were moved out of it,
+# it is kept as it is as well. Otherwise the main sheet is built in full, since its rows are removed, shifted, and edited by hand between runs. A full
+# restyle of both sheets can be requested with --full-restyle.
+first_changed_rows = {}
+if options.stream_archive:
+    archive_state = None
+    if not options.write_only:
+        workbook = create_output_workbook(workbook)
+else:
+    if not options.full_restyle and not options.write_only:
+        if main_sheet_unedited and len(updated_main) == main_rows_pre_update:
+            first_changed_rows['Main Installs'] = main_rows_pre_update + 2
+        if archive_state_matches(load_archive_state(), cache_keys.get('>90 Day Archive'), archive_rows_pre_update):
+            first_changed_rows['>90 Day Archive'] = archive_rows_pre_update + 2
+    archive_state = create_archive_state(updated_90day, archive_totals)
+index_state = None if job_index is None else create_index_state(job_index, updated_90day)
+
+# Save the updated main and archive sheet DataFrames (with their date-containing columns already converted) to the sheet cache, so that the next run
+# can reuse them as long as their sheets are not edited in between. Their keys are only written once the updated Excel file has been saved.
+start_stage("Save sheet cache")
+cached_frames = {'Main Installs': updated_main, '>90 Day Archive': updated_90day}
+for sheet_name, frame in cached_frames.items():
+    if frame is not None:
+        stage_cached_frame(sheet_name, frame)
+end_stage("Save sheet cache")
+del df_main, df_90day, job_time_totals, archive_totals, updated_main, updated_90day, updated_area_metrics, updated_month_metrics, frame
+if options.write_only:
+    save_write_only(workbook, "Fiber Installations Database - Post Update.xlsx", sheet_frames)
+else:
+    save_post_update(workbook, "Fiber Installations Database - Post Update.xlsx", sheet_frames, first_changed_rows)
+announce("Updated Excel file saved!")
+
+# Write the keys of the cached DataFrames, keyed by the sheets of the updated Excel file (see sheet_cache.py). The archive calendar of the updated
+# main sheet is saved with the same key, so that the next run can find the rows due for archival from the calendar as long as the main sheet is not
+# edited in between.
+post_cache_keys = sheet_cache_keys("Fiber Installations Database - Post Update.xlsx")
+save_cache_keys(post_cache_keys, [sheet_name for sheet_name, frame in cached_frames.items() if frame is not None])
+save_archive_calendar(calendar, post_cache_keys.get('Main Installs'))
+
+# Save the job time totals of the updated archive sheet so that the next run only has to check the rows it moves into the archive sheet. The state is
+# only saved once the updated Excel file has been saved, so it never describes an archive sheet that was not written, and it is keyed by the sheet
+# cache key of the updated archive sheet, so any edit made to the archive sheet before the next run forces a full check. (A streamed run does not use
+# the saved totals, as the archive sheet is read through in full either way.) The job index of the updated archive sheet is saved the same way (see
+# archive_index.py).
+if archive_state is not None:
+    save_archive_state(archive_state, post_cache_keys.get('>90 Day Archive'))
+if index_state is not None:
+    save_archive_index(index_state, post_cache_keys.get('>90 Day Archive'))
+
+# Display the run time of each stage and the amount of times the Excel file was parsed.
+report_stage_times(load_workbook_data.parse_count)
+
+# Display the run time of the current iteration of the automation process. The time spent pausing between steps in interactive mode is not part of
+# the run time.
 end_time = time()
-run_time = round((end_time - start_time), 2)
-print(f"Run time: {run_time} seconds.")
+run_time = round((end_time - start_time - console_output.paused_time), 2)
+announce(f"Run time: {run_time} seconds.")
 
 # Append the run time of the current date's automation process into the current month's run time log.
 with open(f'Run Times\\{month_key}.txt', 'a') as file:
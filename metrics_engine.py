@@ -0,0 +1,190 @@
+
+# The purpose of this file is to calculate the installation job metrics used by both the area metrics and the month-by-month metrics analysis sheets.
+# The three job times (start to completion, 811 call to 811 mark, and 811 mark to completion) are checked a single time for every job in the main
+# and archive sheets. Instead of keeping every job time, only running totals are kept for every work area and every month: the amount and sum of
+# each job time, and the amount of completed jobs in each time range. Both analysis sheets are then created from those totals.
+
+# NOTE: Since only totals are kept, the memory used by the metrics depends on the amount of work areas and months, not the amount of jobs. The sheets
+#       are also checked in chunks of rows, and the totals of each chunk are merged into the running totals.
+
+# Analysis Metrics
+
+# Average Drop completion time (Start to finish)
+# Average 811 call to 811 mark time
+# Average 811 mark to completion time
+# Amount of jobs completed in less than 10 days
+# Amount of jobs completed in between 10 and 16 days
+# Amount of jobs completed in more than 16 days
+# Percentage of jobs completed on time (<= 16 days)
+
+import checks
+import job_frame_schema
+import pandas as pd
+
+
+# The names of the two key types the job time totals are kept for.
+AREA_ID = 'Area ID'
+MONTH_ID = 'Month'
+
+# The names of the three job time checks.
+TIME_COLUMNS = [checks.START_TO_COMPLETE, checks.CALL811_TO_MARK811, checks.MARK811_TO_COMPLETE]
+
+# The names of the running totals kept for every work area ID and month ID.
+TOTAL_FIELDS = [f"{time_column} {total}" for time_column in TIME_COLUMNS for total in ("Count", "Sum")] + \
+               ['Jobs Under 10', 'Jobs 10 to 16', 'Jobs Above 16']
+
+# The amount of rows that are checked at a time.
+CHUNK_SIZE = 100000
+
+# The column titles of the analysis sheets that follow the work area ID / month ID column.
+METRIC_COLUMNS = [
+                  'Average Completion Time (Start to Finish)',
+                  'Average 811 Call to 811 Mark Time',
+                  'Average 811 Mark to Completion Time',
+                  '% of Jobs Completed on Time (<= 16 Days)',
+                  '# of Jobs (< 10 Days)',
+                  '# of Jobs ( 10 <= x <= 16 Days)',
+                  '# of Jobs (> 16 Days)'
+                 ]
+
+
+# FUNCTIONS FOR GATHERING DATA 👇 --------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating a column that holds the area ID of every row in a sheet. The values in the "CO" column (which contains the area ID
+# abbreviations) are stripped of leading / trailing spaces and capitalized, while any value that is not a string is left empty. Each distinct value
+# is only normalized once (see job_frame_schema.py). It uses a sheet name as input.
+def area_ID_column(sheet):
+    return job_frame_schema.area_ID_values(sheet)
+
+
+# Function used for creating a column that holds the period code of every row in a sheet. The period code is the month of the "Drop Installation
+# Date" column counted as a whole number (year * 12 + month - 1), so that period codes sort in the same order as the months they stand for. Any value
+# that is not a pandas timestamp or datetime object is left empty. It uses a sheet name as input.
+def month_period_codes(sheet):
+    dates = checks.date_values(sheet.iloc[:, checks.DROP_INSTALLATION_DATE])
+    return (dates.dt.year * 12 + dates.dt.month - 1).astype('Int64')
+
+
+# Function used for creating the month ID of a period code in "mm-YYYY" format. It uses a period code as input.
+def period_label(period_code):
+    return f"{period_code % 12 + 1:02d}-{period_code // 12}"
+
+
+# Function used for creating a column that holds the month ID of every row in a sheet. The month ID is generated from the "Drop Installation Date"
+# column in "mm-YYYY" format, while any value that is not a pandas timestamp or datetime object is left empty. Each distinct period code is only
+# turned into a month ID once. It uses a sheet name as input.
+def month_ID_column(sheet):
+    return month_period_codes(sheet).astype('category').cat.rename_categories(period_label)
+
+
+# Function used for creating an empty set of job time totals. The totals hold one dictionary for work area IDs and one for month IDs, in which every
+# key is associated with a list of running totals (in the order of TOTAL_FIELDS).
+def create_job_time_totals():
+    return {AREA_ID: {}, MONTH_ID: {}}
+
+
+# Function used for merging one dictionary of running totals into another. Totals for keys that are present in both dictionaries are added together.
+# It uses the dictionary that is merged into and the dictionary being merged as input.
+def merge_key_totals(key_totals, other_key_totals):
+    for key, other_totals in other_key_totals.items():
+        totals = key_totals.setdefault(key, [0] * len(TOTAL_FIELDS))
+        for field_index, value in enumerate(other_totals):
+            totals[field_index] += value
+    return key_totals
+
+
+# Function used for merging a full set of job time totals into another (for example the totals of the main sheet and the archive sheet). It uses
+# the job time totals that are merged into and the job time totals being merged as input.
+def merge_job_time_totals(job_time_totals, other_job_time_totals):
+    for key_column in (AREA_ID, MONTH_ID):
+        merge_key_totals(job_time_totals[key_column], other_job_time_totals[key_column])
+    return job_time_totals
+
+
+# Function used for creating the table of totals fields for a chunk of rows. Each row is given a 1 or 0 for every amount field and its job time for
+# every sum field, so that summing the table by key gives the totals of each key. It uses a chunk of rows as input.
+def create_totals_fields(chunk):
+
+    # The three job times of every row in the chunk are checked at once.
+    job_times = checks.time_checks(chunk)
+    start_to_complete = job_times[checks.START_TO_COMPLETE]
+
+    fields = {}
+    for time_column in TIME_COLUMNS:
+        fields[f"{time_column} Count"] = job_times[time_column].notna().astype('int64')
+        fields[f"{time_column} Sum"] = job_times[time_column].fillna(0).astype('int64')
+    fields['Jobs Under 10'] = (start_to_complete < 10).fillna(False).astype('int64')
+    fields['Jobs 10 to 16'] = ((start_to_complete >= 10) & (start_to_complete <= 16)).fillna(False).astype('int64')
+    fields['Jobs Above 16'] = (start_to_complete > 16).fillna(False).astype('int64')
+
+    return pd.DataFrame(fields, columns=TOTAL_FIELDS)
+
+
+# Function used for adding every job in a sheet to the job time totals. The sheet is checked in chunks of rows, and the totals of each chunk are
+# grouped by work area ID and by month ID and merged into the running totals. It uses the job time totals, a sheet name, and, optionally, the amount
+# of rows in each chunk as input.
+def add_sheet_to_totals(job_time_totals, sheet, chunk_size=CHUNK_SIZE):
+
+    for chunk_start in range(0, len(sheet), chunk_size):
+        chunk = sheet.iloc[chunk_start:chunk_start + chunk_size]
+        fields = create_totals_fields(chunk)
+
+        # The totals of the chunk are summed for every key at once and merged into the running totals.
+        for key_column, key_IDs in ((AREA_ID, area_ID_column(chunk)), (MONTH_ID, month_ID_column(chunk))):
+            chunk_totals = fields.groupby(key_IDs, sort=False, observed=True).sum()
+            merge_key_totals(job_time_totals[key_column], {key: [int(value) for value in totals]
+                                                           for key, totals in zip(chunk_totals.index, chunk_totals.itertuples(index=False))})
+
+    # The job time totals are returned.
+    return job_time_totals
+
+
+# Function used for creating the job time totals of every job in the main and archive sheets. It uses the main and archive sheet names as input.
+def create_job_time_totals_for_sheets(main_sheet, archive_sheet):
+    job_time_totals = create_job_time_totals()
+    add_sheet_to_totals(job_time_totals, main_sheet)
+    add_sheet_to_totals(job_time_totals, archive_sheet)
+    return job_time_totals
+
+
+# FUNCTIONS FOR CREATING ANALYSIS METRICS 👇 ---------------------------------------------------------------------------------------------------------#
+
+# Function used for calculating an average from a sum and an amount of job times. If there are no job times, "N/A" is returned instead. It uses the
+# sum and the amount of job times as input.
+def average_time(time_sum, time_count):
+    if time_count > 0:
+        return round(time_sum / time_count, 2)
+    return "N/A"
+
+
+# Function used for creating the DataFrame of an analysis sheet from the running totals of each key. Only the specified keys are included, in the
+# order they are given. It uses the title of the first column of the analysis sheet, the list of keys, and the dictionary of running totals for the
+# key type (work area IDs or month IDs) as input.
+def create_metrics_frame(key_title, keys, key_totals):
+
+    # A dictionary of empty lists is created for the columns of the analysis sheet.
+    columns = {key_title: list(keys)}
+    for column_name in METRIC_COLUMNS:
+        columns[column_name] = []
+
+    # The metrics of every key are calculated from its totals. Keys that have no job times are given "N/A" or 0.
+    for key in keys:
+        totals = dict(zip(TOTAL_FIELDS, key_totals.get(key, [0] * len(TOTAL_FIELDS))))
+
+        for column_name, time_column in zip(METRIC_COLUMNS[:3], TIME_COLUMNS):
+            columns[column_name].append(average_time(totals[f"{time_column} Sum"], totals[f"{time_column} Count"]))
+
+        # The percentage of jobs completed on time (<= 16 days) is calculated by dividing the amount of jobs completed in 16 or less days by the
+        # total amount of completed jobs.
+        complete_count = totals[f"{checks.START_TO_COMPLETE} Count"]
+        if complete_count != 0:
+            columns[METRIC_COLUMNS[3]].append(round(((totals['Jobs Under 10'] + totals['Jobs 10 to 16']) / complete_count * 100), 2))
+        else:
+            columns[METRIC_COLUMNS[3]].append("N/A")
+
+        columns[METRIC_COLUMNS[4]].append(totals['Jobs Under 10'])
+        columns[METRIC_COLUMNS[5]].append(totals['Jobs 10 to 16'])
+        columns[METRIC_COLUMNS[6]].append(totals['Jobs Above 16'])
+
+    # The DataFrame of the analysis sheet is created from the dictionary of columns and returned.
+    return pd.DataFrame(columns)
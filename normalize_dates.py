@@ -0,0 +1,172 @@
+
+# The purpose of this file is to convert the date-containing columns of the main and archive sheets into date values. Each column is converted as a
+# whole instead of one cell at a time:
+#   - Cells that already hold dates are converted all at once.
+#   - Every distinct text value is only parsed once, no matter how many cells hold it. Text values that share the same date format (for example
+#     "mm/dd/YYYY") are parsed together in a single call.
+#   - Cells that can not be converted to a date (such as a ? or a note) are either kept (main sheet) or cleared out (archive sheet).
+
+# NOTE: Every converted column only holds date values (datetime64), even in the main sheet. A cell that can not be converted but is kept is left
+#       empty in the date column, and its original value is moved into an annotation column (for example "Job Completed Date Annotation") added at
+#       the end of the sheet. Annotation columns are sparse, so only the cells that hold a note take up memory. When a sheet is written into the
+#       updated Excel file, the annotations are merged back into their date columns, so the written sheet looks exactly the same as before.
+
+# NOTE: The conversion rules are the same as converting each cell on its own with pd.to_datetime(), so the converted columns are identical to the
+#       ones produced by converting the sheet row by row.
+
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+
+# The names of every column in the main and archive sheets that contains dates.
+DATE_COLUMNS = [
+                'Drop Installation Date',
+                '811 Called in Date',
+                'Begin Work On',
+                '811 Marked Date',
+                'Ticket Expiration Date',
+                'Job Completed Date'
+               ]
+
+# The data types of cell values that are already dates.
+DATE_TYPES = [pd.Timestamp, datetime, date, np.datetime64]
+
+# The text added to the name of a date-containing column to name its annotation column.
+ANNOTATION_SUFFIX = ' Annotation'
+
+# The data type of the annotation columns. Only the cells that hold a note are stored.
+ANNOTATION_DTYPE = pd.SparseDtype(object, np.nan)
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for converting a single value to a date value. If the value can not be converted, None is returned. It uses a cell value as input.
+def parse_date_value(value):
+    try:
+        return pd.to_datetime(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+# Function used for converting every distinct non-date value of a column to a date value. The values are grouped by their date format so that every
+# value sharing a format is parsed in one call, and any value left over is parsed on its own. A dictionary that associates each value with its
+# date value (or None if the value can not be converted) is returned. It uses a list of distinct cell values as input.
+def parse_distinct_values(distinct_values):
+
+    # An empty dictionary is assigned as the parsed value dictionary.
+    parsed_values = {}
+
+    # Every text value is grouped together with the other text values that share its date format.
+    format_groups = {}
+    for value in distinct_values:
+        if isinstance(value, str):
+            value_format = guess_datetime_format(value)
+            if value_format is not None:
+                format_groups.setdefault(value_format, []).append(value)
+
+    # Each group of text values is parsed at once using the group's date format.
+    for value_format, values in format_groups.items():
+        group_dates = pd.to_datetime(pd.Series(values, dtype=object), format=value_format, errors='coerce')
+        for value, value_date in zip(values, group_dates):
+            if value_date is not pd.NaT:
+                parsed_values[value] = value_date
+
+    # Every value that was not parsed as part of a group is parsed on its own.
+    for value in distinct_values:
+        if value not in parsed_values:
+            parsed_values[value] = parse_date_value(value)
+
+    # The parsed value dictionary is returned.
+    return parsed_values
+
+
+# Function used for creating the name of a date-containing column's annotation column. It uses the name of the date-containing column as input.
+def annotation_column_name(column_name):
+    return column_name + ANNOTATION_SUFFIX
+
+
+# Function used for converting a date-containing column to date values. The converted column, the annotation column that holds the original value of
+# every cell that could not be converted (or None if there are no such cells), and the amount of cells that could not be converted are returned. It
+# uses a column as input.
+def normalize_date_column(column):
+
+    # If the column is already made up entirely of date values, there is nothing to convert.
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column, None, 0
+
+    # The cells of the column are split into cells that are empty, cells that already hold dates, and every other cell.
+    empty_cells = column.isna()
+    date_cells = column.map(type).isin(DATE_TYPES)
+    other_cells = ~empty_cells & ~date_cells
+
+    # The converted column starts out empty and the cells that already hold dates are converted all at once.
+    dates = pd.Series(pd.NaT, index=column.index, dtype='datetime64[ns]')
+    if date_cells.any():
+        dates[date_cells] = pd.to_datetime(column[date_cells])
+
+    # Every other cell is converted using the parsed value of its distinct value. Cells whose value could not be converted are marked as non-dates.
+    non_date_cells = pd.Series(False, index=column.index)
+    if other_cells.any():
+        other_values = column[other_cells]
+        parsed_values = parse_distinct_values(other_values.unique())
+        non_dates = [value for value, value_date in parsed_values.items() if value_date is None]
+        non_date_cells = other_cells & column.isin(non_dates)
+        dates[other_cells] = pd.to_datetime(other_values.map({value: value_date for value, value_date in parsed_values.items()
+                                                              if value_date is not None}))
+
+    non_date_count = int(non_date_cells.sum())
+
+    # The original values of the cells that could not be converted are kept in a sparse annotation column.
+    annotations = column.where(non_date_cells).astype(object).astype(ANNOTATION_DTYPE) if non_date_count > 0 else None
+
+    # The converted column, the annotation column, and the amount of cells that could not be converted are returned.
+    return dates, annotations, non_date_count
+
+
+# Function used for converting every date-containing column of a sheet. Cells that can not be converted are either kept in the sheet's annotation
+# columns or cleared out, along with any annotation column the sheet already holds (such as the annotations of rows moved from the main sheet into
+# the archive sheet). A dictionary that associates each column name with the amount of cells in the column that could not be converted is returned.
+# It uses a sheet and a boolean that determines if cells that can not be converted are kept (True) or cleared out (False) as input.
+def normalize_sheet_dates(sheet, keep_non_dates):
+
+    # An empty dictionary is assigned as the non-date count dictionary.
+    non_date_counts = {}
+
+    # Each date-containing column is converted and replaced in the sheet.
+    for column_name in DATE_COLUMNS:
+        sheet[column_name], annotations, non_date_counts[column_name] = normalize_date_column(sheet[column_name])
+
+        # Annotations the sheet already holds are counted as cells that could not be converted.
+        annotation_name = annotation_column_name(column_name)
+        if annotation_name in sheet.columns:
+            non_date_counts[column_name] += int(sheet[annotation_name].notna().sum())
+            if not keep_non_dates:
+                sheet.drop(columns=annotation_name, inplace=True)
+
+        if keep_non_dates and annotations is not None:
+            sheet[annotation_name] = annotations
+
+    # The non-date count dictionary is returned.
+    return non_date_counts
+
+
+# Function used for merging the annotation columns of a sheet back into their date-containing columns before the sheet is written. Each annotated
+# cell is given back its original value and the annotation columns are removed. If the sheet has no annotation columns, it is returned as it is.
+# It uses a sheet (or a chunk of a sheet's rows) as input.
+def merge_date_annotations(sheet):
+
+    annotation_names = [annotation_column_name(column_name) for column_name in DATE_COLUMNS
+                        if annotation_column_name(column_name) in sheet.columns]
+    if not annotation_names:
+        return sheet
+
+    merged_sheet = sheet.drop(columns=annotation_names)
+    for annotation_name in annotation_names:
+        column_name = annotation_name[:-len(ANNOTATION_SUFFIX)]
+        annotations = sheet[annotation_name].astype(object)
+        merged_sheet[column_name] = sheet[column_name].astype(object).where(annotations.isna(), annotations)
+
+    # The merged sheet is returned.
+    return merged_sheet
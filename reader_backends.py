@@ -0,0 +1,219 @@
+
+# The purpose of this file is to provide the reader backends the main and archive sheet DataFrames can be built with (see the --reader option of
+# main.py), along with a benchmark that compares them on the same Excel file (see the --benchmark-readers option of main.py):
+#   - openpyxl: The DataFrame is built by Pandas from the workbook loaded in OpenpyXL (or, for a workbook loaded in read-only mode, from its rows).
+#   - native:   The sheet's XML part is read straight from the Excel file. Each cell is converted into the value Pandas reads from it without ever
+#               creating an OpenpyXL cell, and the rows are parsed into a DataFrame the same way pd.read_excel() parses them.
+
+# NOTE: Both backends produce identical DataFrames. The native backend uses OpenpyXL's own number format and date conversion functions, so dates and
+#       times are read exactly the same way OpenpyXL reads them.
+
+import zipfile
+from time import perf_counter
+import xml.etree.ElementTree as ElementTree
+import numpy as np
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+from console_output import announce, detail
+from load_workbook_data import iter_row_chunks, load_streaming_workbook, read_sheet_frame
+from sheet_cache import MAIN_NAMESPACE, find_sheet_parts, find_workbook_relationships
+
+
+# The names of the reader backends.
+READER_BACKENDS = ['openpyxl', 'native']
+
+# The XML tags of the sheet and shared strings parts of an Excel file.
+ROW_TAG = f"{MAIN_NAMESPACE}row"
+CELL_TAG = f"{MAIN_NAMESPACE}c"
+VALUE_TAG = f"{MAIN_NAMESPACE}v"
+INLINE_STRING_TAG = f"{MAIN_NAMESPACE}is"
+STRING_ITEM_TAG = f"{MAIN_NAMESPACE}si"
+TEXT_TAG = f"{MAIN_NAMESPACE}t"
+RUN_TAG = f"{MAIN_NAMESPACE}r"
+
+
+# FUNCTIONS FOR THE NATIVE READER 👇 -----------------------------------------------------------------------------------------------------------------#
+
+# Function used for finding the parts of an Excel file that are shared by every sheet (the shared strings and styles parts). A dictionary that
+# associates the type of each part ("sharedStrings" or "styles") with its path is returned. It uses an opened Excel file (zip archive) as input.
+def find_shared_parts(excel_file):
+    return {part_type: part_name for part_type, part_name in find_workbook_relationships(excel_file).values()}
+
+
+# Function used for reading the text of a string item, the same way OpenpyXL reads it (the plain text followed by the text of each formatted run,
+# while phonetic text is left out). It uses a string item (or inline string) element as input.
+def string_item_text(item):
+    snippets = [item.findtext(TEXT_TAG) or ""]
+    for run in item.iter(RUN_TAG):
+        snippets.append(run.findtext(TEXT_TAG) or "")
+    return "".join(snippets)
+
+
+# Function used for reading the shared strings of an Excel file. It uses an opened Excel file (zip archive) and the path of the shared strings part
+# as input.
+def read_shared_strings(excel_file, part_name):
+
+    shared_strings = []
+    if part_name is None or part_name not in excel_file.namelist():
+        return shared_strings
+
+    with excel_file.open(part_name) as part:
+        for _, element in ElementTree.iterparse(part):
+            if element.tag == STRING_ITEM_TAG:
+                shared_strings.append(string_item_text(element).replace('x005F_', ''))
+                element.clear()
+
+    return shared_strings
+
+
+# Function used for finding which cell styles of an Excel file format their numbers as dates and which format them as durations. Two sets of style
+# numbers are returned. It uses an opened Excel file (zip archive) and the path of the styles part as input.
+def read_date_styles(excel_file, part_name):
+
+    date_styles = set()
+    timedelta_styles = set()
+    if part_name is None or part_name not in excel_file.namelist():
+        return date_styles, timedelta_styles
+
+    styles_part = ElementTree.fromstring(excel_file.read(part_name))
+    custom_formats = {int(number_format.get('numFmtId')): number_format.get('formatCode')
+                      for number_format in styles_part.iter(f"{MAIN_NAMESPACE}numFmt")}
+
+    cell_styles = styles_part.find(f"{MAIN_NAMESPACE}cellXfs")
+    for style_number, cell_style in enumerate([] if cell_styles is None else cell_styles.iter(f"{MAIN_NAMESPACE}xf")):
+        format_number = int(cell_style.get('numFmtId', 0))
+        number_format = custom_formats.get(format_number, BUILTIN_FORMATS.get(format_number))
+        if is_date_format(number_format):
+            date_styles.add(style_number)
+        if is_timedelta_format(number_format):
+            timedelta_styles.add(style_number)
+
+    return date_styles, timedelta_styles
+
+
+# Function used for finding the date system of an Excel file (dates counted from 1900 or from 1904). It uses an opened Excel file (zip archive) as
+# input.
+def read_epoch(excel_file):
+    workbook_properties = ElementTree.fromstring(excel_file.read('xl/workbook.xml')).find(f"{MAIN_NAMESPACE}workbookPr")
+    if workbook_properties is not None and workbook_properties.get('date1904', '').lower() in ('1', 'true'):
+        return CALENDAR_MAC_1904
+    return CALENDAR_WINDOWS_1900
+
+
+# Function used for converting a cell element into the value Pandas reads from it. Empty cells become empty strings, error cells become NaN, whole
+# numbers are read as integers, and numbers formatted as dates are read as dates. It uses the cell element, the shared strings, the sets of date and
+# duration style numbers, and the date system of the Excel file as input.
+def convert_cell_element(cell, shared_strings, date_styles, timedelta_styles, epoch):
+
+    data_type = cell.get('t', 'n')
+
+    if data_type == 'inlineStr':
+        inline_string = cell.find(INLINE_STRING_TAG)
+        return "" if inline_string is None else string_item_text(inline_string)
+
+    value = cell.findtext(VALUE_TAG)
+    if not value:
+        return ""
+
+    if data_type == 'n':
+        number = float(value) if ('.' in value or 'E' in value or 'e' in value) else int(value)
+        style_number = int(cell.get('s', 0))
+        if style_number in date_styles:
+            try:
+                return from_excel(number, epoch, timedelta=style_number in timedelta_styles)
+            except (OverflowError, ValueError):
+                return np.nan
+        whole_number = int(number)
+        return whole_number if whole_number == number else float(number)
+    if data_type == 's':
+        return shared_strings[int(value)]
+    if data_type == 'b':
+        return bool(int(value))
+    if data_type == 'd':
+        return from_ISO8601(value)
+    if data_type == 'e':
+        return np.nan
+    return value
+
+
+# Function used for reading the rows of a sheet straight from the Excel file. Every row is yielded as a list of converted cell values, with missing
+# cells and rows filled in as empty. It uses the Excel file's name and a sheet name as input.
+def read_native_rows(file_name, sheet_name):
+
+    with zipfile.ZipFile(file_name) as excel_file:
+        shared_parts = find_shared_parts(excel_file)
+        shared_strings = read_shared_strings(excel_file, shared_parts.get('sharedStrings'))
+        date_styles, timedelta_styles = read_date_styles(excel_file, shared_parts.get('styles'))
+        epoch = read_epoch(excel_file)
+
+        row_count = 0
+        with excel_file.open(find_sheet_parts(excel_file)[sheet_name]) as part:
+            for _, element in ElementTree.iterparse(part):
+                if element.tag != ROW_TAG:
+                    continue
+
+                # Rows that are missing from the sheet's XML part are read as empty rows.
+                row_number = int(element.get('r', row_count + 1))
+                for missing_row in range(row_count + 1, row_number):
+                    yield []
+                row_count = row_number
+
+                row = []
+                for cell in element.iter(CELL_TAG):
+                    coordinate = cell.get('r')
+                    column = column_index_from_string(coordinate_from_string(coordinate)[0]) if coordinate else len(row) + 1
+                    row.extend("" for missing_column in range(len(row) + 1, column))
+                    row.append(convert_cell_element(cell, shared_strings, date_styles, timedelta_styles, epoch))
+                element.clear()
+                yield row
+
+
+# Function used for creating a Pandas DataFrame from one of the sheets of an Excel file with the native reader. It uses the Excel file's name and a
+# sheet name as input.
+def read_native_sheet_frame(file_name, sheet_name):
+    return next(iter_row_chunks(read_native_rows(file_name, sheet_name), chunk_size=None))
+
+
+# FUNCTIONS FOR SELECTING AND COMPARING READER BACKENDS 👇 -------------------------------------------------------------------------------------------#
+
+# Function used for creating the function that builds the DataFrame of a sheet with a reader backend. It uses the name of the reader backend, the
+# loaded workbook, and the Excel file's name as input.
+def create_sheet_reader(backend, workbook, file_name):
+    if backend == 'native':
+        return lambda sheet_name: read_native_sheet_frame(file_name, sheet_name)
+    return lambda sheet_name: read_sheet_frame(workbook, sheet_name, file_name)
+
+
+# Function used for checking if two DataFrames are identical. Besides holding equal values, every cell must hold a value of the same type (so that,
+# for example, a whole number read as an integer by one backend and as a decimal by the other is caught). It uses the two DataFrames as input.
+def frames_identical(frame, other_frame):
+    return frame.columns.equals(other_frame.columns) and frame.equals(other_frame) and \
+           frame.map(type).equals(other_frame.map(type))
+
+
+# Function used for comparing the reader backends on the same Excel file. Each backend builds the DataFrames of the specified sheets (the openpyxl
+# backend also has to load the workbook first), and the amount of rows read per second is reported for each backend. Every backend's DataFrames are
+# also checked against the DataFrames of the first backend. It uses the Excel file's name and the list of sheet names as input.
+def benchmark_reader_backends(file_name, sheet_names):
+
+    announce(f"Benchmarking reader backends on {file_name}...")
+    reference_frames = None
+
+    for backend in READER_BACKENDS:
+        start_time = perf_counter()
+        workbook = load_streaming_workbook(file_name) if backend == 'openpyxl' else None
+        read_frame = create_sheet_reader(backend, workbook, file_name)
+        frames = [read_frame(sheet_name) for sheet_name in sheet_names]
+        run_time = perf_counter() - start_time
+
+        row_count = sum(len(frame) for frame in frames)
+        detail(f"{backend:<10} {row_count} rows in {run_time:.2f} seconds ({row_count / run_time:,.0f} rows per second)")
+
+        if reference_frames is None:
+            reference_frames = frames
+        elif all(frames_identical(frame, reference) for frame, reference in zip(frames, reference_frames)):
+            detail(f"{backend:<10} DataFrames are identical to the {READER_BACKENDS[0]} backend's DataFrames.")
+        else:
+            detail(f"{backend:<10} DataFrames differ from the {READER_BACKENDS[0]} backend's DataFrames.")
@@ -2,7 +2,25 @@
 # The purpose of this file is to restore the pre-update format of the area metrics and month-by-month metrics 
 # analysis sheets.
 
-from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
+from openpyxl.formatting.rule import FormulaRule
+
+import style_registry as styles
+
+
+# The metric thresholds table. Each row holds a metric column of the analysis sheets, the limits of its green,
+# light green, and light red ratings, and whether a lower value is better. Values past the light red limit are
+# rated red.
+#   - Average Completion Time (Start to Finish): < 10 days, 10 - 16 days, 16 - 20 days, > 20 days
+#   - Average 811 Call to 811 Mark Time: < 3 days, 3 - 5 days, 5 - 7 days, > 7 days
+#   - Average 811 Mark to Completion Time: < 4 days, 4 - 7 days, 7 - 10 days, > 10 days
+#   - % of Jobs Completed on Time (<= 16 Days): >= 95%, 90 - 95%, 80 - 90%, < 80%
+METRIC_THRESHOLDS = [
+                     # Column, Green, Light Green, Light Red, Lower is Better
+                     ('B', 10, 16, 20, True),
+                     ('C', 3, 5, 7, True),
+                     ('D', 4, 7, 10, True),
+                     ('E', 95, 90, 80, False)
+                    ]
 
 
 # FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------#
@@ -25,17 +43,18 @@ def find_row_limit(sheet):
     return sheet.max_row + 1
 
 
-# Function used for restoring each row's height and each column's width to their original values. It takes a 
-# specified sheet name and its row limit as input.
-def restore_height_and_width(sheet, row_limit):
+# Function used for restoring each row's height and each column's width to their original values. The height of
+# the non-header rows is written once as the sheet's default row height, so only the header row has a height of its
+# own. It takes a specified sheet name as input.
+def restore_height_and_width(sheet):
+
+    # Each non-header row is given a default height value of 22
+    sheet.sheet_format.defaultRowHeight = 22
+    sheet.sheet_format.customHeight = True
 
     # The header row is given a height value of 58
     sheet.row_dimensions[1].height = 58
 
-    # Each non-header row is given a height value of 22
-    for row in range(2, row_limit):
-        sheet.row_dimensions[row].height = 22
-
     # Each column is given its own specific width value
     sheet.column_dimensions['A'].width = 15
     sheet.column_dimensions['B'].width = 20
@@ -47,144 +66,61 @@ def restore_height_and_width(sheet, row_limit):
     sheet.column_dimensions['H'].width = 15
 
 
-# Function used to restore font details of each column. It takes a specified sheet name and its row limit as input.
+# Function used to restore font details and borders of each column. Both are part of the shared named styles. It
+# takes a specified sheet name and its row limit as input.
 def restore_font_details(sheet, row_limit):
 
-    # Restore font details of the header row.
+    # Restore font details and borders of the header row.
     for row in sheet.iter_rows(max_row=1, max_col=8):
         for cell in row:
-            cell.font = Font(name='Arial', size=11, bold=True)
-            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            styles.apply_named_style(cell, styles.HEADER_STYLE)
 
-    # Restore font details of each non-header row.
+    # Restore font details and borders of each non-header row.
     for row in sheet.iter_rows(min_row=2, max_row=(row_limit - 1), max_col=8):
         for cell in row:
-            cell.font = Font(name='Arial', size=16)
+            styles.apply_named_style(cell, styles.TEXT_STYLE)
 
 
-# Function used for applying the cell fill color to appropriate analysis metric columns. It uses a specified sheet
-# name and row limit as input.
+# Function used for applying the cell fill color to appropriate analysis metric columns. Instead of filling each
+# cell one at a time, every rating in the metric thresholds table is written once as a conditional formatting rule
+# over the column's whole range of rows, so Excel colors each cell (and recolors it whenever its value changes).
+# Cells with a value of "N/A" are filled with grey, while cells that hold neither a number nor "N/A" are left
+# unfilled. It uses a specified sheet name and row limit as input.
 def apply_column_color(sheet, row_limit):
 
-    # Assign each cell fill color to variables.
-    grey_fill = PatternFill(start_color='808080', end_color='808080', fill_type='solid')
-    green_fill = PatternFill(start_color='00FF00', end_color='00FF00', fill_type='solid')
-    light_green_fill = PatternFill(start_color='90EE90', end_color='90EE90', fill_type='solid')
-    light_red_fill = PatternFill(start_color='F08080', end_color='F08080', fill_type='solid')
-    red_fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-
-    # FILL COLOR ASSIGNMENTS FOR THE "Average Completion Time (Start to Finish)" COLUMN
-    # Iterate over each row in the specified analysis sheet.
-    for row in range(2, row_limit):
- 
-        # If the row has a value of "N/A", the cell will be filled with grey.
-        if sheet['B' + str(row)].value == 'N/A':
-            sheet['B' + str(row)].fill = grey_fill
-
-        # If the row has a value that is less than 10, the cell will be filled with green.
-        elif sheet['B' + str(row)].value < 10:
-            sheet['B' + str(row)].fill = green_fill
-        
-        # If the row has a value between 10 and 16, the cell will be filled with light green.
-        elif 10 <= sheet['B' + str(row)].value <= 16:
-            sheet['B' + str(row)].fill = light_green_fill
-
-        # If the row has a value greater than 16 but not greater than 20, the cell will be filled with light red.
-        elif 16 < sheet['B' + str(row)].value <= 20:
-            sheet['B' + str(row)].fill = light_red_fill
-        
-        # If the row has a value greater than 20, the cell will be filled with red.
-        else:
-            sheet['B' + str(row)].fill = red_fill
-
-    # FILL COLOR ASSIGNMENTS FOR THE "Average 811 Call to 811 Mark Time" COLUMN
-    # Iterate over each row in the specified analysis sheet.
-    for row in range(2, row_limit):
+    # If the sheet has no metric rows, there is nothing to color.
+    if row_limit <= 2:
+        return
 
-        # If the row has a value of "N/A", the cell will be filled with grey.
-        if sheet['C' + str(row)].value == 'N/A':
-            sheet['C' + str(row)].fill = grey_fill
-
-        # If the row has a value that is less than 3, the cell will be filled with green.
-        elif sheet['C' + str(row)].value < 3:
-            sheet['C' + str(row)].fill = green_fill
-        
-        # If the row has a value between 3 and 5, the cell will be filled with light green.
-        elif 3 <= sheet['C' + str(row)].value <= 5:
-            sheet['C' + str(row)].fill = light_green_fill
-
-        # If the row has a value greater than 5 but not greater than 7, the cell will be filled with light red.
-        elif 5 < sheet['C' + str(row)].value <= 7:
-            sheet['C' + str(row)].fill = light_red_fill
-        
-        # If the row has a value greater than 7, the cell will be filled with red.
-        else:
-            sheet['C' + str(row)].fill = red_fill
+    for column, green_limit, light_green_limit, light_red_limit, lower_is_better in METRIC_THRESHOLDS:
 
-    # FILL COLOR ASSIGNMENTS FOR THE "Average 811 Mark to Completion Time" COLUMN
-    # Iterate over each row in the specified analysis sheet.
-    for row in range(2, row_limit):
+        # The rules are written for the first cell of the column's range, and Excel applies them to every row.
+        cell_range = f"{column}2:{column}{row_limit - 1}"
+        value = f"{column}2"
 
         # If the row has a value of "N/A", the cell will be filled with grey.
-        if sheet['D' + str(row)].value == 'N/A':
-            sheet['D' + str(row)].fill = grey_fill
-
-        # If the row has a value that is less than 4, the cell will be filled with green.
-        elif sheet['D' + str(row)].value < 4:
-            sheet['D' + str(row)].fill = green_fill
-        
-        # If the row has a value between 4 and 7, the cell will be filled with light green.
-        elif 4 <= sheet['D' + str(row)].value <= 7:
-            sheet['D' + str(row)].fill = light_green_fill
-
-        # If the row has a value greater than 7 but not greater than 10, the cell will be filled with light red.
-        elif 7 < sheet['D' + str(row)].value <= 10:
-            sheet['D' + str(row)].fill = light_red_fill
-        
-        # If the row has a value greater than 10, the cell will be filled with red.
+        sheet.conditional_formatting.add(cell_range, FormulaRule(formula=[f'{value}="N/A"'], fill=styles.GREY_FILL))
+
+        # Metrics where a lower value is better (average times) are rated by upper limits, while metrics where a 
+        # higher value is better (percentages) are rated by lower limits.
+        if lower_is_better:
+            ratings = [
+                       (f"{value}<{green_limit}", styles.GREEN_FILL),
+                       (f"AND({value}>={green_limit},{value}<={light_green_limit})", styles.LIGHT_GREEN_FILL),
+                       (f"AND({value}>{light_green_limit},{value}<={light_red_limit})", styles.LIGHT_RED_FILL),
+                       (f"{value}>{light_red_limit}", styles.RED_FILL)
+                      ]
         else:
-            sheet['D' + str(row)].fill = red_fill
+            ratings = [
+                       (f"{value}>={green_limit}", styles.GREEN_FILL),
+                       (f"AND({value}>={light_green_limit},{value}<{green_limit})", styles.LIGHT_GREEN_FILL),
+                       (f"AND({value}>={light_red_limit},{value}<{light_green_limit})", styles.LIGHT_RED_FILL),
+                       (f"{value}<{light_red_limit}", styles.RED_FILL)
+                      ]
 
-    # FILL COLOR ASSIGNMENTS FOR "% of Jobs Completed on Time (<= 16 Days)" COLUMN
-    # Iterate over each row in the specified analysis sheet.
-    for row in range(2, row_limit):
-
-        # If the row has a value of "N/A", the cell will be filled with grey.
-        if sheet['E' + str(row)].value == 'N/A':
-            sheet['E' + str(row)].fill = grey_fill
-
-        # If the row has a value that is greater than or equal to 95, the cell will be filled green.
-        elif sheet['E' + str(row)].value >= 95:
-            sheet['E' + str(row)].fill = green_fill
-        
-        # If the row has a value that is at least 90 and less than 95, the cell will be filled light green.
-        elif 90 <= sheet['E' + str(row)].value < 95:
-            sheet['E' + str(row)].fill = light_green_fill
-
-        # If the row has a value that is at least 80 and less than 90, the cell will be filled light red.
-        elif 80 <= sheet['E' + str(row)].value < 90:
-            sheet['E' + str(row)].fill = light_red_fill
-        
-        # If the row has a value that is less than 80, the cell will be filled red.
-        else:
-            sheet['E' + str(row)].fill = red_fill
-
-
-# Function used for restoring borders to cells. It uses a specified sheet name and its row limit as input.
-def restore_borders(sheet, row_limit):
-
-    # Create the border
-    border = Border(
-                    top=Side(style='thin'),
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    bottom=Side(style='thin'),
-                    )
-    
-    # Iterate over every row in the specifed sheet and apply the border to all cells in every used column.
-    for row in sheet.iter_rows(max_row=(row_limit - 1), max_col=8):
-        for cell in row:
-            cell.border = border
+        # Each rating only applies to cells that hold a number.
+        for condition, fill in ratings:
+            sheet.conditional_formatting.add(cell_range, FormulaRule(formula=[f"AND(ISNUMBER({value}),{condition})"], fill=fill))
 
 
 # Function used for restoring the filter tabs in each column. It uses a specified sheet name and its row limit as
@@ -202,10 +138,10 @@ def restore_analysis_sheets(area_metrics_sheet, month_metrics_sheet):
     month_row_limit = find_row_limit(month_metrics_sheet)
 
     # Restore the row height and column width of both sheets.
-    restore_height_and_width(area_metrics_sheet,area_row_limit)
-    restore_height_and_width(month_metrics_sheet, month_row_limit)
+    restore_height_and_width(area_metrics_sheet)
+    restore_height_and_width(month_metrics_sheet)
 
-    # Restore the font details of both sheets.
+    # Restore the font details and cell borders of both sheets.
     restore_font_details(area_metrics_sheet, area_row_limit)
     restore_font_details(month_metrics_sheet, month_row_limit)
 
@@ -213,10 +149,6 @@ def restore_analysis_sheets(area_metrics_sheet, month_metrics_sheet):
     apply_column_color(area_metrics_sheet, area_row_limit)
     apply_column_color(month_metrics_sheet, month_row_limit)
 
-    # Restore the cell borders of both sheets.
-    restore_borders(area_metrics_sheet, area_row_limit)
-    restore_borders(month_metrics_sheet, month_row_limit)
-
     # Restore the filter tabs in both sheets.
     restore_filters(area_metrics_sheet, area_row_limit)
     restore_filters(month_metrics_sheet, month_row_limit)
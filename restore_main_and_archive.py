@@ -1,7 +1,33 @@
 
 # The purpose of this file is to restore the pre-update format of the main and archive sheets.
 
-from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
+# NOTE: Rows that are kept from the loaded workbook (see save_post_update.py) already have their format, so only the rows from each sheet's first
+#       changed row onward are restored. The header row, column widths, fill color rules, filter tabs, and legend are always restored, as they are
+#       restored once per sheet instead of once per row.
+
+from copy import copy
+
+from openpyxl.formatting.formatting import ConditionalFormattingList
+from openpyxl.formatting.rule import FormulaRule
+
+import style_registry as styles
+
+
+# The labels of the main sheet's legend, in the same order as the statuses of the status lookup table. The legend
+# starts on the third row.
+LEGEND_LABELS = [
+                 "Completed",
+                 "High Priority",
+                 "KUB / Global",
+                 "Need to Call 811",
+                 "Waiting on 811",
+                 "Notes",
+                 "On Hold / Waiting on Customer to Call",
+                 "Ready to Bury",
+                 "Scheduled",
+                 "Cancelled"
+                ]
+LEGEND_FIRST_ROW = 3
 
 
 # FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------#
@@ -10,31 +36,21 @@ from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
 # It takes a sheet name as input.
 def find_row_limit(sheet):
 
-    # Iterate over the "Status" column in every row.
-    for cell in sheet['N']:
+    # Iterate over the values of the "Status" column in every row.
+    for row, (status,) in enumerate(sheet.iter_rows(min_col=14, max_col=14, values_only=True), start=1):
 
         # When the first row that does not have a value in the "Status" column is found, the function will return 
         # that row's number.
-        if cell.value is None:
-            return(cell.row)
-        else:
-            continue
+        if status is None:
+            return row
     
     # If there are no rows in the specified sheet without an empty "Status" column, return the first empty row's 
     # number
     return sheet.max_row + 1
 
 
-# Function used for restoring each row's height and each column's width to their original values. It takes a 
-# specified sheet name and its row limit as input.
-def restore_height_and_width(sheet, row_limit):
-
-    # The header row is given a height value of 35
-    sheet.row_dimensions[1].height = 35
-
-    # Each non-header row is given a height value of 30
-    for row in range(2, row_limit):
-        sheet.row_dimensions[row].height = 30
+# Function used for restoring each column's width to its original value. It takes a specified sheet name as input.
+def restore_column_widths(sheet):
 
     # Each column is given its own specific width value
     sheet.column_dimensions['A'].width = 32
@@ -55,179 +71,94 @@ def restore_height_and_width(sheet, row_limit):
     sheet.column_dimensions['P'].width = 25
 
 
-# Function used to restore font details of each column. It takes a specified sheet name and its row limit as input.
-def restore_font_details(sheet, row_limit):
-
-    # Restore font details of the header row.
-    for row in sheet.iter_rows(max_row=1, max_col=14):
-        for cell in row:
-            cell.font = Font(name='Arial', size=11, bold=True)
-            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-
-    # Restore each date value to mm-dd-yyyy format.
-    for row in sheet.iter_rows(min_row=2, max_row=(row_limit - 1), max_col=6):
-        for cell in row:
-            cell.number_format = 'mm-dd-yyyy'
-
-    # Restore font details of columns A-L
-    for row in sheet.iter_rows(min_row=2, max_row=(row_limit - 1), max_col=12):
-        for cell in row:
-            cell.font = Font(name='Arial', size=16)
-
-    # Restore font details of the "Notes" column.
-    for row in sheet.iter_rows(min_row=2, max_row=(row_limit - 1), min_col=13, max_col=13):
-        for cell in row:
-            cell.font = Font(name='Arial', size=11, bold=True)
-
-    # Restore font details of the "Status" Column.
-    for row in sheet.iter_rows(min_row=2, max_row=(row_limit - 1), min_col=14, max_col=14):
-        for cell in row:
-            cell.font = Font(name='Arial', size=16, bold=True)
-
-
-# Function used for restoring the cell fill color to each cell in the "Job Completed Date" and "Address" columns. It
-# takes a sheet name and its row limit as input.
-def restore_column_color(sheet, row_limit):
-
-    # Assign each cell fill color to variables.
-    blue_fill = PatternFill(start_color='87CEFA', end_color='87CEFA', fill_type='solid')
-    magenta_fill = PatternFill(start_color='FF00FF', end_color='FF00FF', fill_type='solid')
-    cyan_fill = PatternFill(start_color='00FFFF', end_color='00FFFF', fill_type='solid')
-    plum_fill = PatternFill(start_color='DDA0DD', end_color='DDA0DD', fill_type='solid')
-    yellow_fill = PatternFill(start_color='ffff00', end_color='ffff00', fill_type='solid')
-    gold_fill = PatternFill(start_color='ffd700', end_color='ffd700', fill_type='solid')
-    olive_fill = PatternFill(start_color='808000', end_color='808000', fill_type='solid')
-    yellow_green_fill = PatternFill(start_color='9ACD32', end_color='9ACD32', fill_type='solid')
-    red_fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-    black_fill = PatternFill(start_color='000000', end_color='000000', fill_type='solid')
-
-    # Iterate over the 'Status' column in each row of the specified sheet.
-    for row in range(2, row_limit):
-
-        # If the row has a status of "COMPLETED", the two cells will be filled with blue.
-        if sheet['N' + str(row)].value == 'COMPLETED':
-            sheet['F' + str(row)].fill = blue_fill
-            sheet['G' + str(row)].fill = blue_fill
-        
-        # If the row has a status of "HIGH PRIORITY", the two cells will be filled with magenta.
-        elif sheet['N' + str(row)].value == 'HIGH PRIORITY':
-            sheet['F' + str(row)].fill = magenta_fill
-            sheet['G' + str(row)].fill = magenta_fill
-
-        # If the row has a status of "KUB/GLOBAL", the two cells will be filled with cyan.
-        elif sheet['N' + str(row)].value == 'KUB/GLOBAL':
-            sheet['F' + str(row)].fill = cyan_fill
-            sheet['G' + str(row)].fill = cyan_fill
-
-        # If the row has a status of "NEED TO CALL 811", the two cells will be filled with plum.
-        elif sheet['N' + str(row)].value == 'NEED TO CALL 811':
-            sheet['F' + str(row)].fill = plum_fill
-            sheet['G' + str(row)].fill = plum_fill
-
-        # If the row has a status of "WAITING ON 811", the two cells will be filled with yellow.
-        elif sheet['N' + str(row)].value == 'WAITING ON 811':
-            sheet['F' + str(row)].fill = yellow_fill
-            sheet['G' + str(row)].fill = yellow_fill
-
-        # If the row has a status of "NOTES", the two cells will be filled with gold.
-        elif sheet['N' + str(row)].value == 'NOTES':
-            sheet['F' + str(row)].fill = gold_fill
-            sheet['G' + str(row)].fill = gold_fill
-
-        # If the row has a status of "ON HOLD/WAITING ON CUST TO CALL", the two cells will be filled with olive.
-        elif sheet['N' + str(row)].value == 'ON HOLD/WAITING ON CUST TO CALL':
-            sheet['F' + str(row)].fill = olive_fill
-            sheet['G' + str(row)].fill = olive_fill
-
-        # If the row has a status of "READY TO BURY", the two cells will be filled with yellow green.
-        elif sheet['N' + str(row)].value == 'READY TO BURY':
-            sheet['F' + str(row)].fill = yellow_green_fill
-            sheet['G' + str(row)].fill = yellow_green_fill
-
-        # If the row has a status of "SCHEDULED", the two cells will be filled with red.
-        elif sheet['N' + str(row)].value == 'SCHEDULED':
-            sheet['F' + str(row)].fill = red_fill
-            sheet['G' + str(row)].fill = red_fill
-
-        # If the row has a status of "CANCELLED", the two cells will be filled with black and the text font color
-        # will be changed to white and have a strikethrough effect.
-        elif sheet['N' + str(row)].value == 'CANCELLED':
-            sheet['F' + str(row)].fill = black_fill
-            sheet['F' + str(row)].font = Font(color='ffffff', strike=True)
-            sheet['G' + str(row)].fill = black_fill
-            sheet['G' + str(row)].font = Font(color='ffffff', strike=True)
-
-        # If the "Notes" column has a value, then the cell is filled with gold.
-        if sheet['M' + str(row)].value is not None:
-            sheet['M' + str(row)].fill = gold_fill
-
-
-# Function used for restoring borders to cells. It uses a specified sheet name and its row limit as input.
-def restore_borders(sheet, row_limit):
-
-    # Create the border.
-    border = Border(
-                    top=Side(style='thin'),
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    bottom=Side(style='thin'),
-                    )
-    
-    # Iterate over every row in the specifed sheet and apply the border to all cells in every used column.
-    for row in sheet.iter_rows(max_row=(row_limit - 1), max_col=14):
-        for cell in row:
-            cell.border = border
+# Function used for restoring the height of every row. The row height of 30 is written once as the sheet's default
+# row height instead of once for every row, so only the header row has a height of its own in the saved Excel file.
+# It takes a specified sheet name as input.
+def restore_row_heights(sheet):
+
+    # Every row is given a default height value of 30, while the header row is given a height value of 35.
+    sheet.sheet_format.defaultRowHeight = 30
+    sheet.sheet_format.customHeight = True
+    sheet.row_dimensions[1].height = 35
 
 
-# Function used for restoring the filter tabs in each column. It uses a specified sheet name and its row limit as
-# input.
-def restore_filters(sheet, row_limit):
-    sheet.auto_filter.ref = f"A1:N{row_limit}"
+# Function used for restoring the format of a cell in columns A-N. Every cell is given its column's named style,
+# except for the "Job Completed Date" and "Address" cells of a cancelled row, which keep the white text font color
+# with a strikethrough effect they have always been given. Columns G-N keep the number format they were written
+# with. It takes the cell, its column (counted from 0), a dictionary that associates each kind of cell with the
+# first cell of that kind that was styled, and, optionally, a boolean that determines if the cell's row has a status
+# of "CANCELLED" as input.
+# NOTE: Only the first cell of each kind (same named style, column, and number format) is styled one property at a
+#       time. Every following cell of the same kind is given a copy of that cell's style, which is much faster than
+#       having OpenpyXL look up each property of each cell again.
+def restore_cell(cell, column, styled_cells, cancelled=False):
 
+    # The kind of cell is made up of its named style, its column, and its number format (columns A-F are always
+    # given the same format).
+    named_style = styles.CANCELLED_COLUMN_STYLES.get(column, styles.MAIN_COLUMN_STYLES[column]) if cancelled else \
+                  styles.MAIN_COLUMN_STYLES[column]
+    number_format = None if column < 6 else cell.number_format
+    kind = (named_style.name, column, number_format)
 
-# Function used for restoring the Legend of the main sheet. It takes the main sheet name as input.
-def restore_legend(main_sheet):
+    if kind in styled_cells:
+        cell._style = copy(styled_cells[kind]._style)
+        return
+
+    styles.apply_named_style(cell, named_style)
+    if number_format is not None and number_format != cell.number_format:
+        cell.number_format = number_format
+    styled_cells[kind] = cell
+
+
+# Function used for restoring the format of every row in a single pass over the sheet. Each cell in columns A-N
+# is given its column's named style (number format, font, and border). The fill colors are not part of this pass
+# (see restore_status_colors). It takes a specified sheet name, its row limit, and, optionally, its first changed
+# row as input.
+def restore_rows(sheet, row_limit, first_row=2):
 
-    # Assign each cell fill color to variables.
-    blue_fill = PatternFill(start_color='87CEFA', end_color='87CEFA', fill_type='solid')
-    magenta_fill = PatternFill(start_color='FF00FF', end_color='FF00FF', fill_type='solid')
-    cyan_fill = PatternFill(start_color='00FFFF', end_color='00FFFF', fill_type='solid')
-    plum_fill = PatternFill(start_color='DDA0DD', end_color='DDA0DD', fill_type='solid')
-    yellow_fill = PatternFill(start_color='ffff00', end_color='ffff00', fill_type='solid')
-    gold_fill = PatternFill(start_color='ffd700', end_color='ffd700', fill_type='solid')
-    olive_fill = PatternFill(start_color='808000', end_color='808000', fill_type='solid')
-    yellow_green_fill = PatternFill(start_color='9ACD32', end_color='9ACD32', fill_type='solid')
-    red_fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-    black_fill = PatternFill(start_color='000000', end_color='000000', fill_type='solid')
-
-    # Restore the legend colors
-    main_sheet['O3'].fill = blue_fill
-    main_sheet['O4'].fill = magenta_fill
-    main_sheet['O5'].fill = cyan_fill
-    main_sheet['O6'].fill = plum_fill
-    main_sheet['O7'].fill = yellow_fill
-    main_sheet['O8'].fill = gold_fill
-    main_sheet['O9'].fill = olive_fill
-    main_sheet['O10'].fill = yellow_green_fill
-    main_sheet['O11'].fill = red_fill
-    main_sheet['O12'].fill = black_fill
-
-    # Restore the legend labels
-    main_sheet['P3'].value = "Completed"
-    main_sheet['P4'].value = "High Priority"
-    main_sheet['P5'].value = "KUB / Global"
-    main_sheet['P6'].value = "Need to Call 811"
-    main_sheet['P7'].value = "Waiting on 811"
-    main_sheet['P8'].value = "Notes"
-    main_sheet['P9'].value = "On Hold / Waiting on Customer to Call"
-    main_sheet['P10'].value = "Ready to Bury"
-    main_sheet['P11'].value = "Scheduled"
-    main_sheet['P12'].value = "Cancelled"
-
-    # Restore font details for the legend labels.
-    for row in main_sheet.iter_rows(min_row=3, max_row=9, min_col=16, max_col=16):
-        for cell in row:
-            cell.font = Font(name='Calibri', size=12)
+    # Restore the row heights.
+    restore_row_heights(sheet)
+
+    # Restore the header row.
+    for cell in next(sheet.iter_rows(max_row=1, max_col=14)):
+        styles.apply_named_style(cell, styles.HEADER_STYLE)
+
+    # A dictionary that associates each kind of cell with the first cell of that kind that was styled.
+    styled_cells = {}
+
+    # Restore every changed row below the header row in a single pass.
+    for row in sheet.iter_rows(min_row=first_row, max_row=(row_limit - 1), max_col=14):
+
+        cancelled = row[13].value == 'CANCELLED'
+        for column, cell in enumerate(row):
+            restore_cell(cell, column, styled_cells, cancelled)
+
+
+# Function used for restoring the cell fill colors of the "Job Completed Date", "Address", and "Notes" columns.
+# Instead of filling each cell one at a time, every status in the status lookup table is written once as a
+# conditional formatting rule over the sheet's range of rows, so Excel colors each row by the text in its "Status"
+# column (and recolors it whenever its status changes). It takes a specified sheet name and its row limit as input.
+def restore_status_colors(sheet, row_limit):
+
+    # The rules of the previous run (if the sheet was kept from the loaded workbook) are replaced.
+    sheet.conditional_formatting = ConditionalFormattingList()
+
+    # If the sheet has no installation job rows, there is nothing to color.
+    if row_limit <= 2:
+        return
+
+    # The rules are written for the first row of each range, and Excel applies them to every row. The "Status"
+    # column is matched with EXACT so that, like the status lookup table, only statuses in capital letters match.
+    for status, fill in styles.STATUS_FILLS.items():
+
+        # If the row has a status of "CANCELLED", the filled cells are also given a white text font color with a
+        # strikethrough effect, so a row whose status is changed to "CANCELLED" in Excel is shown the same way.
+        font = styles.CANCELLED_FONT if status == 'CANCELLED' else None
+        sheet.conditional_formatting.add(f"F2:G{row_limit - 1}",
+                                         FormulaRule(formula=[f'EXACT($N2,"{status}")'], fill=fill, font=font))
+
+    # If the "Notes" column has a value, then the cell is filled with gold.
+    sheet.conditional_formatting.add(f"M2:M{row_limit - 1}", FormulaRule(formula=['NOT(ISBLANK($M2))'], fill=styles.NOTES_FILL))
 
 
 # Function used for restoring the filter tabs in each column. It uses a specified sheet name and its row limit as
@@ -236,37 +167,49 @@ def restore_filters(sheet, row_limit):
     sheet.auto_filter.ref = f"A1:N{row_limit}"
 
 
-# MAIN FUNCTIONALITY 👇 -----------------------------------------------------------------------------------------#
+# Function used for restoring a single row of the legend of the main sheet. It takes the row's number and its
+# color and label cells (columns O and P) as input.
+def restore_legend_row(row, color_cell, label_cell):
+
+    # Restore the legend color and label.
+    legend_index = row - LEGEND_FIRST_ROW
+    color_cell.fill = list(styles.STATUS_FILLS.values())[legend_index]
+    label_cell.value = LEGEND_LABELS[legend_index]
+
+    # Restore font details for the legend labels of rows 3-9.
+    if row <= 9:
+        label_cell.font = styles.LEGEND_FONT
+
 
-def restore_main_and_archive(main_sheet, archive_sheet):
+# Function used for restoring the Legend of the main sheet. It takes the main sheet name as input.
+def restore_legend(main_sheet):
+    for row in range(LEGEND_FIRST_ROW, LEGEND_FIRST_ROW + len(LEGEND_LABELS)):
+        restore_legend_row(row, main_sheet['O' + str(row)], main_sheet['P' + str(row)])
+
+
+# MAIN FUNCTIONALITY 👇 -----------------------------------------------------------------------------------------#
 
-    # Find the row limit of both the main and archive sheets and assign them to variables.
-    main_row_limit = find_row_limit(main_sheet)
-    archive_row_limit = find_row_limit(archive_sheet)
+# The function uses the main and archive sheet names and, optionally, the first changed row of each sheet as input.
+def restore_main_and_archive(main_sheet, archive_sheet, main_first_row=2, archive_first_row=2):
 
-    # Restore the row height and column width of both sheets.
-    restore_height_and_width(main_sheet,main_row_limit)
-    restore_height_and_width(archive_sheet, archive_row_limit)
+    # Restore both sheets, one at a time.
+    for sheet, first_row in ((main_sheet, main_first_row), (archive_sheet, archive_first_row)):
 
-    # Restore the font details of both sheets.
-    restore_font_details(main_sheet, main_row_limit)
-    restore_font_details(archive_sheet, archive_row_limit)
+        # Find the row limit of the sheet and assign it to a variable.
+        row_limit = find_row_limit(sheet)
 
-    # Restore the cell fill colors of both sheets.
-    restore_column_color(main_sheet, main_row_limit)
-    restore_column_color(archive_sheet, archive_row_limit)
+        # Restore the column widths of the sheet.
+        restore_column_widths(sheet)
 
-    # Restore the cell borders of both sheets.
-    restore_borders(main_sheet, main_row_limit)
-    restore_borders(archive_sheet, archive_row_limit)
+        # Restore the row heights, number formats, fonts, and cell borders of the sheet's changed rows in a single
+        # pass.
+        restore_rows(sheet, row_limit, first_row)
 
-    # Restore the cell borders of both sheets.
-    restore_borders(main_sheet, main_row_limit)
-    restore_borders(archive_sheet, archive_row_limit)
+        # Restore the cell fill colors of the sheet.
+        restore_status_colors(sheet, row_limit)
 
-    # Restore the filter tabs in both sheets.
-    restore_filters(main_sheet, main_row_limit)
-    restore_filters(archive_sheet, archive_row_limit)
+        # Restore the filter tabs in the sheet.
+        restore_filters(sheet, row_limit)
 
     # Restore the cell fill legend of the main sheet.
     restore_legend(main_sheet)
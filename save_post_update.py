@@ -0,0 +1,184 @@
+
+# The purpose of this file is to create the updated Excel file. The four updated sheets are built inside of the workbook that was loaded at the
+# start of the run: each sheet's values are written, its formatting is restored, and the workbook is then saved to the Excel file exactly once.
+
+# NOTE: Each DataFrame is released as soon as its sheet has been built, so the DataFrames and the finished sheets never all have to be held in memory
+#       at the same time while the workbook is being saved.
+
+# NOTE: Rows that were already written and formatted by the previous run (the rows the archive sheet held before the update) can be kept as they are
+#       in the loaded workbook. Only the rows from the sheet's first changed row onward are then written and formatted, instead of the whole sheet.
+
+# NOTE: When the archive sheet is streamed (see stream_archive.py), the Excel file is loaded in read-only mode and can not be saved. The sheets are
+#       instead built inside of a new workbook that holds the same sheets in the same order, and the archive sheet is written one chunk at a time.
+#       A new workbook could not hold the formulas and formatting of any other sheet, so streaming is only allowed for an Excel file that holds no
+#       other sheets than the four updated sheets (see find_extra_sheets).
+
+from datetime import date, datetime
+import zipfile
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, Side
+
+from console_output import detail
+from normalize_dates import merge_date_annotations
+from restore_main_and_archive import restore_main_and_archive
+from restore_analysis_sheets import restore_analysis_sheets
+from sheet_cache import find_sheet_parts
+from stage_timing import start_stage, end_stage
+
+
+# The names of the four sheets updated by the script.
+UPDATED_SHEETS = ['Main Installs', '>90 Day Archive', 'Area Metrics', 'Month-by-Month Metrics']
+
+
+# The header style Pandas applies to DataFrame column names.
+FRAME_HEADER_FONT = Font(bold=True)
+FRAME_HEADER_BORDER = Border(top=Side(style='thin'), left=Side(style='thin'), right=Side(style='thin'), bottom=Side(style='thin'))
+FRAME_HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='top')
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for converting a DataFrame value into a value that can be written into an OpenpyXL cell. It uses a DataFrame value as input.
+def convert_frame_value(value):
+
+    # Missing values (None, NaN, and NaT) are left as empty cells, the same as Pandas does when it saves a DataFrame.
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+
+    # Pandas timestamps are converted to datetime objects.
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+
+    # NumPy scalars are converted to their built-in Python equivalents.
+    if hasattr(value, 'item'):
+        return value.item()
+
+    return value
+
+
+# Function used for finding the number format Pandas gives a DataFrame value when it is written into a cell. Dates are given their own number
+# formats, while every other value keeps the cell's number format (None is returned). It uses a converted DataFrame value as input.
+def frame_number_format(value):
+    if isinstance(value, datetime):
+        return 'YYYY-MM-DD HH:MM:SS'
+    if isinstance(value, date):
+        return 'YYYY-MM-DD'
+    return None
+
+
+# Function used for giving a header cell the header style Pandas applies to DataFrame column names. It uses the header cell as input.
+def style_frame_header(cell):
+    cell.font = FRAME_HEADER_FONT
+    cell.border = FRAME_HEADER_BORDER
+    cell.alignment = FRAME_HEADER_ALIGNMENT
+
+
+# Function used for finding the sheets of an Excel file that are not updated by the script. The Excel file is not parsed, only the list of its sheets
+# is read. It uses the Excel file's name as input.
+def find_extra_sheets(file_name):
+    with zipfile.ZipFile(file_name) as excel_file:
+        return [sheet_name for sheet_name in find_sheet_parts(excel_file) if sheet_name not in UPDATED_SHEETS]
+
+
+# Function used for creating the workbook that the sheets are built in when the Excel file was loaded in read-only mode. The new workbook holds an
+# empty sheet for every sheet of the loaded workbook, in the same order. It uses the workbook loaded in read-only mode as input.
+def create_output_workbook(source_workbook):
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+
+    for sheet_name in source_workbook.sheetnames:
+        workbook.create_sheet(title=sheet_name)
+
+    # The new workbook is returned.
+    return workbook
+
+
+# Function used for writing a DataFrame into a sheet of the loaded workbook. The existing sheet is removed and replaced by a new sheet in the same
+# position, which is the same behavior as saving the DataFrame with pd.ExcelWriter(mode='a', if_sheet_exists='replace'). If a first changed row is
+# given, the existing sheet is kept instead: every row from the first changed row onward is deleted, and only the DataFrame's rows from that row
+# onward are written. It uses the loaded workbook, a sheet name, a DataFrame (or an iterable of DataFrames that each hold a chunk of the sheet's
+# rows), and, optionally, the sheet's first changed row as input.
+def write_sheet_frame(workbook, sheet_name, frame, first_row=2):
+
+    if first_row > 2:
+        sheet = workbook[sheet_name]
+        if sheet.max_row >= first_row:
+            sheet.delete_rows(first_row, sheet.max_row - first_row + 1)
+    else:
+        # The position of the existing sheet is saved to a variable before the sheet is removed.
+        sheet_index = workbook.sheetnames.index(sheet_name)
+        workbook.remove(workbook[sheet_name])
+        sheet = workbook.create_sheet(title=sheet_name, index=sheet_index)
+
+    # A single DataFrame is written as a single chunk.
+    chunks = [frame] if isinstance(frame, pd.DataFrame) else frame
+
+    row = 2
+    for chunk_number, chunk in enumerate(chunks):
+
+        # The notes kept in the annotation columns are merged back into their date-containing columns (see normalize_dates.py).
+        chunk = merge_date_annotations(chunk)
+
+        # The column names of the first chunk are written into the header row.
+        if chunk_number == 0:
+            for column, column_name in enumerate(chunk.columns, start=1):
+                style_frame_header(sheet.cell(row=1, column=column, value=column_name))
+
+        # Rows of the chunk that are kept from the existing sheet are skipped.
+        if row + len(chunk) <= first_row:
+            row += len(chunk)
+            continue
+        if row < first_row:
+            chunk = chunk.iloc[first_row - row:]
+            row = first_row
+
+        # Every row of the chunk is written under the previous rows. Dates are given the same number formats Pandas gives them.
+        for values in chunk.itertuples(index=False):
+            for column, value in enumerate(values, start=1):
+                value = convert_frame_value(value)
+                if value is None:
+                    continue
+                cell = sheet.cell(row=row, column=column, value=value)
+                number_format = frame_number_format(value)
+                if number_format is not None:
+                    cell.number_format = number_format
+            row += 1
+
+    # The newly written sheet is returned.
+    return sheet
+
+
+# MAIN FUNCTIONALITY 👇 ------------------------------------------------------------------------------------------------------------------------------#
+
+# The function uses the loaded workbook, the name of the Excel file to save, a dictionary that associates each sheet name with its updated DataFrame
+# (or, for a streamed archive sheet, the generator of its chunks), and, optionally, a dictionary that associates the main and archive sheet names
+# with their first changed row as input. The dictionary of DataFrames is emptied as each sheet is built. Sheets without a first changed row are
+# built and formatted in full.
+def save_post_update(workbook, file_name, sheet_frames, first_changed_rows=None):
+
+    first_changed_rows = first_changed_rows or {}
+    main_first_row = first_changed_rows.get('Main Installs', 2)
+    archive_first_row = first_changed_rows.get('>90 Day Archive', 2)
+    for sheet_name, first_row in first_changed_rows.items():
+        detail(f"Rows of '{sheet_name}' above row {first_row} are kept from the loaded workbook.")
+
+    # Build the main and archive sheets and restore their formatting.
+    start_stage("Build main and archive sheets")
+    main_sheet = write_sheet_frame(workbook, 'Main Installs', sheet_frames.pop('Main Installs'), main_first_row)
+    archive_sheet = write_sheet_frame(workbook, '>90 Day Archive', sheet_frames.pop('>90 Day Archive'), archive_first_row)
+    restore_main_and_archive(main_sheet, archive_sheet, main_first_row, archive_first_row)
+    end_stage("Build main and archive sheets")
+
+    # Build the area metrics and month-by-month metrics analysis sheets and restore their formatting.
+    start_stage("Build analysis sheets")
+    area_metrics_sheet = write_sheet_frame(workbook, 'Area Metrics', sheet_frames.pop('Area Metrics'))
+    month_metrics_sheet = write_sheet_frame(workbook, 'Month-by-Month Metrics', sheet_frames.pop('Month-by-Month Metrics'))
+    restore_analysis_sheets(area_metrics_sheet, month_metrics_sheet)
+    end_stage("Build analysis sheets")
+
+    # Save the workbook to the Excel file. This is the only time the updated Excel file is written.
+    start_stage("Save Excel file")
+    workbook.save(file_name)
+    end_stage("Save Excel file")
@@ -0,0 +1,236 @@
+# The purpose of this file is to keep a cached copy of the main and archive sheet DataFrames beside the Excel file. Building a DataFrame from the
+# Excel file means converting every cell of the sheet and then converting its date-containing columns, which takes longer and longer as the archive
+# sheet grows. Once the updated Excel file has been saved, the updated (already converted) DataFrames are saved to the cache, so that the next run can
+# reuse them as long as their sheets are not edited in between.
+
+# NOTE: Each cached DataFrame is keyed by a hash of its own sheet only: the sheet's XML part, along with the shared strings and cell styles that the
+#       sheet's cells refer to. Editing one sheet (such as adding a row to the main sheet) therefore does not change the key of any other sheet. If a
+#       sheet changes, its key no longer matches and the DataFrame is rebuilt from the Excel file, so the cache never has to be cleared by hand.
+
+# NOTE: The DataFrames are saved in Pandas' pickle format instead of a columnar format such as Parquet, because the notes and annotation columns hold
+#       a mix of dates, numbers, and text that a columnar format would have to convert to a single type. The cache files are only ever written and
+#       read by this script.
+
+import hashlib
+import logging
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ElementTree
+import pandas as pd
+
+from console_output import detail
+from job_frame_schema import CATEGORY_COLUMNS
+from normalize_dates import DATE_COLUMNS, annotation_column_name
+
+
+# The name of the directory that holds the cached DataFrames.
+CACHE_DIRECTORY = "Sheet Cache"
+
+# The XML namespaces used in the workbook parts of an Excel file.
+MAIN_NAMESPACE = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIP_NAMESPACE = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_NAMESPACE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# The parts of an Excel file that hold the shared strings and cell styles that every sheet's cells refer to.
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+STYLES_PART = 'xl/styles.xml'
+
+# The patterns used to find the shared strings and cell styles a sheet's XML part refers to, and the items of the shared strings and styles parts.
+SHARED_STRING_CELL = re.compile(rb'<c\b[^>]*\bt="s"[^>]*>\s*<v>(\d+)</v>')
+STYLE_REFERENCE = re.compile(rb'\bs="(\d+)"')
+STRING_ITEM = re.compile(rb'<si\b(?:[^>]*/>|.*?</si>)', re.DOTALL)
+CELL_STYLES = re.compile(rb'<cellXfs\b.*?</cellXfs>', re.DOTALL)
+CELL_STYLE_ITEM = re.compile(rb'<xf\b(?:[^>]*/>|.*?</xf>)', re.DOTALL)
+NUMBER_FORMATS = re.compile(rb'<numFmts\b.*?</numFmts>', re.DOTALL)
+
+# The end of every row in a sheet's XML part. A block of the part is only scanned up to its last row end, so that no cell is split between blocks.
+ROW_END = b'</row>'
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for finding the parts of an Excel file that the workbook part refers to. A dictionary that associates each relationship ID with the
+# relationship's type (such as "worksheet", "sharedStrings", or "styles") and the path of its part is returned. It uses an opened Excel file (zip
+# archive) as input.
+def find_workbook_relationships(excel_file):
+
+    relationships = ElementTree.fromstring(excel_file.read('xl/_rels/workbook.xml.rels'))
+
+    # Relationship targets are either absolute paths or paths relative to the "xl" directory.
+    targets = {}
+    for relationship in relationships.iter(f"{PACKAGE_NAMESPACE}Relationship"):
+        target = relationship.get('Target')
+        targets[relationship.get('Id')] = (relationship.get('Type').rsplit('/', 1)[-1],
+                                           target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target)))
+
+    return targets
+
+
+# Function used for finding the XML part of every sheet in an Excel file. A dictionary that associates each sheet name with the path of its XML part
+# is returned. It uses an opened Excel file (zip archive) as input.
+def find_sheet_parts(excel_file):
+
+    workbook_part = ElementTree.fromstring(excel_file.read('xl/workbook.xml'))
+    targets = find_workbook_relationships(excel_file)
+
+    return {sheet.get('name'): targets.get(sheet.get(f"{RELATIONSHIP_NAMESPACE}id"), (None, None))[1]
+            for sheet in workbook_part.iter(f"{MAIN_NAMESPACE}sheet")}
+
+
+# Function used for reading the items of a part of an Excel file (the shared strings, or the cell styles along with the number formats they use). A
+# list of the raw XML of every item and the raw XML shared by every item are returned. If the part does not exist, both are empty. It uses an opened
+# Excel file (zip archive), the part's path, and the pattern of a single item as input.
+def read_part_items(excel_file, part_name, item_pattern):
+
+    if part_name not in excel_file.namelist():
+        return [], b""
+
+    data = excel_file.read(part_name)
+    if part_name == STYLES_PART:
+        number_formats = NUMBER_FORMATS.search(data)
+        cell_styles = CELL_STYLES.search(data)
+        return item_pattern.findall(cell_styles.group() if cell_styles else b""), number_formats.group() if number_formats else b""
+
+    return item_pattern.findall(data), b""
+
+
+# Function used for adding the contents of a sheet's XML part to a hash, while finding the shared strings and cell styles its cells refer to. The
+# part is read in blocks so that large sheets are never held in memory all at once. The sets of referred shared string numbers and cell style
+# numbers are returned. It uses an opened Excel file (zip archive), the part's path, and the hash as input.
+def hash_sheet_part(excel_file, part_name, sheet_hash):
+
+    string_numbers = set()
+    style_numbers = set()
+    remainder = b""
+
+    with excel_file.open(part_name) as part:
+        for block in iter(lambda: part.read(1 << 20), b""):
+            sheet_hash.update(block)
+
+            # Only the rows that end inside of the block are scanned, the rest is scanned along with the next block.
+            block = remainder + block
+            scan_end = block.rfind(ROW_END) + len(ROW_END) if ROW_END in block else 0
+            string_numbers.update(map(int, SHARED_STRING_CELL.findall(block, 0, scan_end)))
+            style_numbers.update(map(int, STYLE_REFERENCE.findall(block, 0, scan_end)))
+            remainder = block[scan_end:]
+
+    string_numbers.update(map(int, SHARED_STRING_CELL.findall(remainder)))
+    style_numbers.update(map(int, STYLE_REFERENCE.findall(remainder)))
+
+    return string_numbers, style_numbers
+
+
+# Function used for adding the items a sheet refers to to the sheet's hash. Each item is added along with its number, so that a sheet that refers to
+# a different item (or to the same item under a different number) is given a different hash. It uses the raw XML of every item, the set of referred
+# item numbers, and the hash as input.
+def hash_referred_items(items, item_numbers, sheet_hash):
+    for item_number in sorted(item_numbers):
+        item = items[item_number] if item_number < len(items) else b""
+        sheet_hash.update(f"{item_number}:{len(item)}:".encode())
+        sheet_hash.update(item)
+
+
+# Function used for creating the cache key of every sheet in an Excel file. Each key is a hash of the sheet's XML part, the shared strings and cell
+# styles (along with the number formats) the sheet refers to, and the Pandas version used to build the DataFrame. A dictionary that associates each
+# sheet name with its cache key is returned. It uses the Excel file's name as input.
+def sheet_cache_keys(file_name):
+
+    with zipfile.ZipFile(file_name) as excel_file:
+        part_names = set(excel_file.namelist())
+
+        # The shared strings and cell styles are read once and the items each sheet refers to are added to the sheet's key.
+        shared_strings, _ = read_part_items(excel_file, SHARED_STRINGS_PART, STRING_ITEM)
+        cell_styles, number_formats = read_part_items(excel_file, STYLES_PART, CELL_STYLE_ITEM)
+
+        cache_keys = {}
+        for sheet_name, part_name in find_sheet_parts(excel_file).items():
+            if part_name in part_names:
+                sheet_hash = hashlib.sha256(pd.__version__.encode())
+                string_numbers, style_numbers = hash_sheet_part(excel_file, part_name, sheet_hash)
+                hash_referred_items(shared_strings, string_numbers, sheet_hash)
+                hash_referred_items(cell_styles, style_numbers, sheet_hash)
+                sheet_hash.update(number_formats)
+                cache_keys[sheet_name] = sheet_hash.hexdigest()
+
+    return cache_keys
+
+
+# Function used for creating the path of a sheet's cache files. Characters that can not be used in file names (such as the ">" in ">90 Day Archive")
+# are replaced. It uses the sheet name as input.
+def cache_path(sheet_name):
+    return os.path.join(CACHE_DIRECTORY, re.sub(r'[^A-Za-z0-9]+', '_', sheet_name).strip('_'))
+
+
+# Function used for loading a cached DataFrame. If there is no cached DataFrame for the sheet or its key does not match, None is returned. It uses the
+# sheet name and its cache key as input.
+def load_cached_frame(sheet_name, cache_key):
+
+    sheet_path = cache_path(sheet_name)
+
+    try:
+        with open(sheet_path + ".key", 'r') as file:
+            if file.read().strip() != cache_key:
+                return None
+        return pd.read_pickle(sheet_path + ".pkl")
+    except FileNotFoundError:
+        return None
+    except Exception:
+        detail(f"Cached DataFrame of '{sheet_name}' could not be read, it will be rebuilt.", logging.WARNING)
+        return None
+
+
+# Function used for saving an updated DataFrame to the cache before the updated Excel file is saved. The DataFrame is renumbered from 0, and its
+# empty annotation columns and unused categories are removed, so that it holds the same rows and values as the DataFrame the next run would build
+# from the saved sheet. The sheet's key file is removed first and only written once the updated Excel file has been saved (see save_cache_keys), so
+# a run that is interrupted never leaves a key that points to a DataFrame of a sheet that was not written. It uses the sheet name and the updated
+# DataFrame (with its date-containing columns already converted) as input.
+def stage_cached_frame(sheet_name, frame):
+
+    os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+    sheet_path = cache_path(sheet_name)
+
+    if os.path.isfile(sheet_path + ".key"):
+        os.remove(sheet_path + ".key")
+
+    frame = frame.reset_index(drop=True)
+    frame = frame.drop(columns=[annotation_column_name(column_name) for column_name in DATE_COLUMNS
+                                if annotation_column_name(column_name) in frame.columns and
+                                not frame[annotation_column_name(column_name)].notna().any()])
+    for position in CATEGORY_COLUMNS:
+        if position < len(frame.columns) and isinstance(frame.iloc[:, position].dtype, pd.CategoricalDtype):
+            frame.isetitem(position, frame.iloc[:, position].cat.remove_unused_categories())
+
+    frame.to_pickle(sheet_path + ".pkl")
+
+
+# Function used for writing the key files of the DataFrames saved to the cache once the updated Excel file has been saved. Each DataFrame is keyed by
+# the cache key of its sheet in the updated Excel file. It uses the dictionary of cache keys of the updated Excel file and the list of sheet names
+# whose DataFrames were saved as input.
+def save_cache_keys(cache_keys, sheet_names):
+    for sheet_name in sheet_names:
+        sheet_path = cache_path(sheet_name)
+        if cache_keys.get(sheet_name) is not None and os.path.isfile(sheet_path + ".pkl"):
+            with open(sheet_path + ".key", 'w') as file:
+                file.write(cache_keys[sheet_name])
+
+
+# Function used for creating the DataFrame of a sheet, using the cached DataFrame if the sheet has not changed since it was cached. A cache hit or
+# miss is reported for the sheet. A cached DataFrame already has its date-containing columns converted, which leaves nothing for the conversion to do
+# (see normalize_dates.py). It uses the function that builds the DataFrame of a sheet with the selected reader backend (see reader_backends.py), the
+# sheet name, and the dictionary of cache keys as input.
+def read_cached_sheet_frame(read_frame, sheet_name, cache_keys):
+
+    cache_key = cache_keys.get(sheet_name)
+
+    if cache_key is not None:
+        frame = load_cached_frame(sheet_name, cache_key)
+        if frame is not None:
+            detail(f"Sheet cache hit for '{sheet_name}'.")
+            return frame
+
+    # On a cache miss the DataFrame is built with the reader backend. The updated DataFrame is saved to the cache once the updated Excel file has been
+    # saved (see stage_cached_frame).
+    detail(f"Sheet cache miss for '{sheet_name}'.")
+    return read_frame(sheet_name)
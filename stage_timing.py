@@ -0,0 +1,39 @@
+
+# The purpose of this file is to keep track of how long each stage of the automation process takes to run. The timings are displayed at the end of
+# each run alongside the amount of times the Excel file was parsed.
+
+from time import time
+
+from console_output import announce, detail
+
+
+# A dictionary that associates the name of every stage that has been run with its start time and, once finished, its run time (in seconds).
+stage_times = {}
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for marking the start of a stage. It uses the stage name as input.
+def start_stage(stage_name):
+    stage_times[stage_name] = {'start': time(), 'run time': None}
+
+
+# Function used for marking the end of a stage. The stage's run time is saved and returned. It uses the stage name as input.
+def end_stage(stage_name):
+    stage = stage_times[stage_name]
+    stage['run time'] = round(time() - stage['start'], 2)
+    return stage['run time']
+
+
+# Function used for displaying the run time of every finished stage along with the amount of times the Excel file was parsed. It uses the parse
+# count as input.
+def report_stage_times(parse_count):
+
+    announce("Stage run times:")
+
+    # The run time of every finished stage is displayed in the order the stages were run.
+    for stage_name, stage in stage_times.items():
+        if stage['run time'] is not None:
+            detail(f"  {stage_name:<45} {stage['run time']:>8.2f} seconds")
+
+    detail(f"  {'Excel file parses':<45} {parse_count:>8}")
@@ -0,0 +1,170 @@
+
+# The purpose of this file is to update the archive sheet without ever holding the whole sheet in memory (streaming mode, see the --stream-archive
+# option of main.py). The main sheet is still loaded as a single DataFrame, but the archive sheet is read from the Excel file in chunks of rows:
+#   1. The chunks of the updated archive sheet (every archived row followed by the rows newly moved from the main sheet) are created one at a time
+#      by a generator. Each chunk has its date-containing columns converted the same way the whole archive sheet is converted in memory.
+#   2. The updated archive sheet is read through once to check the job times of every archived job and to gather its work area and month IDs.
+#   3. The updated archive sheet is read through a second time while it is being written to the updated Excel file.
+
+# NOTE: Every stage receives the exact same rows and values it would receive from the in-memory DataFrame, so the updated Excel file is identical to
+#       the one created without streaming. The peak memory use no longer depends on the size of the archive sheet, only on the size of each chunk
+#       and the amount of rows moved from the main sheet. (Only removing the duplicate jobs already in the archive sheet with the --dedupe-archive
+#       option keeps the job of every archived row in memory.)
+
+from datetime import datetime
+import logging
+
+import metrics_engine
+from archive_index import duplicate_job_mask, job_fingerprints, job_values
+from console_output import announce, detail, pause
+from job_frame_schema import apply_job_schema
+from load_workbook_data import iter_sheet_chunks, CHUNK_SIZE
+from update_area_metrics import areas
+from update_main_and_archive import format_main_sheet_dates, format_archive_sheet_dates, report_non_dates, archive_import_mask, \
+                                    sort_data
+from update_month_metrics import months
+
+
+# The name of the archive sheet.
+ARCHIVE_SHEET = '>90 Day Archive'
+
+# The keys the amounts of removed duplicate rows are counted under.
+REJECTED_ROWS = "Rows rejected as already archived"
+DEDUPED_ROWS = "Duplicate rows removed from archive sheet"
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating the chunks of the updated archive sheet. Every chunk of the archive sheet is yielded first, followed by the rows that are
+# moved from the main sheet. Each chunk holds the same columns (the archive sheet's columns followed by any column only present in the main sheet) and
+# is numbered the same way as the rows of the in-memory updated archive sheet. Rows moved from the main sheet whose job is already archived are
+# rejected (see archive_index.py). Only the jobs of the moved rows are kept in memory for this: each chunk of the archive sheet is checked for those
+# jobs, and the jobs found are saved to the import check dictionary, so that the next read through the archive sheet does not have to check its
+# chunks again. If duplicate jobs already in the archive sheet are removed, the job index of the whole archive sheet is created as its chunks are
+# read instead. It uses the workbook loaded in read-only mode, the rows moved from the main sheet, the amount of rows in each chunk, and, optionally,
+# a dictionary that the amount of cleared non-date cells in each column is added to, a dictionary that the amount of removed duplicate rows is added
+# to, a boolean that determines if duplicate jobs already in the archive sheet are removed, and the import check dictionary as input.
+def updated_archive_chunks(workbook, main_import, chunk_size=CHUNK_SIZE, non_date_counts=None, duplicate_counts=None, dedupe=False,
+                           import_checks=None):
+
+    import_checks = {} if import_checks is None else import_checks
+    columns = None
+    row_count = 0
+    job_index = set()
+    archived_jobs = import_checks.get('archived jobs')
+
+    for chunk in iter_sheet_chunks(workbook, ARCHIVE_SHEET, chunk_size):
+        if columns is None:
+            columns = chunk.columns.union(main_import.columns, sort=False)
+
+            # The rows moved from the main sheet are converted first, so that each chunk can be checked for their jobs.
+            imported_rows = format_archive_chunk(main_import.reindex(columns=columns).reset_index(drop=True), non_date_counts)
+            imported_jobs = set(job_fingerprints(job_values(imported_rows)).tolist()) if archived_jobs is None and len(imported_rows) > 0 else set()
+            found_jobs = set()
+
+        chunk = format_archive_chunk(chunk.reindex(columns=columns), non_date_counts)
+        if dedupe:
+            chunk = remove_duplicate_jobs(chunk, job_index, row_count, True, duplicate_counts, DEDUPED_ROWS)
+        else:
+            chunk.index = range(row_count, row_count + len(chunk))
+            if imported_jobs:
+                found_jobs.update(imported_jobs.intersection(job_fingerprints(job_values(chunk)).tolist()))
+        yield chunk
+        row_count += len(chunk)
+
+    if not dedupe:
+        if archived_jobs is None:
+            archived_jobs = import_checks['archived jobs'] = found_jobs
+        job_index = set(archived_jobs)
+
+    # The rows moved from the main sheet are numbered after the last archived row.
+    yield remove_duplicate_jobs(imported_rows, job_index, row_count, True, duplicate_counts, REJECTED_ROWS)
+
+
+# Function used for checking the rows of a chunk against the job index of the archive sheet (see archive_index.py). If requested, every row whose
+# job is already in the job index is removed and counted. The chunk is renumbered from its first row. It uses the chunk, the job index, the number of
+# the chunk's first row, a boolean that determines if duplicate rows are removed, and, optionally, a dictionary that the amount of removed rows is
+# added to and the key the amount is added under as input.
+def remove_duplicate_jobs(chunk, job_index, first_row, remove, duplicate_counts=None, count_key=None):
+
+    duplicates = duplicate_job_mask(chunk, job_index)
+    if remove and duplicates.any():
+        chunk = chunk[~duplicates]
+        if duplicate_counts is not None:
+            duplicate_counts[count_key] = duplicate_counts.get(count_key, 0) + int(duplicates.sum())
+
+    chunk.index = range(first_row, first_row + len(chunk))
+    return chunk
+
+
+# Function used for converting the date-containing columns of a chunk of the updated archive sheet and applying the loading schema to the chunk (see
+# job_frame_schema.py). It uses the chunk and, optionally, a dictionary that the amount of cleared non-date cells in each column is added to as
+# input.
+def format_archive_chunk(chunk, non_date_counts=None):
+    for column_name, non_date_count in format_archive_sheet_dates(chunk).items():
+        if non_date_counts is not None:
+            non_date_counts[column_name] = non_date_counts.get(column_name, 0) + non_date_count
+    return apply_job_schema(chunk)
+
+
+# Function used for updating the main sheet and creating the generator of the updated archive sheet's chunks. The rows of the main sheet that will be
+# moved to the archive sheet are found the same way as in update_main_and_archive.py. The updated main sheet and a function that creates a new
+# generator of the updated archive sheet's chunks are returned. It uses the main sheet, the workbook loaded in read-only mode, the amount of days a
+# job has to be completed for before it is moved to the archive sheet, the amount of rows in each chunk, and, optionally, the archive calendar of the
+# main sheet and a boolean that determines if duplicate jobs already in the archive sheet are removed as input.
+def update_main_and_stream_archive(main_sheet, workbook, archive_after_days=90, chunk_size=CHUNK_SIZE, calendar=None, dedupe=False):
+
+    # Correct the main sheet's date-contatining column formats.
+    main_non_dates = format_main_sheet_dates(main_sheet)
+
+    announce(f"Amount of rows in main sheet pre-update: {len(main_sheet) + 1}")
+    report_non_dates("Non-date values kept in main sheet", main_non_dates)
+    pause()
+
+    # Split the main sheet into the rows to keep and the rows to move to the archive sheet.
+    main_import, main_update = sort_data(main_sheet, archive_import_mask(main_sheet, datetime.now().date(), archive_after_days, calendar))
+
+    announce(f"Amount of rows to keep in main sheet: {len(main_update) + 1}")
+    detail(f"Amount of rows to import to archive sheet: {len(main_import)}")
+    pause()
+
+    # The function creates a new generator each time it is called, so the updated archive sheet can be read through more than once. The jobs of the
+    # moved rows that are found in the archive sheet during the first read through are reused by every following read through.
+    import_checks = {}
+    def archive_stream(non_date_counts=None, duplicate_counts=None):
+        return updated_archive_chunks(workbook, main_import, chunk_size, non_date_counts, duplicate_counts, dedupe, import_checks)
+
+    return main_update, archive_stream
+
+
+# Function used for reading through the updated archive sheet once. The job time totals of every archived job, the work area ID list, and the month
+# + year ID dictionary of the archive sheet are created from each chunk, and the amount of rows in the archive sheet is reported. It uses the
+# function that creates the generator of the updated archive sheet's chunks as input.
+def scan_archive_stream(archive_stream):
+
+    archive_totals = metrics_engine.create_job_time_totals()
+    archive_areas = []
+    archive_months = {}
+    non_date_counts = {}
+    duplicate_counts = {}
+    row_count = 0
+
+    for chunk in archive_stream(non_date_counts, duplicate_counts):
+        metrics_engine.add_sheet_to_totals(archive_totals, chunk)
+
+        # The work area and month ID functions work on rows numbered from 0, so each chunk is renumbered before it is checked. Chunks without any
+        # values hold no IDs and are skipped.
+        if chunk.first_valid_index() is not None:
+            numbered_chunk = chunk.reset_index(drop=True)
+            archive_areas += [area_ID for area_ID in areas(numbered_chunk) if area_ID not in archive_areas]
+            archive_months |= months(numbered_chunk)
+        row_count += len(chunk)
+
+    # The last chunk always holds the rows moved from the main sheet.
+    detail(f"Amount of rows in archive sheet pre-update: {row_count - len(chunk) + 1}")
+    detail(f"Amount of rows in archive sheet post-update: {row_count + 1}")
+    report_non_dates("Non-date values cleared in archive sheet", non_date_counts)
+    for description, duplicate_count in duplicate_counts.items():
+        detail(f"{description}: {duplicate_count}", logging.WARNING)
+
+    return archive_totals, archive_areas, archive_months
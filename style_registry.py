@@ -0,0 +1,97 @@
+
+# The purpose of this file is to hold every cell style used when restoring the format of the four updated sheets. Each font, fill, border, and
+# alignment is created a single time when the script starts and is shared by every cell that uses it, instead of a new style object being created
+# for each cell. The cell formats that are repeated on every row are also registered as named styles.
+
+# NOTE: Applying a named style to a cell only copies the style's already registered formatting, so OpenpyXL does not have to look up the cell's
+#       font, fill, border, alignment, and number format one at a time. A copy of each named style is added to a workbook the first time it is used
+#       in that workbook.
+
+from copy import copy
+
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating a solid fill of a single color. It uses the color (in hexadecimal RGB format) as input.
+def solid_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+# Function used for creating a named style. It uses the style's name and its formatting as input.
+def create_named_style(name, font, border=None, alignment=None, number_format='General'):
+    return NamedStyle(name=name, font=font, border=border or Border(), alignment=alignment or Alignment(), number_format=number_format)
+
+
+# Function used for applying a named style to a cell. The first time a named style is used in a workbook a copy of it is added to the workbook, and
+# the style is then applied by its name. It uses the cell and the named style as input.
+def apply_named_style(cell, named_style):
+    workbook = cell.parent.parent
+    if named_style.name not in workbook.named_styles:
+        workbook.add_named_style(NamedStyle(name=named_style.name, font=copy(named_style.font), border=copy(named_style.border),
+                                            alignment=copy(named_style.alignment), number_format=named_style.number_format))
+    cell.style = named_style.name
+
+
+# SHARED STYLE OBJECTS 👇 ----------------------------------------------------------------------------------------------------------------------------#
+
+# The border given to every cell of the four updated sheets.
+THIN_SIDE = Side(style='thin')
+THIN_BORDER = Border(top=THIN_SIDE, left=THIN_SIDE, right=THIN_SIDE, bottom=THIN_SIDE)
+
+# The fonts and alignment of the header rows and of each kind of column.
+HEADER_FONT = Font(name='Arial', size=11, bold=True)
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center', wrap_text=True)
+BODY_FONT = Font(name='Arial', size=16)
+NOTES_FONT = Font(name='Arial', size=11, bold=True)
+STATUS_FONT = Font(name='Arial', size=16, bold=True)
+CANCELLED_FONT = Font(color='ffffff', strike=True)
+LEGEND_FONT = Font(name='Calibri', size=12)
+
+# The lookup table that associates each status in the "Status" column of the main and archive sheets with the fill color of the row's "Job Completed
+# Date" and "Address" cells. The same colors are used in the legend of the main sheet.
+STATUS_FILL_COLORS = {
+                      'COMPLETED': '87CEFA',
+                      'HIGH PRIORITY': 'FF00FF',
+                      'KUB/GLOBAL': '00FFFF',
+                      'NEED TO CALL 811': 'DDA0DD',
+                      'WAITING ON 811': 'ffff00',
+                      'NOTES': 'ffd700',
+                      'ON HOLD/WAITING ON CUST TO CALL': '808000',
+                      'READY TO BURY': '9ACD32',
+                      'SCHEDULED': 'FF0000',
+                      'CANCELLED': '000000'
+                     }
+STATUS_FILLS = {status: solid_fill(color) for status, color in STATUS_FILL_COLORS.items()}
+
+# The fill of every "Notes" cell that has a value.
+NOTES_FILL = solid_fill('ffd700')
+
+# The fills used to rate the metrics of the analysis sheets.
+GREY_FILL = solid_fill('808080')
+GREEN_FILL = solid_fill('00FF00')
+LIGHT_GREEN_FILL = solid_fill('90EE90')
+LIGHT_RED_FILL = solid_fill('F08080')
+RED_FILL = solid_fill('FF0000')
+
+
+# NAMED STYLES 👇 ------------------------------------------------------------------------------------------------------------------------------------#
+
+# The header row of every updated sheet.
+HEADER_STYLE = create_named_style('Fiber Header', HEADER_FONT, THIN_BORDER, HEADER_ALIGNMENT)
+
+# The date columns (A-F), the other data columns (G-L), the "Notes" column (M), and the "Status" column (N) of the main and archive sheets.
+DATE_STYLE = create_named_style('Fiber Date', BODY_FONT, THIN_BORDER, number_format='mm-dd-yyyy')
+TEXT_STYLE = create_named_style('Fiber Text', BODY_FONT, THIN_BORDER)
+NOTES_STYLE = create_named_style('Fiber Notes', NOTES_FONT, THIN_BORDER)
+STATUS_STYLE = create_named_style('Fiber Status', STATUS_FONT, THIN_BORDER)
+
+# The named style of each column (A-N) of the main and archive sheets.
+MAIN_COLUMN_STYLES = [DATE_STYLE] * 6 + [TEXT_STYLE] * 6 + [NOTES_STYLE, STATUS_STYLE]
+
+# The "Job Completed Date" (F) and "Address" (G) cells of a row with a status of "CANCELLED" are given the white text font color with a strikethrough
+# effect in place of their column's font, since a conditional formatting rule can not change the name or size of a cell's font.
+CANCELLED_DATE_STYLE = create_named_style('Fiber Cancelled Date', CANCELLED_FONT, THIN_BORDER, number_format='mm-dd-yyyy')
+CANCELLED_TEXT_STYLE = create_named_style('Fiber Cancelled Text', CANCELLED_FONT, THIN_BORDER)
+CANCELLED_COLUMN_STYLES = {5: CANCELLED_DATE_STYLE, 6: CANCELLED_TEXT_STYLE}
@@ -0,0 +1,171 @@
+
+# The purpose of this file is to hold the helpers shared by every test. Each test runs the script (main.py) in its own temporary directory on a small
+# generated Excel file, so the tests never touch the Excel file or any of the state files kept beside the script.
+
+from datetime import datetime, timedelta
+import os
+import random
+import shutil
+import subprocess
+import sys
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+
+
+# The directory that holds the script. It is added to the import path so that the script's files can also be tested on their own.
+SCRIPT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIRECTORY)
+
+# The names of the Excel files read and written by the script.
+PRE_UPDATE = "Fiber Installations Database - Pre Update.xlsx"
+POST_UPDATE = "Fiber Installations Database - Post Update.xlsx"
+
+# The column names of the main and archive sheets.
+HEADER = ['Drop Installation Date', '811 Called in Date', 'Begin Work On', '811 Marked Date', 'Ticket Expiration Date', 'Job Completed Date',
+          'Address', 'CO', 'Account Number', 'Phone Number', 'Contractor', 'Description', 'Notes', 'Status']
+
+# The statuses and work area IDs the sample jobs are given. Both include the spacing and capitalization mistakes found in the real Excel file.
+STATUSES = ['COMPLETED', 'COMPLETED', 'COMPLETED', 'HIGH PRIORITY', 'KUB/GLOBAL', 'NEED TO CALL 811', 'WAITING ON 811', 'NOTES',
+            'ON HOLD/WAITING ON CUST TO CALL', 'READY TO BURY', 'SCHEDULED', 'CANCELLED', 'completed ', 'Completed']
+AREA_IDS = ['KN', 'ft', ' WE ', 'SO', 'NO', 'HA', 'XYZ', None, 'EA']
+
+# The colors of the main sheet's legend.
+LEGEND_COLORS = ['87CEFA', 'FF00FF', '00FFFF', 'DDA0DD', 'FFFF00', 'FFD700', '808000', '9ACD32', 'FF0000', '000000']
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating the values of a sample job. Some of the date-containing cells are left empty or hold a ?, a note, or a date written as
+# text, the same as in the real Excel file. It uses the random number generator, the current date, and a boolean that determines if the job is an
+# archived job as input.
+def sample_job(generator, today, archived):
+
+    start = today - timedelta(days=generator.randint(0, 1300 if archived else 400))
+    call811 = start + timedelta(days=generator.randint(-3, 5))
+    begin = call811 + timedelta(days=generator.randint(0, 5))
+    mark811 = call811 + timedelta(days=generator.randint(-1, 12))
+    dates = [start, call811, begin, mark811, mark811 + timedelta(days=15), start + timedelta(days=generator.randint(-2, 130))]
+
+    for position, job_date in enumerate(dates):
+        chance = generator.random()
+        if chance < 0.04:
+            dates[position] = None
+        elif chance < 0.06:
+            dates[position] = '?'
+        elif chance < 0.07:
+            dates[position] = 'waiting on cust'
+        elif chance < 0.08:
+            dates[position] = job_date.strftime('%m/%d/%Y')
+
+    status = 'COMPLETED' if archived and generator.random() < 0.9 else generator.choice(STATUSES)
+    return dates + [f"{generator.randint(1, 9999)} Main St", generator.choice(AREA_IDS), generator.randint(10 ** 6, 10 ** 7), '865-555-0100',
+                    generator.choice(['A', 'B', 'C']), 'Fiber drop', generator.choice([None, None, None, 'call first']), status]
+
+
+# Function used for creating a sample Excel file with the four sheets the script updates. The archive sheet holds three times as many jobs as the main
+# sheet, and the main sheet holds the legend next to its jobs. It uses the name of the Excel file, the amount of jobs in the main sheet, and the seed
+# of the random number generator as input.
+def create_sample_workbook(file_name, main_rows=120, seed=1):
+
+    generator = random.Random(seed)
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+
+    workbook = Workbook()
+    main_sheet = workbook.active
+    main_sheet.title = 'Main Installs'
+    main_sheet.append(HEADER)
+    for _ in range(main_rows):
+        main_sheet.append(sample_job(generator, today, archived=False))
+    for row, color in enumerate(LEGEND_COLORS, start=3):
+        main_sheet[f"O{row}"].fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
+        main_sheet[f"P{row}"] = 'legend'
+
+    archive_sheet = workbook.create_sheet('>90 Day Archive')
+    archive_sheet.append(HEADER)
+    for _ in range(main_rows * 3):
+        archive_sheet.append(sample_job(generator, today, archived=True))
+
+    for sheet_name in ['Area Metrics', 'Month-by-Month Metrics']:
+        analysis_sheet = workbook.create_sheet(sheet_name)
+        analysis_sheet.append(['ID', 'Value'])
+
+    for sheet in workbook.worksheets:
+        sheet['A1'].font = Font(bold=True)
+    workbook.save(file_name)
+
+
+# Function used for running the script in a directory. The run is checked to have finished with the expected exit code (by default, without errors)
+# and its output is returned. It uses the directory, the command line options of the run, and, optionally, the expected exit code as input.
+def run_script(directory, *options, returncode=0):
+    result = subprocess.run([sys.executable, os.path.join(SCRIPT_DIRECTORY, 'main.py'), '--headless', *options], cwd=directory,
+                            capture_output=True, text=True)
+    assert result.returncode == returncode, result.stdout + result.stderr
+    return result.stdout + result.stderr
+
+
+# Function used for making the updated Excel file of a directory the Excel file of the next day's run, the same way it is uploaded and downloaded
+# again between daily runs. It uses the directory as input.
+def start_next_day(directory):
+    shutil.copyfile(os.path.join(directory, POST_UPDATE), os.path.join(directory, PRE_UPDATE))
+
+
+# Function used for copying a directory (its Excel files and every state and cache file beside them), so that the same day can be run with different
+# options. It uses the directory and the path of the copy as input.
+def copy_directory(directory, copy_path):
+    shutil.copytree(directory, copy_path)
+    return copy_path
+
+
+# Function used for reading the format a conditional formatting rule gives a cell (its fill color, strikethrough, and font color). It uses the
+# conditional formatting rule as input.
+def rule_format(rule):
+    if rule.dxf is None:
+        return None
+    fill, font = rule.dxf.fill, rule.dxf.font
+    return (fill.fgColor.rgb if fill is not None else None, font.strike if font is not None else None,
+            font.color.rgb if font is not None and font.color is not None else None)
+
+
+# Function used for reading the values and formatting of every cell in an Excel file, along with the row heights, column widths, filters, and
+# conditional formatting of every sheet. Two Excel files that look the same when opened have the same snapshot. It uses the Excel file's name as
+# input.
+def workbook_snapshot(file_name):
+
+    workbook = load_workbook(file_name)
+    snapshot = {'sheets': workbook.sheetnames}
+
+    for sheet in workbook.worksheets:
+        cells = {}
+        for row in sheet.iter_rows():
+            for cell in row:
+                cells[cell.coordinate] = (cell.value, cell.number_format, cell.font.name, cell.font.sz, cell.font.b, cell.font.strike,
+                                          cell.font.color.rgb if cell.font.color is not None else None, cell.fill.fill_type,
+                                          cell.fill.fgColor.rgb if cell.fill.fill_type else None, cell.border.left.style,
+                                          cell.border.top.style, cell.alignment.horizontal, cell.alignment.wrap_text)
+
+        snapshot[sheet.title] = {
+            'cells': cells,
+            'rows': {row: dimension.height for row, dimension in sheet.row_dimensions.items() if dimension.height},
+            'default row height': sheet.sheet_format.defaultRowHeight,
+            'columns': {column: dimension.width for column, dimension in sheet.column_dimensions.items() if dimension.width},
+            'filter': sheet.auto_filter.ref,
+            'conditional formatting': sorted((str(formatting.sqref), rule.type, rule.operator, tuple(rule.formula or ()), rule.stopIfTrue,
+                                              rule.priority, rule_format(rule))
+                                             for formatting in sheet.conditional_formatting for rule in formatting.rules)
+        }
+
+    return snapshot
+
+
+# FIXTURES 👇 ----------------------------------------------------------------------------------------------------------------------------------------#
+
+# A directory that holds a sample Excel file, along with the backup and run time log directories the script expects beside it.
+@pytest.fixture
+def sample_directory(tmp_path):
+    directory = tmp_path / "day"
+    os.makedirs(directory / "Backups")
+    os.makedirs(directory / "Run Times")
+    create_sample_workbook(directory / PRE_UPDATE)
+    return directory
@@ -0,0 +1,46 @@
+
+# Tests of skipping the archival when no rows are due (see archive_calendar.py). A run that keeps the main and archive sheets as they are has to
+# create the exact same updated Excel file as a run that writes and formats both sheets in full (--full-restyle).
+
+from openpyxl import load_workbook
+from openpyxl.styles import PatternFill
+
+from conftest import PRE_UPDATE, POST_UPDATE, copy_directory, run_script, start_next_day, workbook_snapshot
+
+
+# No job has been completed for this many days, so no rows are due for archival.
+NOTHING_DUE = '100000'
+
+
+def test_unedited_sheets_are_kept_when_nothing_is_due(sample_directory, tmp_path):
+
+    run_script(sample_directory)
+    start_next_day(sample_directory)
+
+    restyled_directory = copy_directory(sample_directory, tmp_path / "restyled")
+    output = run_script(sample_directory, '--archive-after-days', NOTHING_DUE)
+    run_script(restyled_directory, '--archive-after-days', NOTHING_DUE, '--full-restyle')
+
+    assert "Rows due for archival found from the archive calendar" in output
+    assert "Rows of 'Main Installs' above row" in output
+    assert "Rows of '>90 Day Archive' above row" in output
+    assert workbook_snapshot(sample_directory / POST_UPDATE) == workbook_snapshot(restyled_directory / POST_UPDATE)
+
+
+# A main sheet that is edited by hand between runs is written and formatted again, even if no rows are due for archival.
+def test_edited_main_sheet_is_rewritten_when_nothing_is_due(sample_directory, tmp_path):
+
+    run_script(sample_directory)
+    start_next_day(sample_directory)
+
+    workbook = load_workbook(sample_directory / PRE_UPDATE)
+    for cell in workbook['Main Installs'][5]:
+        cell.fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
+    workbook.save(sample_directory / PRE_UPDATE)
+
+    restyled_directory = copy_directory(sample_directory, tmp_path / "restyled")
+    output = run_script(sample_directory, '--archive-after-days', NOTHING_DUE)
+    run_script(restyled_directory, '--archive-after-days', NOTHING_DUE, '--full-restyle')
+
+    assert "Rows of 'Main Installs' above row" not in output
+    assert workbook_snapshot(sample_directory / POST_UPDATE) == workbook_snapshot(restyled_directory / POST_UPDATE)
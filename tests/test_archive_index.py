@@ -0,0 +1,93 @@
+
+# Tests of the archive index (see archive_index.py). Rows moved from the main sheet whose job is already in the archive sheet are rejected, and the
+# saved index is only reused while it describes the archive sheet being updated.
+
+from datetime import datetime, timedelta
+import os
+import random
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from archive_index import (ARCHIVE_INDEX_FILE, create_index_state, dedupe_archive_sheet, duplicate_job_mask, load_archive_index, reject_duplicate_jobs,
+                           save_archive_index)
+from conftest import HEADER, PRE_UPDATE, POST_UPDATE, copy_directory, run_script, sample_job, start_next_day, workbook_snapshot
+
+
+# Function used for creating a sheet of sample jobs. It uses the amount of jobs and the seed of the random number generator as input.
+def sample_sheet(row_count, seed=1):
+    generator = random.Random(seed)
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    return pd.DataFrame([sample_job(generator, today, archived=True) for _ in range(row_count)], columns=HEADER)
+
+
+# A job that appears more than once is only kept the first time, while rows without any job values are never treated as duplicates.
+def test_duplicate_job_mask_keeps_first_row_of_each_job():
+
+    sheet = sample_sheet(5)
+    rows = pd.concat([sheet, sheet.iloc[[1, 3]]], ignore_index=True).reindex(range(9))
+
+    job_index = set()
+    duplicates = duplicate_job_mask(rows, job_index)
+
+    assert duplicates.tolist() == [False] * 5 + [True, True] + [False, False]
+    assert len(job_index) == 5
+
+
+# Rows moved into the archive sheet whose job is already archived (or that repeat another moved row) are rejected.
+def test_reject_duplicate_jobs_rejects_archived_jobs(tmp_path, monkeypatch, capsys):
+
+    monkeypatch.chdir(tmp_path)
+    archive_sheet = sample_sheet(30)
+    moved_rows = pd.concat([sample_sheet(4, seed=2), archive_sheet.iloc[[0, 7]], sample_sheet(1, seed=2)], ignore_index=True)
+
+    updated_sheet, job_index = reject_duplicate_jobs(pd.concat([archive_sheet, moved_rows], ignore_index=True), len(archive_sheet))
+
+    assert "No archive index found" in capsys.readouterr().out
+    assert len(updated_sheet) == 34
+    assert updated_sheet.equals(pd.concat([archive_sheet, moved_rows.iloc[:4]], ignore_index=True))
+    assert len(job_index) == 34
+
+
+# A saved index is only reused for the archive sheet it was saved for (the same sheet cache key and amount of rows).
+def test_saved_index_is_only_reused_for_the_same_archive_sheet(tmp_path, monkeypatch, capsys):
+
+    monkeypatch.chdir(tmp_path)
+    archive_sheet, job_index = dedupe_archive_sheet(sample_sheet(30))
+    save_archive_index(create_index_state(job_index, archive_sheet), 'archive key')
+
+    assert load_archive_index('archive key', len(archive_sheet)) == job_index
+    assert load_archive_index('edited archive key', len(archive_sheet)) is None
+    assert load_archive_index('archive key', len(archive_sheet) - 1) is None
+    assert load_archive_index(None, len(archive_sheet)) is None
+    assert "does not match the archive sheet" in capsys.readouterr().out
+
+    assert load_archive_index('archive key', len(archive_sheet), index_file=str(tmp_path / "missing.json")) is None
+    assert "No archive index found" in capsys.readouterr().out
+    assert (tmp_path / ARCHIVE_INDEX_FILE).is_file()
+
+
+# A job in the middle of the archive sheet that is edited by hand between runs is no longer archived, so a row of the main sheet that holds the job as
+# it was before the edit is archived instead of being rejected against the saved index.
+def test_edited_archive_row_forces_new_index(sample_directory, tmp_path):
+
+    run_script(sample_directory)
+    start_next_day(sample_directory)
+
+    workbook = load_workbook(sample_directory / PRE_UPDATE)
+    archive_sheet = workbook['>90 Day Archive']
+    cutoff_date = datetime.now() - timedelta(days=200)
+    edited_row = next(row for row in archive_sheet.iter_rows(min_row=archive_sheet.max_row // 2)
+                      if row[13].value == 'COMPLETED' and isinstance(row[5].value, datetime) and row[5].value < cutoff_date)
+    workbook['Main Installs'].append([cell.value for cell in edited_row[:len(HEADER)]])
+    edited_row[6].value = "1 Other St"
+    workbook.save(sample_directory / PRE_UPDATE)
+
+    rebuilt_directory = copy_directory(sample_directory, tmp_path / "rebuilt")
+    os.remove(rebuilt_directory / ARCHIVE_INDEX_FILE)
+    output = run_script(sample_directory)
+    rebuilt_output = run_script(rebuilt_directory)
+
+    assert "Archive index does not match the archive sheet" in output
+    assert "Rows rejected as already archived" not in output + rebuilt_output
+    assert workbook_snapshot(sample_directory / POST_UPDATE) == workbook_snapshot(rebuilt_directory / POST_UPDATE)
@@ -0,0 +1,51 @@
+
+# Tests of the archive metrics state (see archive_metrics_state.py). A run that loads the archive totals from the state file and only checks the newly
+# archived rows has to create the exact same updated Excel file as a run that checks every row of the archive sheet (--rebuild-metrics).
+
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from conftest import PRE_UPDATE, POST_UPDATE, copy_directory, run_script, start_next_day, workbook_snapshot
+
+
+# Each following day moves more rows into the archive sheet, by archiving jobs that have been completed for less days than the day before.
+def test_incremental_totals_match_rebuild(sample_directory, tmp_path):
+
+    output = run_script(sample_directory)
+    assert "No archive metrics state found" in output
+
+    for day, archive_after_days in enumerate(['60', '30'], start=2):
+        start_next_day(sample_directory)
+        rebuilt_directory = copy_directory(sample_directory, tmp_path / f"rebuilt day {day}")
+
+        output = run_script(sample_directory, '--archive-after-days', archive_after_days, '--verify-metrics')
+        rebuilt_output = run_script(rebuilt_directory, '--archive-after-days', archive_after_days, '--rebuild-metrics')
+
+        assert "Archive totals loaded from state file" in output
+        assert "Archive totals match a full check of the archive sheet" in output
+        assert "Full rebuild requested" in rebuilt_output
+        assert workbook_snapshot(sample_directory / POST_UPDATE) == workbook_snapshot(rebuilt_directory / POST_UPDATE)
+
+
+# A row in the middle of the archive sheet that is edited by hand between runs (such as a status or date fix) changes the archive totals, so the saved
+# totals must not be reused.
+def test_edited_archive_row_forces_full_check(sample_directory, tmp_path):
+
+    run_script(sample_directory)
+    start_next_day(sample_directory)
+
+    workbook = load_workbook(sample_directory / PRE_UPDATE)
+    archive_sheet = workbook['>90 Day Archive']
+    middle_row = archive_sheet.max_row // 2
+    archive_sheet.cell(middle_row, 1).value = datetime(2020, 1, 1)
+    archive_sheet.cell(middle_row, 6).value = datetime(2020, 3, 1)
+    archive_sheet.cell(middle_row, 14).value = 'COMPLETED'
+    workbook.save(sample_directory / PRE_UPDATE)
+
+    rebuilt_directory = copy_directory(sample_directory, tmp_path / "rebuilt")
+    output = run_script(sample_directory, '--archive-after-days', '60')
+    run_script(rebuilt_directory, '--archive-after-days', '60', '--rebuild-metrics')
+
+    assert "Archive metrics state file does not match the archive sheet" in output
+    assert workbook_snapshot(sample_directory / POST_UPDATE) == workbook_snapshot(rebuilt_directory / POST_UPDATE)
@@ -0,0 +1,84 @@
+
+# Tests of the deduplicated backup store (see backup_store.py). A restored backup has to hold exactly the same parts as the Excel file that was backed
+# up, and a sheet whose rows moved by one row has to be stored mostly from the chunks of the previous backup.
+
+import json
+import os
+import zipfile
+
+from openpyxl import load_workbook
+import pytest
+
+from backup_store import BACKUP_DIRECTORY, OBJECT_DIRECTORY, manifest_path, restore_backup, save_backup
+from check_backup_directory_and_run_time_log import create_month_key
+from conftest import create_sample_workbook, run_script
+
+
+# Backup dates that are not real dates written in mm-dd-YYYY format.
+MALFORMED_DATES = ['2026-10-01', '10/01/2026', '13-01-2026', '02-30-2026', '1-5-2026', '10-01-26', 'yesterday', '']
+
+
+# Function used for reading the name and contents of every part of an Excel file, in the order they are stored. It uses the Excel file's name as
+# input.
+def excel_parts(file_name):
+    with zipfile.ZipFile(file_name) as excel_file:
+        return [(part_info.filename, excel_file.read(part_info)) for part_info in excel_file.infolist()]
+
+
+# Function used for counting the chunks held in the backup store.
+def stored_chunk_count():
+    return sum(len(file_names) for _, _, file_names in os.walk(OBJECT_DIRECTORY))
+
+
+# The first backup is restored to the same parts, and the backup of the next day (after a row was removed from the top of the main sheet) is restored
+# to the same parts while only storing the few chunks around the removed row again.
+def test_restored_backups_match_backed_up_files(tmp_path, monkeypatch):
+
+    monkeypatch.chdir(tmp_path)
+    create_sample_workbook("Original.xlsx", main_rows=1000)
+
+    workbook = load_workbook("Original.xlsx")
+    workbook.save("First Day.xlsx")
+    workbook['Main Installs'].delete_rows(3)
+    workbook.save("Second Day.xlsx")
+
+    month_key = create_month_key("10-01-2026")
+    save_backup("First Day.xlsx", month_key, "10-01-2026")
+    first_day_chunks = stored_chunk_count()
+    save_backup("Second Day.xlsx", month_key, "10-02-2026")
+    new_chunks = stored_chunk_count() - first_day_chunks
+
+    restore_backup("10-01-2026", "First Day Restored.xlsx")
+    restore_backup("10-02-2026", "Second Day Restored.xlsx")
+    assert excel_parts("First Day Restored.xlsx") == excel_parts("First Day.xlsx")
+    assert excel_parts("Second Day Restored.xlsx") == excel_parts("Second Day.xlsx")
+
+    with open(manifest_path(month_key, "10-02-2026"), 'r') as file:
+        main_sheet_part = next(part for part in json.load(file)['parts'] if part['name'] == 'xl/worksheets/sheet1.xml')
+    assert main_sheet_part['relative rows']
+    assert len(main_sheet_part['chunks']) >= 10
+    assert new_chunks <= 5
+
+
+# A malformed date is refused before any backup is looked for, instead of being reported as a missing backup (or looked for in a "None" directory).
+@pytest.mark.parametrize('backup_date', MALFORMED_DATES)
+def test_malformed_backup_date_is_refused(tmp_path, monkeypatch, backup_date):
+
+    monkeypatch.chdir(tmp_path)
+    os.mkdir(BACKUP_DIRECTORY)
+
+    with pytest.raises(ValueError, match="expected a date in mm-dd-YYYY format"):
+        restore_backup(backup_date, "Restored.xlsx")
+    assert os.listdir(tmp_path) == [BACKUP_DIRECTORY]
+
+
+# A well-formed date without a backup is still reported as a missing backup, and the script reports a malformed date as a usage error.
+def test_missing_backup_and_malformed_option(sample_directory, monkeypatch):
+
+    monkeypatch.chdir(sample_directory)
+    with pytest.raises(FileNotFoundError, match="No backup found for date: 10-01-2026"):
+        restore_backup("10-01-2026", "Restored.xlsx")
+
+    output = run_script(sample_directory, '--restore-backup', '2026-10-01', returncode=2)
+    assert "Invalid backup date: '2026-10-01'" in output
+    assert "Traceback" not in output
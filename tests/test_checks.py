@@ -0,0 +1,81 @@
+# Tests of the columnar time checks (see checks.py). Every time check has to give each row the same whole day value as the script did before, when
+# the checks were made one row at a time: only rows whose two dates are both present, and whose time is between 0 and 100 days, are given a value.
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from checks import CALL811_TO_MARK811, MARK811_TO_COMPLETE, START_TO_COMPLETE, interval_days, time_checks
+from conftest import HEADER
+
+
+# Each row holds the "Drop Installation Date", "811 Called in Date", "811 Marked Date", "Job Completed Date", and "Status" of a job, followed by the
+# hand-computed start to completion, 811 call to 811 mark, and 811 mark to completion times (in days) of the job.
+TIME_CHECK_ROWS = {
+    'completed job': (datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 5), datetime(2024, 1, 20), 'COMPLETED', 19, 3, 15),
+    'negative gaps': (datetime(2024, 1, 20), datetime(2024, 1, 5), datetime(2024, 1, 3), datetime(2024, 1, 10), 'Completed', None, None, 7),
+    'exactly 100 days': (datetime(2024, 1, 1), datetime(2024, 1, 1), datetime(2024, 4, 10), datetime(2024, 4, 10), 'completed', 100, 100, 0),
+    'over 100 days': (datetime(2024, 1, 1), datetime(2024, 1, 1), datetime(2024, 4, 11), datetime(2024, 4, 11), 'completed', None, None, 0),
+    'across a year': (datetime(2023, 12, 20), datetime(2023, 12, 28), datetime(2024, 1, 2), datetime(2024, 1, 5), 'COMPLETED', 16, 5, 3),
+    'missing 811 dates': (datetime(2024, 1, 1), None, '?', datetime(2024, 1, 20), 'COMPLETED', 19, None, None),
+    'missing completion': (datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 5), pd.NaT, 'COMPLETED', None, 3, None),
+    'missing start': (pd.NaT, datetime(2024, 1, 2), datetime(2024, 1, 5), datetime(2024, 1, 20), 'COMPLETED', None, 3, 15),
+    'partial days': (datetime(2024, 1, 1, 18), datetime(2024, 1, 2, 9), datetime(2024, 1, 2, 8), datetime(2024, 1, 3, 7), 'COMPLETED', 1, None, 0),
+    'status with spaces': (datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 5), datetime(2024, 1, 20), 'completed ', None, 3, 15),
+    'other status': (datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 5), datetime(2024, 1, 20), 'CANCELLED', None, 3, 15),
+    'missing status': (datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 5), datetime(2024, 1, 20), None, None, 3, 15),
+}
+
+# Each row holds a start date, an end date, and the hand-computed time (in days) between them.
+INTERVAL_ROWS = [
+    (datetime(2024, 1, 1), datetime(2024, 1, 1), 0),
+    (datetime(2024, 1, 2), datetime(2024, 1, 1), None),
+    (datetime(2024, 1, 1, 12), datetime(2024, 1, 1), None),
+    (datetime(2024, 1, 1), datetime(2024, 1, 1, 23), 0),
+    (datetime(2024, 2, 28), datetime(2024, 3, 1), 2),
+    (datetime(2023, 12, 31), datetime(2024, 4, 9), 100),
+    (datetime(2023, 12, 31), datetime(2024, 4, 10), None),
+    (pd.NaT, datetime(2024, 1, 1), None),
+    (datetime(2024, 1, 1), pd.NaT, None),
+]
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating a sheet that holds one job for each time check row. The date-containing columns are either kept as they are written in
+# the Excel file (object) or converted to date values (datetime64), where a ? is left empty. It uses the storage of the date-containing columns as
+# input.
+def time_check_sheet(storage):
+    sheet = pd.DataFrame([[None] * len(HEADER) for _ in TIME_CHECK_ROWS], columns=HEADER, dtype=object)
+    for column_name, position in [('Drop Installation Date', 0), ('811 Called in Date', 1), ('811 Marked Date', 2), ('Job Completed Date', 3),
+                                  ('Status', 4)]:
+        sheet[column_name] = pd.Series([row[position] for row in TIME_CHECK_ROWS.values()], dtype=object)
+        if storage == 'datetime64' and column_name != 'Status':
+            sheet[column_name] = pd.to_datetime(sheet[column_name], errors='coerce')
+    sheet['Status'] = sheet['Status'].astype('category')
+    return sheet
+
+
+# Function used for turning a column of whole day values into a list, where every empty value is replaced with None. It uses a column as input.
+def day_values(column):
+    return [None if pd.isna(value) else int(value) for value in column]
+
+
+@pytest.mark.parametrize('storage', ['object', 'datetime64'])
+def test_time_checks_match_hand_computed_days(storage):
+
+    checks = time_checks(time_check_sheet(storage))
+
+    assert list(checks.columns) == [START_TO_COMPLETE, CALL811_TO_MARK811, MARK811_TO_COMPLETE]
+    assert all(str(dtype) == 'Int64' for dtype in checks.dtypes)
+    for position, row in enumerate(TIME_CHECK_ROWS.values()):
+        assert day_values(checks.iloc[position]) == list(row[5:]), list(TIME_CHECK_ROWS)[position]
+
+
+def test_interval_days_match_hand_computed_days():
+
+    start_dates = pd.Series([row[0] for row in INTERVAL_ROWS], dtype='datetime64[ns]')
+    end_dates = pd.Series([row[1] for row in INTERVAL_ROWS], dtype='datetime64[ns]')
+
+    assert day_values(interval_days(start_dates, end_dates)) == [row[2] for row in INTERVAL_ROWS]
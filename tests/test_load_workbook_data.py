@@ -0,0 +1,54 @@
+
+# Tests of building the main and archive sheet DataFrames from the loaded workbook (see load_workbook_data.py). The DataFrames built from the cells of
+# the workbook loaded with its formulas have to be the same as the DataFrames built from a values view of the Excel file, and the Excel file is only
+# parsed a second time when the sheet holds formula cells.
+
+import zipfile
+
+from openpyxl import load_workbook
+
+import load_workbook_data
+from conftest import PRE_UPDATE, create_sample_workbook
+from load_workbook_data import load_fiber_workbook, load_streaming_workbook, read_sheet_frame
+from reader_backends import frames_identical
+
+
+# Function used for giving every formula cell of the main sheet a saved value, the same way Excel saves the value of a formula next to it. It uses the
+# Excel file's name and the dictionary that associates each formula with its saved value as input.
+def save_formula_values(file_name, formula_values):
+
+    with zipfile.ZipFile(file_name) as excel_file:
+        parts = [(part_info, excel_file.read(part_info)) for part_info in excel_file.infolist()]
+
+    with zipfile.ZipFile(file_name, 'w', zipfile.ZIP_DEFLATED) as excel_file:
+        for part_info, data in parts:
+            if part_info.filename == 'xl/worksheets/sheet1.xml':
+                for formula, value in formula_values.items():
+                    data = data.replace(f"<f>{formula}</f><v />".encode(), f"<f>{formula}</f><v>{value}</v>".encode())
+            excel_file.writestr(part_info, data)
+
+
+def test_loaded_workbook_frames_match_values_view(tmp_path):
+
+    file_name = tmp_path / PRE_UPDATE
+    create_sample_workbook(file_name)
+
+    parse_count = load_workbook_data.parse_count
+    frame = read_sheet_frame(load_fiber_workbook(file_name), 'Main Installs', file_name)
+    assert load_workbook_data.parse_count == parse_count + 1
+    assert frames_identical(frame, read_sheet_frame(load_streaming_workbook(file_name), 'Main Installs'))
+
+
+def test_formula_cells_are_given_their_saved_values(tmp_path):
+
+    file_name = tmp_path / PRE_UPDATE
+    create_sample_workbook(file_name)
+    workbook = load_workbook(file_name)
+    workbook['Main Installs']['I5'] = '=2*3'
+    workbook['Main Installs']['L7'] = '=1+1'
+    workbook.save(file_name)
+    save_formula_values(file_name, {'2*3': 6, '1+1': 2})
+
+    frame = read_sheet_frame(load_fiber_workbook(file_name), 'Main Installs', file_name)
+    assert frame.iloc[3, 8] == 6 and frame.iloc[5, 11] == 2
+    assert frames_identical(frame, read_sheet_frame(load_streaming_workbook(file_name), 'Main Installs'))
@@ -0,0 +1,85 @@
+# Tests of the month IDs of the month-by-month metrics (see metrics_engine.py). Every row is given the period code of its month (year * 12 + month
+# - 1) instead of a "mm-YYYY" string, so the month IDs and the order of the "Month-by-Month Metrics" rows have to stay the same as when the script
+# built the "mm-YYYY" strings one row at a time and sorted them by their month value plus a value of 100 for every year after 2022.
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from conftest import HEADER
+from job_frame_schema import apply_job_schema
+from metrics_engine import month_ID_column, month_period_codes, period_label
+from update_month_metrics import merge_and_sort_sheet_months, update_month_metrics
+
+
+# The "Drop Installation Date" values of the sample main and archive sheets. Both sheets cross the year boundary from 12-2023 to 01-2024, are not in
+# date order, and hold cells that are not dates.
+MAIN_DATES = [datetime(2024, 1, 15), datetime(2023, 12, 31, 23, 59), '?', datetime(2024, 2, 29), None, datetime(2024, 1, 1), datetime(2023, 12, 1)]
+ARCHIVE_DATES = [datetime(2023, 11, 30), datetime(2024, 10, 2), pd.NaT, datetime(2023, 2, 1), datetime(2024, 1, 31), datetime(2023, 10, 9)]
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating the "mm-YYYY" month ID of a date, the same as the script did before. It uses a date as input.
+def baseline_month_ID(value):
+    return value.strftime('%m-%Y')
+
+
+# Function used for creating the value a month ID was sorted by before: the month plus 100 for every year after 2022. It uses a month ID as input.
+def baseline_sort_value(month_ID):
+    month, year = month_ID.split('-')
+    return int(month) + (int(year) - 2022) * 100
+
+
+# Function used for finding the values that are dates (pd.NaT counts as a datetime object, but holds no date). It uses a list of cell values as
+# input.
+def date_cells(values):
+    return [value for value in values if isinstance(value, datetime) and value is not pd.NaT]
+
+
+# Function used for creating a sheet whose "Drop Installation Date" column holds the given values. Every job is a completed job. It uses a list of
+# cell values as input.
+def month_sheet(dates):
+    sheet = pd.DataFrame([[None] * len(HEADER) for _ in dates], columns=HEADER, dtype=object)
+    sheet['Drop Installation Date'] = pd.Series(dates, dtype=object)
+    sheet['Job Completed Date'] = pd.Series([value + pd.Timedelta(days=5) if date_cells([value]) else None for value in dates], dtype=object)
+    sheet['CO'] = 'KN'
+    sheet['Status'] = 'COMPLETED'
+    return apply_job_schema(sheet)
+
+
+@pytest.mark.parametrize('value', [datetime(2023, 1, 1), datetime(2023, 11, 30), datetime(2023, 12, 31, 23, 59), datetime(2024, 1, 1),
+                                   datetime(2024, 2, 29), datetime(2040, 12, 31)])
+def test_period_label_matches_month_ID(value):
+
+    period_code = month_period_codes(month_sheet([value]))[0]
+
+    assert period_code == value.year * 12 + value.month - 1
+    assert period_label(period_code) == baseline_month_ID(value)
+    assert month_ID_column(month_sheet([value]))[0] == baseline_month_ID(value)
+
+
+def test_period_codes_sort_like_month_IDs():
+
+    dates = [datetime(year, month, 1) for year in (2023, 2024, 2025) for month in range(1, 13)]
+    period_codes = month_period_codes(month_sheet(dates))
+
+    assert list(period_codes) == sorted(period_codes)
+    assert [period_label(period_code) for period_code in period_codes] == \
+           sorted(map(baseline_month_ID, dates), key=baseline_sort_value)
+    assert period_codes[dates.index(datetime(2024, 1, 1))] == period_codes[dates.index(datetime(2023, 12, 1))] + 1
+
+
+def test_month_rows_follow_baseline_sort():
+
+    main_sheet, archive_sheet = month_sheet(MAIN_DATES), month_sheet(ARCHIVE_DATES)
+    month_IDs = [baseline_month_ID(value) for value in date_cells(MAIN_DATES + ARCHIVE_DATES)]
+    expected_order = sorted(set(month_IDs), key=baseline_sort_value)
+
+    assert expected_order[:6] == ['02-2023', '10-2023', '11-2023', '12-2023', '01-2024', '02-2024']
+    assert list(merge_and_sort_sheet_months(main_sheet, archive_sheet)) == expected_order
+
+    month_metrics = update_month_metrics(main_sheet, archive_sheet)
+    assert list(month_metrics['Month']) == expected_order
+    assert list(month_metrics['# of Jobs (< 10 Days)']) == [month_IDs.count(month_ID) for month_ID in expected_order]
@@ -0,0 +1,85 @@
+# Tests of converting the date-containing columns a whole column at a time (see normalize_dates.py). Converting a column and merging its annotations
+# back has to give every cell the exact same value as the script did before, when each cell of the column was converted on its own with
+# pd.to_datetime() (errors='ignore' for the main sheet, which keeps the cells that can not be converted, and errors='coerce' for the archive sheet,
+# which clears them out).
+
+from datetime import datetime
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from normalize_dates import DATE_COLUMNS, annotation_column_name, merge_date_annotations, normalize_sheet_dates
+
+
+# The values of the date-containing column each test case converts. The other date-containing columns hold dates.
+COLUMN_VALUES = {
+    'dates': [datetime(2024, 1, 5), pd.Timestamp('2023-12-31'), datetime(2024, 2, 29, 10, 30)],
+    'text with dates': ['01/05/2024', '1/5/2024', '2024-01-05', '12/31/2023 10:30', '13/01/2024', 'Jan 5 2024', 'waiting on cust 01/05/2024',
+                        '?', '01/05/2024'],
+    'missing dates': [pd.NaT, datetime(2024, 1, 5), None, np.nan, pd.NaT],
+    'blank column': [None, None, None],
+    'blank notes': [datetime(2024, 1, 5), None, datetime(2023, 12, 31)],
+    'excel serial numbers': [45296, 45296.5, 45296, datetime(2024, 1, 5), 'waiting on cust'],
+}
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating a sheet whose "Job Completed Date" column holds the given values, along with an empty "Notes" column. It uses a list of
+# cell values as input.
+def sample_sheet(values):
+    sheet = pd.DataFrame({column_name: [datetime(2024, 1, 1)] * len(values) for column_name in DATE_COLUMNS})
+    sheet['Job Completed Date'] = pd.Series(values, dtype=object)
+    sheet['Notes'] = None
+    return sheet
+
+
+# Function used for converting each cell of a column on its own, the same as the script did before. It uses a sheet, a column name, and the errors
+# argument given to pd.to_datetime() as input.
+def baseline_column(sheet, column_name, errors):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return list(sheet.apply(lambda row: pd.to_datetime(row[column_name], errors=errors), axis=1))
+
+
+# Function used for making the values of a column comparable: every empty value is replaced with None and every other value is paired with its type.
+# It uses a list of cell values as input.
+def comparable(values):
+    return [None if pd.isna(value) else (type(value), value) for value in values]
+
+
+@pytest.mark.parametrize('case', COLUMN_VALUES)
+def test_main_sheet_matches_row_by_row_conversion(case):
+
+    sheet = sample_sheet(COLUMN_VALUES[case])
+    expected = {column_name: baseline_column(sheet, column_name, 'ignore') for column_name in DATE_COLUMNS}
+
+    normalize_sheet_dates(sheet, keep_non_dates=True)
+    merged_sheet = merge_date_annotations(sheet)
+
+    assert list(merged_sheet.columns) == DATE_COLUMNS + ['Notes']
+    for column_name in DATE_COLUMNS:
+        assert comparable(merged_sheet[column_name]) == comparable(expected[column_name])
+
+
+@pytest.mark.parametrize('case', COLUMN_VALUES)
+def test_archive_sheet_matches_row_by_row_conversion(case):
+
+    sheet = sample_sheet(COLUMN_VALUES[case])
+    sheet[annotation_column_name('Job Completed Date')] = pd.Series(['?'] + [None] * (len(sheet) - 1), dtype=object)
+    expected = {column_name: baseline_column(sheet, column_name, 'coerce') for column_name in DATE_COLUMNS}
+
+    non_date_counts = normalize_sheet_dates(sheet, keep_non_dates=False)
+
+    assert list(sheet.columns) == DATE_COLUMNS + ['Notes']
+    assert merge_date_annotations(sheet) is sheet
+    for column_name in DATE_COLUMNS:
+        assert pd.api.types.is_datetime64_any_dtype(sheet[column_name])
+        assert comparable(sheet[column_name]) == comparable(expected[column_name])
+
+    # The annotation moved from the main sheet is counted along with the cells of the column that could not be converted.
+    values = COLUMN_VALUES[case]
+    assert non_date_counts['Job Completed Date'] == 1 + sum(pd.notna(value) and pd.isna(date) for value, date in
+                                                            zip(values, expected['Job Completed Date']))
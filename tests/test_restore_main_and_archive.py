@@ -0,0 +1,69 @@
+
+# Tests of restyling only the newly archived rows of the archive sheet (see restore_main_and_archive.py). A run that keeps the rows the archive sheet
+# held before the update as they are has to create the exact same updated Excel file as a run that restores the format of every row (--full-restyle).
+
+from openpyxl import load_workbook
+from openpyxl.styles import PatternFill
+
+from conftest import PRE_UPDATE, POST_UPDATE, copy_directory, run_script, start_next_day, workbook_snapshot
+
+
+# Each following day moves more rows into the archive sheet, by archiving jobs that have been completed for less days than the day before.
+def test_dirty_range_restyle_matches_full_restyle(sample_directory, tmp_path):
+
+    run_script(sample_directory)
+
+    for day, archive_after_days in enumerate(['60', '30'], start=2):
+        start_next_day(sample_directory)
+        restyled_directory = copy_directory(sample_directory, tmp_path / f"restyled day {day}")
+
+        output = run_script(sample_directory, '--archive-after-days', archive_after_days)
+        restyled_output = run_script(restyled_directory, '--archive-after-days', archive_after_days, '--full-restyle')
+
+        assert "Rows of '>90 Day Archive' above row" in output
+        assert "above row" not in restyled_output
+        assert workbook_snapshot(sample_directory / POST_UPDATE) == workbook_snapshot(restyled_directory / POST_UPDATE)
+
+
+# A row in the middle of the archive sheet that is edited by hand between runs (its values or its format) has to be written and formatted again, so
+# none of the archive sheet's rows are kept as they are.
+def test_edited_archive_row_is_restyled(sample_directory, tmp_path):
+
+    run_script(sample_directory)
+    start_next_day(sample_directory)
+
+    workbook = load_workbook(sample_directory / PRE_UPDATE)
+    archive_sheet = workbook['>90 Day Archive']
+    middle_row = archive_sheet.max_row // 2
+    for cell in archive_sheet[middle_row]:
+        cell.fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
+    archive_sheet.cell(middle_row, 14).value = 'completed'
+    workbook.save(sample_directory / PRE_UPDATE)
+
+    restyled_directory = copy_directory(sample_directory, tmp_path / "restyled")
+    output = run_script(sample_directory, '--archive-after-days', '60')
+    run_script(restyled_directory, '--archive-after-days', '60', '--full-restyle')
+
+    assert "above row" not in output
+    assert workbook_snapshot(sample_directory / POST_UPDATE) == workbook_snapshot(restyled_directory / POST_UPDATE)
+
+
+# The "Job Completed Date" and "Address" cells of a cancelled row keep the white text font color with a strikethrough effect (in the default font, not
+# the font of their column), while every other row keeps the font of its column.
+def test_cancelled_rows_keep_their_font(sample_directory):
+
+    run_script(sample_directory)
+
+    workbook = load_workbook(sample_directory / POST_UPDATE)
+    for sheet in (workbook['Main Installs'], workbook['>90 Day Archive']):
+        cancelled_rows = 0
+        for row in sheet.iter_rows(min_row=2, max_col=14):
+            if row[13].value is None:
+                break
+            fonts = {(cell.font.name, cell.font.sz, cell.font.strike, cell.font.color.rgb if cell.font.color else None) for cell in row[5:7]}
+            if row[13].value == 'CANCELLED':
+                cancelled_rows += 1
+                assert fonts == {(None, None, True, '00ffffff')}
+            else:
+                assert fonts == {('Arial', 16, None, None)}
+        assert cancelled_rows > 0
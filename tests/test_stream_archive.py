@@ -0,0 +1,67 @@
+
+# Tests of streaming mode (see stream_archive.py). A streamed run has to create the exact same updated Excel file as a run that loads the archive sheet
+# into memory as a whole, no matter how many rows are in each chunk.
+
+import os
+import re
+
+import pytest
+from openpyxl import load_workbook
+
+from conftest import PRE_UPDATE, POST_UPDATE, copy_directory, run_script, workbook_snapshot
+
+
+# Function used for reading the amount of rejected rows from the output of a run. It uses the output of the run as input.
+def rejected_row_count(output):
+    match = re.search(r"Rows rejected as already archived: (\d+)", output)
+    return int(match.group(1)) if match else 0
+
+
+# The archive sheet of the sample Excel file holds 360 rows, so these chunk sizes split it into many chunks, a few chunks, and a single chunk.
+@pytest.mark.parametrize('chunk_size', ['25', '100', '10000'])
+def test_streamed_run_matches_in_memory_run(sample_directory, tmp_path, chunk_size):
+
+    streamed_directory = copy_directory(sample_directory, tmp_path / "streamed")
+    run_script(sample_directory)
+    output = run_script(streamed_directory, '--stream-archive', '--chunk-size', chunk_size)
+
+    assert "Amount of rows to import to archive sheet" in output
+    assert workbook_snapshot(streamed_directory / POST_UPDATE) == workbook_snapshot(sample_directory / POST_UPDATE)
+
+
+# Rows moved from the main sheet whose job is already in the archive sheet are rejected in streaming mode the same way as in memory.
+def test_streamed_run_rejects_already_archived_jobs(sample_directory, tmp_path):
+
+    # The archive sheet of the updated Excel file is put in place of the archive sheet of the original Excel file, as if the upload of the updated
+    # Excel file had failed after its rows were archived.
+    run_script(copy_directory(sample_directory, tmp_path / "first run"))
+    updated_workbook = load_workbook(tmp_path / "first run" / POST_UPDATE)
+    workbook = load_workbook(sample_directory / PRE_UPDATE)
+    archive_sheet = workbook['>90 Day Archive']
+    archive_sheet.delete_rows(1, archive_sheet.max_row)
+    for row in updated_workbook['>90 Day Archive'].iter_rows(values_only=True):
+        archive_sheet.append(row)
+    workbook.save(sample_directory / PRE_UPDATE)
+
+    streamed_directory = copy_directory(sample_directory, tmp_path / "streamed")
+    output = run_script(sample_directory)
+    streamed_output = run_script(streamed_directory, '--stream-archive', '--chunk-size', '50')
+
+    assert rejected_row_count(output) > 0
+    assert rejected_row_count(streamed_output) == rejected_row_count(output)
+    assert workbook_snapshot(streamed_directory / POST_UPDATE) == workbook_snapshot(sample_directory / POST_UPDATE)
+
+
+# A streamed run can not keep the formulas and formatting of a sheet the script does not update, so it is refused before anything is backed up or
+# saved.
+def test_streamed_run_is_refused_for_extra_sheets(sample_directory):
+
+    workbook = load_workbook(sample_directory / PRE_UPDATE)
+    workbook.create_sheet('Summary')['A1'] = '=COUNTA(\'Main Installs\'!A:A)'
+    workbook.save(sample_directory / PRE_UPDATE)
+
+    output = run_script(sample_directory, '--stream-archive', returncode=2)
+
+    assert "--stream-archive can not keep the sheets the script does not update: Summary" in output
+    assert not (sample_directory / POST_UPDATE).exists()
+    assert not os.listdir(sample_directory / "Backups")
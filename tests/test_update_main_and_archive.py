@@ -0,0 +1,66 @@
+# Tests of finding the rows of the main sheet that are due for archival (see update_main_and_archive.py). The completion check is done on the whole
+# main sheet at once, and has to mark the same rows as the script did before, when each row was checked on its own.
+
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from conftest import HEADER
+from job_frame_schema import apply_job_schema
+from update_main_and_archive import completion_mask
+
+
+# The date the completion check is made on.
+CURRENT_DATE = date(2024, 4, 10)
+
+# Each row holds the "Status" of a job, the amount of days before the current date the job was completed on (or the value of its "Job Completed
+# Date" cell if it holds no date), and whether the job has been completed for long enough to be archived.
+COMPLETION_ROWS = {
+    'exactly archive after days': ('COMPLETED', 0, True),
+    'one day short': ('COMPLETED', -1, False),
+    'one day over': ('COMPLETED', 1, True),
+    'completed later that day': ('COMPLETED', timedelta(hours=-15), True),
+    'lowercase status': ('completed', 0, True),
+    'capitalized status': ('Completed', 400, True),
+    'status with spaces': ('completed ', 400, False),
+    'cancelled': ('CANCELLED', 400, False),
+    'scheduled': ('SCHEDULED', 0, False),
+    'missing status': (None, 400, False),
+    'missing date': ('COMPLETED', None, True),
+    'not a time': ('COMPLETED', pd.NaT, True),
+    'note instead of a date': ('COMPLETED', '?', True),
+    'not completed without a date': ('SCHEDULED', None, False),
+}
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for creating a main sheet that holds one job for each completion row. The "Job Completed Date" column is either kept as it is written
+# in the Excel file (object) or converted to date values (datetime64), where a ? is left empty. It uses the amount of days a job has to be completed
+# for and the storage of the "Job Completed Date" column as input.
+def completion_sheet(archive_after_days, storage):
+
+    cutoff_date = datetime.combine(CURRENT_DATE, datetime.min.time()) - timedelta(days=archive_after_days)
+    completion_dates = []
+    for _, completed_before, _ in COMPLETION_ROWS.values():
+        if isinstance(completed_before, int):
+            completed_before = timedelta(days=completed_before)
+        completion_dates.append(cutoff_date - completed_before if isinstance(completed_before, timedelta) else completed_before)
+
+    sheet = pd.DataFrame([[None] * len(HEADER) for _ in COMPLETION_ROWS], columns=HEADER, dtype=object)
+    sheet['Job Completed Date'] = pd.Series(completion_dates, dtype=object)
+    sheet['Status'] = pd.Series([row[0] for row in COMPLETION_ROWS.values()], dtype=object)
+    if storage == 'datetime64':
+        sheet['Job Completed Date'] = pd.to_datetime(sheet['Job Completed Date'], errors='coerce')
+    return apply_job_schema(sheet)
+
+
+@pytest.mark.parametrize('storage', ['object', 'datetime64'])
+@pytest.mark.parametrize('archive_after_days', [90, 30, 0])
+def test_completion_mask_marks_jobs_completed_for_long_enough(archive_after_days, storage):
+
+    mask = completion_mask(completion_sheet(archive_after_days, storage), CURRENT_DATE, archive_after_days)
+
+    assert mask.dtype == bool
+    assert dict(zip(COMPLETION_ROWS, mask)) == {case: row[2] for case, row in COMPLETION_ROWS.items()}
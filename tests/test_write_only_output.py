@@ -0,0 +1,33 @@
+
+# Tests of write-only mode (see write_only_output.py). A write-only run has to create the exact same updated Excel file as a run that builds the
+# sheets inside of the loaded workbook, and is refused for an Excel file that holds any other sheet than the four updated sheets.
+
+import os
+
+from openpyxl import load_workbook
+
+from conftest import PRE_UPDATE, POST_UPDATE, copy_directory, run_script, workbook_snapshot
+
+
+def test_write_only_run_matches_default_run(sample_directory, tmp_path):
+
+    write_only_directory = copy_directory(sample_directory, tmp_path / "write only")
+    run_script(sample_directory)
+    run_script(write_only_directory, '--write-only')
+
+    assert workbook_snapshot(write_only_directory / POST_UPDATE) == workbook_snapshot(sample_directory / POST_UPDATE)
+
+
+# A write-only run can not keep the formulas and formatting of a sheet the script does not update, so it is refused before anything is backed up or
+# saved.
+def test_write_only_run_is_refused_for_extra_sheets(sample_directory):
+
+    workbook = load_workbook(sample_directory / PRE_UPDATE)
+    workbook.create_sheet('Summary')['A1'] = '=COUNTA(\'Main Installs\'!A:A)'
+    workbook.save(sample_directory / PRE_UPDATE)
+
+    output = run_script(sample_directory, '--write-only', returncode=2)
+
+    assert "--write-only can not keep the sheets the script does not update: Summary" in output
+    assert not (sample_directory / POST_UPDATE).exists()
+    assert not os.listdir(sample_directory / "Backups")
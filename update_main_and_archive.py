@@ -1,16 +1,23 @@
 
 # The purpose of this file is to update the main installation job and 90 day archive sheets. Each sheet is edited based off of which rows in the main 
-# data sheet contain jobs that have been completed for at least 90 days. If a job meets the criteria, then the row containing the data is added to the 
-# archive sheet and then subsequentially removed from the main sheet.
+# data sheet contain jobs that have been completed for at least 90 days (the amount of days can be changed with the --archive-after-days option of
+# main.py). If a job meets the criteria, then the row containing the data is added to the archive sheet and then subsequentially removed from the
+# main sheet.
 
 # Since Pandas does not support advanced Excel formatting, Openpyxl will be used in another file to restore the formatting of both sheets.
 
 # NOTE: Since this file is so short, every piece of functionality related to specifically updating the data in the main and archive sheets is stored 
 #       in this file only.
 
+import checks
 import pandas as pd
-from datetime import datetime, timedelta
-from time import sleep
+from datetime import datetime
+
+from console_output import announce, detail, pause
+from archive_calendar import calendar_import_mask
+from archive_index import reject_duplicate_jobs
+from job_frame_schema import apply_job_schema
+from normalize_dates import normalize_sheet_dates
 
 # FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
 
@@ -18,120 +25,119 @@ from time import sleep
 def format_main_sheet_dates(main_sheet):
 
     # Format each column that contains dates to date values. However, if a specific cell contains a value that can not be converted to a date 
-    # value (such as a ? or a note) then then it is ignored. This is due to some jobs that have important notes in these columns prior to completion.
-    main_sheet['Drop Installation Date'] = main_sheet.apply(lambda row: pd.to_datetime(row['Drop Installation Date'], errors='ignore'), axis=1)
-    main_sheet['811 Called in Date'] = main_sheet.apply(lambda row: pd.to_datetime(row['811 Called in Date'], errors='ignore'), axis=1)
-    main_sheet['Begin Work On'] = main_sheet.apply(lambda row: pd.to_datetime(row['Begin Work On'], errors='ignore'), axis=1)
-    main_sheet['811 Marked Date'] = main_sheet.apply(lambda row: pd.to_datetime(row['811 Marked Date'], errors='ignore'), axis=1)
-    main_sheet['Ticket Expiration Date'] = main_sheet.apply(lambda row: pd.to_datetime(row['Ticket Expiration Date'], errors='ignore'), axis=1)
-    main_sheet['Job Completed Date'] = main_sheet.apply(lambda row: pd.to_datetime(row['Job Completed Date'], errors='ignore'), axis=1) 
+    # value (such as a ? or a note) then its value is kept in the column's annotation column. This is due to some jobs that have important notes in
+    # these columns prior to completion. The amount of kept cells in each column is returned.
+    return normalize_sheet_dates(main_sheet, keep_non_dates=True)
 
 
 # Function used for formatting date-containing columns of the archive sheet of the sheet for modification. It uses the archive sheet as input.
 def format_archive_sheet_dates(archive_sheet):
 
     # Format each column that contains dates to date values. However, if a specific cell contains a value that can not be converted to a date value 
-    # then its value is cleared out.
-    archive_sheet['Drop Installation Date'] = archive_sheet.apply(lambda row: pd.to_datetime(row['Drop Installation Date'], errors='coerce'), axis=1)
-    archive_sheet['811 Called in Date'] = archive_sheet.apply(lambda row: pd.to_datetime(row['811 Called in Date'], errors='coerce'), axis=1)
-    archive_sheet['Begin Work On'] = archive_sheet.apply(lambda row: pd.to_datetime(row['Begin Work On'], errors='coerce'), axis=1)
-    archive_sheet['811 Marked Date'] = archive_sheet.apply(lambda row: pd.to_datetime(row['811 Marked Date'], errors='coerce'), axis=1)
-    archive_sheet['Ticket Expiration Date'] = archive_sheet.apply(lambda row: pd.to_datetime(row['Ticket Expiration Date'], errors='coerce'), axis=1)
-    archive_sheet['Job Completed Date'] = archive_sheet.apply(lambda row: pd.to_datetime(row['Job Completed Date'], errors='coerce'), axis=1)  
-
-
-# Function used to check if a specified installation job has been completed for at least 90 days. It uses a row number and the current date on the
-# computer's internal clock as input.
-def completion_check(row, current_date):
-    
-    # The value of the "Status" column in the specified row is saved to a variable
-    status = row[14]
-    # The value of the "Job Completed Date" column in the specified row is saved as a variable.
-    completion_date = row[6]
-
-    # The "Status" column's value is checked to see if the value equals the string "completed" (case-insensitive).
-    if type(status) == str and status.lower() == "completed":
-
-        # If the row has a completed job status, the "Job Completed Date" column's data type is checked to see if it is a pandas timestamp or 
-        # datetime object.
-        if type(completion_date) == pd._libs.tslibs.timestamps.Timestamp or type(completion_date) == datetime:
-                
-                # If the column's data type is one of the two, then the elapsed time is calculated and saved to a variable.
-                difference = current_date - completion_date.date()
-
-                # If the difference is greater than or equal to 90 days, the function returns True
-                if difference >= timedelta(days = 90):
-                    return True
-                
-                # If the difference is less than 90 days, the Functions returns False.
-                else:
-                    return False
-                
-    # If the "Status" column's value does not equal the string "completed" (case-insensitive), the funtion returns False.
-    else:
-                    return False
+    # then its value is cleared out. The amount of cleared cells in each column is returned.
+    return normalize_sheet_dates(archive_sheet, keep_non_dates=False)
+
+
+# Function used for reporting the amount of cells in each date-containing column that were left as non-dates. It uses a description of what
+# happened to the non-date cells and the non-date count dictionary as input.
+def report_non_dates(description, non_date_counts):
+    for column_name, non_date_count in non_date_counts.items():
+        if non_date_count > 0:
+            detail(f"{description} in '{column_name}': {non_date_count}")
+
+
+# Function used to check which installation jobs in the main sheet have been completed for at least the specified amount of days. The check is done
+# on the whole "Status" and "Job Completed Date" columns at once and a boolean mask that is True for every row that will be imported to the archive
+# sheet is returned. It uses the main sheet, the current date on the computer's internal clock, and the amount of days a job has to be completed for
+# as input.
+def completion_mask(main_sheet, current_date, archive_after_days):
+
+    # The "Status" column is checked to see which rows have a value that equals the string "completed" (case-insensitive).
+    completed = checks.completed_status_mask(main_sheet['Status'])
+
+    # The "Job Completed Date" column is reduced to its date values. Any value that is not a date (such as a ? or a note) is treated as missing.
+    completion_dates = checks.date_values(main_sheet['Job Completed Date'])
+
+    # A completed job is imported once the specified amount of days have passed since its completion date.
+    # NOTE: A completed job without a completion date is also imported, as the job can never be checked against the amount of days.
+    cutoff_date = pd.Timestamp(current_date) - pd.Timedelta(days=archive_after_days)
+    return completed & (completion_dates.isna() | (completion_dates.dt.normalize() <= cutoff_date))
 
 
-# This function creates two variables which will each be their own DataFrame copy of the main sheet.
-# One of the DataFrames will remove every row that will be imported to the archive sheet, while the other will remove 
-# every row that will be kept in the main sheet. The two DataFrames are then returned from the function.
-def sort_data(main_sheet, import_list, keep_list):
-    main_import = main_sheet.drop(index=keep_list)
-    main_update = main_sheet.drop(index=import_list)
+# Function used to create the boolean mask that marks every row in the main sheet that will be imported to the archive sheet. If an archive calendar
+# of the main sheet is given, the rows that are due are found from the calendar (see archive_calendar.py). Otherwise the completion check is done on
+# the whole main sheet. It uses the main sheet, the current date, the amount of days a job has to be completed for, and, optionally, the archive
+# calendar of the main sheet as input.
+def archive_import_mask(main_sheet, current_date, archive_after_days, calendar=None):
+    if calendar is not None and calendar['rows'] == len(main_sheet):
+        detail("Rows due for archival found from the archive calendar.")
+        return calendar_import_mask(calendar, main_sheet, current_date, archive_after_days)
+    return completion_mask(main_sheet, current_date, archive_after_days)
+
+
+# This function splits the main sheet into two DataFrames using the boolean mask from the completion check. One of the DataFrames contains every row
+# that will be imported to the archive sheet, while the other contains every row that will be kept in the main sheet. The two DataFrames are then
+# returned from the function.
+def sort_data(main_sheet, import_mask):
+    main_import = main_sheet[import_mask]
+    main_update = main_sheet[~import_mask]
     return main_import, main_update
 
 # MAIN FUNCTIONALITY 👇 ------------------------------------------------------------------------------------------------------------------------------#
 
-def update_main_and_archive(main_sheet, archive_sheet):
+# The function uses the main sheet, the archive sheet, and, optionally, the amount of days a job has to be completed for before it is moved to the
+# archive sheet, the archive calendar of the main sheet, and the sheet cache key of the archive sheet (used to find the saved job index) as input.
+def update_main_and_archive(main_sheet, archive_sheet, archive_after_days=90, calendar=None, archive_key=None):
 
     # Correct the main sheet's date-contatining column formats. 
-    format_main_sheet_dates(main_sheet)
+    main_non_dates = format_main_sheet_dates(main_sheet)
 
-    # Gather the current date which will be used in the completion check funtion. This is done here and not in the function so the program does not 
-    # have to retrieve the date numerous times.
+    # Gather the current date which will be used in the completion check funtion.
     current_date = datetime.now().date()
 
-    # Gather the first and last row indexes in the main sheet and save the values as variables
-    main_first_row = main_sheet.first_valid_index()
-    main_last_row = main_sheet.last_valid_index()
-
-    # Create two lists that will be used the hold the row indexes of every row that will be either imported to the archive sheet or kept in the main 
-    # sheet. This will allow the program to import and delete every necessary row all at once.
-    rows_to_import = []
-    rows_to_keep = []
-
-    print(f"\nAmount of rows in main sheet pre-update: {main_last_row + 2}")
-    print(f"Amount of rows in archive sheet pre-update: {archive_sheet.last_valid_index() + 2}")
-    sleep(1)
-    
-    # The program iterates over every row in the main sheet and performs the completion check on each row.
-    for row in main_sheet[main_first_row:main_last_row + 1].itertuples():
-        check = completion_check(row, current_date)
-        
-        # If the row fails the check, then its index is added to the keep list.
-        if check == False:
-            rows_to_keep.append(row.Index)
-
-        # If the row passes the check, then its index is added to the import list.
-        else:
-            rows_to_import.append(row.Index)
-
-    print(f"\nAmount of rows to keep in main sheet: {len(rows_to_keep) + 1}")
-    print(f"Amount of rows to import to archive sheet: {len(rows_to_import)}")
-    sleep(1)
-
-    # The main sheet is split into two DataFrames, one which contains the rows to keep, and one which contains whichrows to import.
-    main_import, main_update = sort_data(main_sheet, rows_to_import, rows_to_keep)
-
-    # The updated archive sheet is saved to a new DataFrame.
-    archive_update = pd.concat([archive_sheet, main_import], ignore_index=True)
+    announce(f"Amount of rows in main sheet pre-update: {len(main_sheet) + 1}")
+    detail(f"Amount of rows in archive sheet pre-update: {len(archive_sheet) + 1}")
+    report_non_dates("Non-date values kept in main sheet", main_non_dates)
+    pause()
 
-    # Correct the archive sheet's date-contatining column formats.
-    format_archive_sheet_dates(archive_update)
+    # Create a boolean mask that marks every row in the main sheet that will be imported to the archive sheet. This will allow the program to import 
+    # and delete every necessary row all at once.
+    import_mask = archive_import_mask(main_sheet, current_date, archive_after_days, calendar)
+
+    # If no rows are due for archival, both sheets are kept as they are instead of being split and joined again. (Whether the sheets also have to be
+    # written into the updated Excel file again is decided in main.py.)
+    if not import_mask.any():
+        announce("No rows are due for archival, the main and archive sheets are not split.")
+        pause()
+        main_update = main_sheet
+        archive_update = archive_sheet
 
-    print(f"\nAmount of rows in main sheet post-update: {main_last_row - len(rows_to_import) + 2}")
-    print(f"Amount of rows in archive sheet post-update: {archive_update.last_valid_index() + 2}")
-    sleep(1)
+    else:
+        # The main sheet is split into two DataFrames, one which contains the rows to keep, and one which contains which rows to import.
+        main_import, main_update = sort_data(main_sheet, import_mask)
+
+        announce(f"Amount of rows to keep in main sheet: {len(main_update) + 1}")
+        detail(f"Amount of rows to import to archive sheet: {len(main_import)}")
+        pause()
 
-    # The main function returns the updated main and archive sheets. 
-    return main_update, archive_update
+        # The updated archive sheet is saved to a new DataFrame. The categorical columns of both sheets hold different values, so they are converted
+        # back to categorical columns once the sheets are joined.
+        archive_update = apply_job_schema(pd.concat([archive_sheet, main_import], ignore_index=True))
+
+    # Correct the archive sheet's date-contatining column formats.
+    archive_non_dates = format_archive_sheet_dates(archive_update)
+
+    # Rows moved from the main sheet whose job is already in the archive sheet (such as when the script is ran twice on the same Excel file) are
+    # rejected instead of being archived a second time (see archive_index.py). The job index is only needed when rows were moved.
+    job_index = None
+    if len(archive_update) > len(archive_sheet):
+        archive_update, job_index = reject_duplicate_jobs(archive_update, len(archive_sheet), archive_key)
+
+    announce(f"Amount of rows in main sheet post-update: {len(main_update) + 1}")
+    detail(f"Amount of rows in archive sheet post-update: {len(archive_update) + 1}")
+    report_non_dates("Non-date values cleared in archive sheet", archive_non_dates)
+    pause()
+
+    # The main function returns the updated main and archive sheets, along with the job index of the updated archive sheet (or None if no rows were
+    # moved into the archive sheet).
+    return main_update, archive_update, job_index
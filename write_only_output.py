@@ -0,0 +1,209 @@
+
+# The purpose of this file is to create the updated Excel file in OpenpyXL's write-only mode (see the --write-only option of main.py). Instead of
+# building every sheet inside of the loaded workbook and restoring its format afterwards, each sheet of a new write-only workbook is written one row
+# at a time, and every cell is written with its final style and number format. A row is sent to a temporary file as soon as it is written, so the
+# memory used while building the Excel file no longer depends on the size of the sheets.
+
+# NOTE: Every cell is given the exact same style it is given by the restore files, so the updated Excel file is identical to the one created by
+#       save_post_update.py. A new write-only workbook could not hold the formulas and formatting of any other sheet, so write-only mode is only
+#       allowed for an Excel file that holds no other sheets than the four updated sheets (see find_extra_sheets in save_post_update.py).
+
+# NOTE: Write-only sheets can not be changed once a row has been written, so each sheet's column widths and row heights are restored before its first
+#       row, while its conditional formatting rules and filter tabs (which are written after the rows) are restored after its last row.
+
+from copy import copy
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+import restore_analysis_sheets
+import restore_main_and_archive
+import style_registry as styles
+from normalize_dates import merge_date_annotations
+from save_post_update import convert_frame_value, frame_number_format, style_frame_header
+from stage_timing import start_stage, end_stage
+
+
+# The names of the main and archive sheets and of the analysis sheets.
+MAIN_AND_ARCHIVE_SHEETS = ['Main Installs', '>90 Day Archive']
+ANALYSIS_SHEETS = ['Area Metrics', 'Month-by-Month Metrics']
+
+
+# FUNCTIONS 👇 ---------------------------------------------------------------------------------------------------------------------------------------#
+
+# Function used for reading through the rows of a DataFrame. The column names are yielded first, followed by the converted values of every row. Any
+# notes kept in annotation columns are merged back into their date-containing columns first (see normalize_dates.py). It uses a DataFrame (or an
+# iterable of DataFrames that each hold a chunk of the sheet's rows) as input.
+def iter_frame_rows(frame):
+
+    # A single DataFrame is read as a single chunk.
+    chunks = [frame] if isinstance(frame, pd.DataFrame) else frame
+
+    for chunk_number, chunk in enumerate(chunks):
+        chunk = merge_date_annotations(chunk)
+        if chunk_number == 0:
+            yield list(chunk.columns)
+        for values in chunk.itertuples(index=False):
+            yield [convert_frame_value(value) for value in values]
+
+
+# Function used for creating a cell of a write-only sheet. The cell is given the number format Pandas gives its value. It uses the write-only sheet
+# and the cell's value as input.
+def create_value_cell(sheet, value):
+    cell = WriteOnlyCell(sheet, value)
+    number_format = frame_number_format(value)
+    if number_format is not None:
+        cell.number_format = number_format
+    return cell
+
+
+# Function used for creating the header row of a write-only sheet. The first columns are given the header named style, while any further column is
+# given the header style Pandas applies to DataFrame column names. It uses the write-only sheet, the column names, and the amount of columns given the
+# header named style as input.
+def create_header_row(sheet, column_names, styled_columns):
+
+    header_row = []
+    for column in range(max(len(column_names), styled_columns)):
+        cell = WriteOnlyCell(sheet, column_names[column] if column < len(column_names) else None)
+        if column < styled_columns:
+            styles.apply_named_style(cell, styles.HEADER_STYLE)
+        else:
+            style_frame_header(cell)
+        header_row.append(cell)
+
+    # The header row is returned.
+    return header_row
+
+
+# Function used for writing the main or archive sheet. Every row up to the sheet's row limit (the first row without a value in the "Status" column)
+# has its cells in columns A-N given the same style restore_main_and_archive.py gives them, and the main sheet's legend is written into its rows.
+# The sheet's row limit is returned. It uses the write-only sheet, a DataFrame (or an iterable of DataFrames that each hold a chunk of the sheet's
+# rows), and a boolean that determines if the legend is written as input.
+def write_main_or_archive_sheet(sheet, frame, legend=False):
+
+    # Restore the column widths and row heights before the first row is written.
+    restore_main_and_archive.restore_column_widths(sheet)
+    restore_main_and_archive.restore_row_heights(sheet)
+
+    # A dictionary that associates each kind of cell with the first cell of that kind that was styled.
+    styled_cells = {}
+    legend_rows = range(restore_main_and_archive.LEGEND_FIRST_ROW,
+                        restore_main_and_archive.LEGEND_FIRST_ROW + len(restore_main_and_archive.LEGEND_LABELS)) if legend else range(0)
+    row_limit = None
+
+    frame_rows = iter_frame_rows(frame)
+    sheet.append(create_header_row(sheet, next(frame_rows), 14))
+
+    row_number = 1
+    for row_number, values in enumerate(frame_rows, start=2):
+
+        # The row limit is the first row that does not have a value in the "Status" column.
+        if row_limit is None and (len(values) < 14 or values[13] is None):
+            row_limit = row_number
+
+        row = [create_value_cell(sheet, value) for value in values]
+
+        # Every cell in columns A-N is styled, including empty cells.
+        if row_limit is None:
+            row += [WriteOnlyCell(sheet) for column in range(len(row), 14)]
+            cancelled = row[13].value == 'CANCELLED'
+            for column, cell in enumerate(row[:14]):
+                restore_main_and_archive.restore_cell(cell, column, styled_cells, cancelled)
+
+        sheet.append(add_legend_cells(sheet, row, row_number) if row_number in legend_rows else row)
+
+    if row_limit is None:
+        row_limit = row_number + 1
+
+    # Legend rows below the last row of the sheet are written on their own.
+    for row_number in range(row_number + 1, legend_rows.stop):
+        if row_number in legend_rows:
+            sheet.append(add_legend_cells(sheet, [], row_number))
+        else:
+            sheet.append([])
+
+    # Restore the fill color rules and filter tabs after the last row is written.
+    restore_main_and_archive.restore_status_colors(sheet, row_limit)
+    restore_main_and_archive.restore_filters(sheet, row_limit)
+
+    # The row limit is returned.
+    return row_limit
+
+
+# Function used for adding the legend cells (columns O and P) to a row of the main sheet. It uses the write-only sheet, the list of the row's cells,
+# and the row's number as input.
+def add_legend_cells(sheet, row, row_number):
+
+    # The row is filled out to column P.
+    for column in range(len(row), 16):
+        row.append(WriteOnlyCell(sheet))
+
+    restore_main_and_archive.restore_legend_row(row_number, row[14], row[15])
+
+    # The row is returned.
+    return row
+
+
+# Function used for writing an analysis sheet. Every row up to the sheet's row limit (the first row without a value in the first column) has its
+# cells in columns A-H given the same style restore_analysis_sheets.py gives them. It uses the write-only sheet and the DataFrame of the analysis sheet
+# as input.
+def write_analysis_sheet(sheet, frame):
+
+    # Restore the column widths and row heights before the first row is written.
+    restore_analysis_sheets.restore_height_and_width(sheet)
+
+    text_cell = None
+    row_limit = None
+
+    frame_rows = iter_frame_rows(frame)
+    sheet.append(create_header_row(sheet, next(frame_rows), 8))
+
+    row_number = 1
+    for row_number, values in enumerate(frame_rows, start=2):
+
+        # The row limit is the first row that does not have a value in the first column.
+        if row_limit is None and (len(values) == 0 or values[0] is None):
+            row_limit = row_number
+
+        row = [create_value_cell(sheet, value) for value in values]
+        if row_limit is None:
+            row += [WriteOnlyCell(sheet) for column in range(len(row), 8)]
+            for cell in row[:8]:
+                if text_cell is None:
+                    styles.apply_named_style(cell, styles.TEXT_STYLE)
+                    text_cell = cell
+                else:
+                    cell._style = copy(text_cell._style)
+        sheet.append(row)
+
+    if row_limit is None:
+        row_limit = row_number + 1
+
+    # Restore the fill color rules and filter tabs after the last row is written.
+    restore_analysis_sheets.apply_column_color(sheet, row_limit)
+    restore_analysis_sheets.restore_filters(sheet, row_limit)
+
+
+# MAIN FUNCTIONALITY 👇 ------------------------------------------------------------------------------------------------------------------------------#
+
+# The function uses the loaded workbook, the name of the Excel file to save, and a dictionary that associates each sheet name with its updated
+# DataFrame (or, for a streamed archive sheet, the generator of its chunks) as input. The dictionary is emptied as each sheet is written.
+def save_write_only(source_workbook, file_name, sheet_frames):
+
+    workbook = Workbook(write_only=True)
+
+    # Write every sheet of the loaded workbook in the same order. Each DataFrame is released as soon as its sheet has been written.
+    start_stage("Write sheets")
+    for sheet_name in source_workbook.sheetnames:
+        sheet = workbook.create_sheet(title=sheet_name)
+
+        if sheet_name in MAIN_AND_ARCHIVE_SHEETS:
+            write_main_or_archive_sheet(sheet, sheet_frames.pop(sheet_name), legend=(sheet_name == 'Main Installs'))
+        elif sheet_name in ANALYSIS_SHEETS:
+            write_analysis_sheet(sheet, sheet_frames.pop(sheet_name))
+    end_stage("Write sheets")
+
+    # Save the workbook to the Excel file. The rows of each sheet have already been written, so only the end of each sheet is left to write.
+    start_stage("Save Excel file")
+    workbook.save(file_name)
+    end_stage("Save Excel file")